@@ -8,16 +8,32 @@ import json
 import inspect
 import hashlib
 import os
-import tempfile
+from functools import partial
+from typing import Awaitable, Callable
 from urllib.parse import urlparse, urlencode
 
 from curl_cffi import requests as curl_requests
-from camoufox.async_api import AsyncCamoufox
-from utils.config import AccountConfig, ProviderConfig
-from utils.browser_utils import parse_cookies, get_random_user_agent, take_screenshot, aliyun_captcha_check
+from utils.config import AccountConfig, OAuthAccountConfig, ProviderConfig
+from utils.browser_pool import browser_pool
+from utils.browser_utils import (
+    aliyun_captcha_check,
+    block_heavy_resources,
+    get_random_user_agent,
+    parse_cookies,
+    take_screenshot,
+    wait_for_condition,
+    wait_for_cookies,
+)
 from utils.get_cf_clearance import get_cf_clearance
-from utils.http_utils import proxy_resolve, response_resolve
+from utils.bypass_broker import bypass_broker
+from utils.http_session import http_sessions
+from utils.retry import circuit_breakers
+from utils.profile_store import profile_store
+from utils.oauth_http import authorize_over_http
+from utils.session_cache import provider_sessions
+from utils.http_utils import is_challenge_response, proxy_resolve, response_resolve
 from utils.topup import topup
+from utils.trace import tracer
 from utils.get_headers import get_curl_cffi_impersonate
 from utils.mask_utils import mask_username
 
@@ -57,238 +73,254 @@ class CheckIn:
 
         os.makedirs(self.storage_state_dir, exist_ok=True)
 
+        # bypass cookies 状态（由 prepare_bypass 填充，遇到验证页面时刷新）
+        self.bypass_cookies: dict = {}
+        self.common_headers: dict = {}
+        self.bypass_from_cache = False
+        self.bypass_deferred = False
+        self.challenge_detected = False
+
+    def _check_challenge(self, response: curl_requests.Response, context: str) -> None:
+        """记录响应是否为 WAF / Cloudflare 验证页面，供 execute 决定是否刷新 bypass cookies"""
+        if is_challenge_response(response):
+            self.challenge_detected = True
+            print(f"⚠️ {self.account_name}: Challenge page detected in {context} response, bypass cookies may be expired")
+
+    @tracer.phase("waf_cookies_browser")
     async def get_waf_cookies_with_browser(self) -> dict | None:
         """使用 Camoufox 获取 WAF cookies（隐私模式）"""
         print(
             f"ℹ️ {self.account_name}: Starting browser to get WAF cookies (using proxy: {'true' if self.camoufox_proxy_config else 'false'})"
         )
 
-        with tempfile.TemporaryDirectory(prefix=f"camoufox_{self.safe_account_name}_waf_") as tmp_dir:
-            print(f"ℹ️ {self.account_name}: Using temporary directory: {tmp_dir}")
-            async with AsyncCamoufox(
-                persistent_context=True,
-                user_data_dir=tmp_dir,
-                headless=False,
-                humanize=True,
-                locale="en-US",
-                geoip=True if self.camoufox_proxy_config else False,
-                proxy=self.camoufox_proxy_config,
-                os="macos",  # 强制使用 macOS 指纹，避免跨平台指纹不一致问题
-            ) as browser:
-                page = await browser.new_page()
+        async with browser_pool.context(
+            self.account_name,
+            proxy_config=self.camoufox_proxy_config,
+            profile_key=profile_store.make_key(self.provider_config.name, self.camoufox_proxy_config),
+        ) as browser:
+            if self.provider_config.use_resource_blocking():
+                await block_heavy_resources(browser, self.account_name)
+            page = await browser.new_page()
 
-                try:
-                    print(f"ℹ️ {self.account_name}: Access login page to get initial cookies")
-                    await page.goto(self.provider_config.get_login_url(), wait_until="networkidle")
+            try:
+                print(f"ℹ️ {self.account_name}: Access login page to get initial cookies")
+                await page.goto(self.provider_config.get_login_url(), wait_until="networkidle")
 
-                    try:
-                        await page.wait_for_function('document.readyState === "complete"', timeout=5000)
-                    except Exception:
-                        await page.wait_for_timeout(3000)
+                await wait_for_condition(
+                    self.account_name,
+                    "Page loaded",
+                    page.wait_for_function('document.readyState === "complete"', timeout=5000),
+                )
 
-                    if self.provider_config.aliyun_captcha:
-                        captcha_check = await aliyun_captcha_check(page, self.account_name)
-                        if captcha_check:
-                            await page.wait_for_timeout(3000)
+                waf_cookie_names = ["acw_tc", "cdn_sec_tc", "acw_sc__v2"]
+                # acw_tc 通常由第一个响应设置，通过阿里云验证后其余 cookie 稍后才会出现，需要等待全部 cookie
+                captcha_passed = False
+                if self.provider_config.aliyun_captcha:
+                    captcha_passed = await aliyun_captcha_check(page, self.account_name)
 
-                    cookies = await browser.cookies()
+                await wait_for_cookies(
+                    browser, waf_cookie_names, self.account_name, timeout=3000, require_all=captcha_passed
+                )
 
-                    waf_cookies = {}
-                    print(f"ℹ️ {self.account_name}: WAF cookies")
-                    for cookie in cookies:
-                        cookie_name = cookie.get("name")
-                        cookie_value = cookie.get("value")
-                        print(f"  📚 Cookie: {cookie_name} (value: {cookie_value})")
-                        if cookie_name in ["acw_tc", "cdn_sec_tc", "acw_sc__v2"] and cookie_value is not None:
-                            waf_cookies[cookie_name] = cookie_value
+                cookies = await browser.cookies()
 
-                    print(f"ℹ️ {self.account_name}: Got {len(waf_cookies)} WAF cookies after step 1")
+                waf_cookies = {}
+                print(f"ℹ️ {self.account_name}: WAF cookies")
+                for cookie in cookies:
+                    cookie_name = cookie.get("name")
+                    cookie_value = cookie.get("value")
+                    print(f"  📚 Cookie: {cookie_name} (value: {cookie_value})")
+                    if cookie_name in waf_cookie_names and cookie_value is not None:
+                        waf_cookies[cookie_name] = cookie_value
 
-                    # 检查是否至少获取到一个 WAF cookie
-                    if not waf_cookies:
-                        print(f"❌ {self.account_name}: No WAF cookies obtained")
-                        return None
+                print(f"ℹ️ {self.account_name}: Got {len(waf_cookies)} WAF cookies after step 1")
 
-                    # 显示获取到的 cookies
-                    cookie_names = list(waf_cookies.keys())
-                    print(f"✅ {self.account_name}: Successfully got WAF cookies: {cookie_names}")
+                # 检查是否至少获取到一个 WAF cookie
+                if not waf_cookies:
+                    print(f"❌ {self.account_name}: No WAF cookies obtained")
+                    return None
 
-                    return waf_cookies
+                # 显示获取到的 cookies
+                cookie_names = list(waf_cookies.keys())
+                print(f"✅ {self.account_name}: Successfully got WAF cookies: {cookie_names}")
 
-                except Exception as e:
-                    print(f"❌ {self.account_name}: Error occurred while getting WAF cookies: {e}")
-                    return None
-                finally:
-                    await page.close()
+                return waf_cookies
 
+            except Exception as e:
+                print(f"❌ {self.account_name}: Error occurred while getting WAF cookies: {e}")
+                return None
+            finally:
+                await page.close()
+
+    @tracer.phase("aliyun_captcha_browser")
     async def get_aliyun_captcha_cookies_with_browser(self) -> dict | None:
         """使用 Camoufox 获取阿里云验证 cookies"""
         print(
             f"ℹ️ {self.account_name}: Starting browser to get Aliyun captcha cookies (using proxy: {'true' if self.camoufox_proxy_config else 'false'})"
         )
 
-        with tempfile.TemporaryDirectory(prefix=f"camoufox_{self.safe_account_name}_aliyun_captcha_") as tmp_dir:
-            print(f"ℹ️ {self.account_name}: Using temporary directory: {tmp_dir}")
-            async with AsyncCamoufox(
-                persistent_context=True,
-                user_data_dir=tmp_dir,
-                headless=False,
-                humanize=True,
-                locale="en-US",
-                geoip=True if self.camoufox_proxy_config else False,
-                proxy=self.camoufox_proxy_config,
-                os="macos",  # 强制使用 macOS 指纹，避免跨平台指纹不一致问题
-            ) as browser:
-                page = await browser.new_page()
+        async with browser_pool.context(
+            self.account_name,
+            proxy_config=self.camoufox_proxy_config,
+            profile_key=profile_store.make_key(self.provider_config.name, self.camoufox_proxy_config),
+        ) as browser:
+            page = await browser.new_page()
+
+            try:
+                print(f"ℹ️ {self.account_name}: Access login page to get initial cookies")
+                await page.goto(self.provider_config.get_login_url(), wait_until="networkidle")
 
                 try:
-                    print(f"ℹ️ {self.account_name}: Access login page to get initial cookies")
-                    await page.goto(self.provider_config.get_login_url(), wait_until="networkidle")
+                    await page.wait_for_function('document.readyState === "complete"', timeout=5000)
+                except Exception:
+                    # 页面仍在加载（通常是验证码页面），等待网络空闲而不是固定等待
+                    await wait_for_condition(
+                        self.account_name,
+                        "Page network idle",
+                        page.wait_for_load_state("networkidle", timeout=3000),
+                    )
+
+                    # # 提取验证码相关数据
+                    # captcha_data = await page.evaluate(
+                    #     """() => {
+                    #     const data = {};
+
+                    #     // 获取 traceid
+                    #     const traceElement = document.getElementById('traceid');
+                    #     if (traceElement) {
+                    #         const text = traceElement.innerText || traceElement.textContent;
+                    #         const match = text.match(/TraceID:\\s*([a-f0-9]+)/i);
+                    #         data.traceid = match ? match[1] : null;
+                    #     }
+
+                    #     // 获取 window.aliyun_captcha 相关字段
+                    #     for (const key in window) {
+                    #         if (key.startsWith('aliyun_captcha')) {
+                    #             data[key] = window[key];
+                    #         }
+                    #     }
+
+                    #     // 获取 requestInfo
+                    #     if (window.requestInfo) {
+                    #         data.requestInfo = window.requestInfo;
+                    #     }
+
+                    #     // 获取当前 URL
+                    #     data.currentUrl = window.location.href;
+
+                    #     return data;
+                    # }"""
+                    # )
+
+                    # print(
+                    #     f"📋 {self.account_name}: Captcha data extracted: " f"\n{json.dumps(captcha_data, indent=2)}"
+                    # )
+
+                    # # 通过 WaitForSecrets 发送验证码数据并等待用户手动验证
+                    # from utils.wait_for_secrets import WaitForSecrets
+
+                    # wait_for_secrets = WaitForSecrets()
+                    # secret_obj = {
+                    #     "CAPTCHA_NEXT_URL": {
+                    #         "name": f"{self.account_name} - Aliyun Captcha Verification",
+                    #         "description": (
+                    #             f"Aliyun captcha verification required.\n"
+                    #             f"TraceID: {captcha_data.get('traceid', 'N/A')}\n"
+                    #             f"Current URL: {captcha_data.get('currentUrl', 'N/A')}\n"
+                    #             f"Please complete the captcha manually in the browser, "
+                    #             f"then provide the next URL after verification."
+                    #         ),
+                    #     }
+                    # }
+
+                    # secrets = wait_for_secrets.get(
+                    #     secret_obj,
+                    #     timeout=300,
+                    #     notification={
+                    #         "title": "阿里云验证",
+                    #         "content": "请在浏览器中完成验证，并提供下一步的 URL。\n"
+                    #         f"{json.dumps(captcha_data, indent=2)}\n"
+                    #         "📋 操作说明：https://github.com/aceHubert/newapi-ai-check-in/docs/aliyun_captcha/README.md",
+                    #     },
+                    # )
+                    # if not secrets or "CAPTCHA_NEXT_URL" not in secrets:
+                    #     print(f"❌ {self.account_name}: No next URL provided " f"for captcha verification")
+                    #     return None
+
+                    # next_url = secrets["CAPTCHA_NEXT_URL"]
+                    # print(f"🔄 {self.account_name}: Navigating to next URL " f"after captcha: {next_url}")
+
+                    # # 导航到新的 URL
+                    # await page.goto(next_url, wait_until="networkidle")
+
+                    await wait_for_condition(
+                        self.account_name,
+                        "Page loaded",
+                        page.wait_for_function('document.readyState === "complete"', timeout=5000),
+                    )
 
+                    # 再次检查是否还有 traceid
+                    traceid_after = None
                     try:
-                        await page.wait_for_function('document.readyState === "complete"', timeout=5000)
+                        traceid_after = await page.evaluate(
+                            """() => {
+                            const traceElement = document.getElementById('traceid');
+                            if (traceElement) {
+                                const text = traceElement.innerText || traceElement.textContent;
+                                const match = text.match(/TraceID:\\s*([a-f0-9]+)/i);
+                                return match ? match[1] : null;
+                            }
+                            return null;
+                        }"""
+                        )
                     except Exception:
-                        await page.wait_for_timeout(3000)
-
-                        # # 提取验证码相关数据
-                        # captcha_data = await page.evaluate(
-                        #     """() => {
-                        #     const data = {};
-
-                        #     // 获取 traceid
-                        #     const traceElement = document.getElementById('traceid');
-                        #     if (traceElement) {
-                        #         const text = traceElement.innerText || traceElement.textContent;
-                        #         const match = text.match(/TraceID:\\s*([a-f0-9]+)/i);
-                        #         data.traceid = match ? match[1] : null;
-                        #     }
-
-                        #     // 获取 window.aliyun_captcha 相关字段
-                        #     for (const key in window) {
-                        #         if (key.startsWith('aliyun_captcha')) {
-                        #             data[key] = window[key];
-                        #         }
-                        #     }
-
-                        #     // 获取 requestInfo
-                        #     if (window.requestInfo) {
-                        #         data.requestInfo = window.requestInfo;
-                        #     }
-
-                        #     // 获取当前 URL
-                        #     data.currentUrl = window.location.href;
-
-                        #     return data;
-                        # }"""
-                        # )
-
-                        # print(
-                        #     f"📋 {self.account_name}: Captcha data extracted: " f"\n{json.dumps(captcha_data, indent=2)}"
-                        # )
-
-                        # # 通过 WaitForSecrets 发送验证码数据并等待用户手动验证
-                        # from utils.wait_for_secrets import WaitForSecrets
-
-                        # wait_for_secrets = WaitForSecrets()
-                        # secret_obj = {
-                        #     "CAPTCHA_NEXT_URL": {
-                        #         "name": f"{self.account_name} - Aliyun Captcha Verification",
-                        #         "description": (
-                        #             f"Aliyun captcha verification required.\n"
-                        #             f"TraceID: {captcha_data.get('traceid', 'N/A')}\n"
-                        #             f"Current URL: {captcha_data.get('currentUrl', 'N/A')}\n"
-                        #             f"Please complete the captcha manually in the browser, "
-                        #             f"then provide the next URL after verification."
-                        #         ),
-                        #     }
-                        # }
-
-                        # secrets = wait_for_secrets.get(
-                        #     secret_obj,
-                        #     timeout=300,
-                        #     notification={
-                        #         "title": "阿里云验证",
-                        #         "content": "请在浏览器中完成验证，并提供下一步的 URL。\n"
-                        #         f"{json.dumps(captcha_data, indent=2)}\n"
-                        #         "📋 操作说明：https://github.com/aceHubert/newapi-ai-check-in/docs/aliyun_captcha/README.md",
-                        #     },
-                        # )
-                        # if not secrets or "CAPTCHA_NEXT_URL" not in secrets:
-                        #     print(f"❌ {self.account_name}: No next URL provided " f"for captcha verification")
-                        #     return None
-
-                        # next_url = secrets["CAPTCHA_NEXT_URL"]
-                        # print(f"🔄 {self.account_name}: Navigating to next URL " f"after captcha: {next_url}")
-
-                        # # 导航到新的 URL
-                        # await page.goto(next_url, wait_until="networkidle")
-
-                        try:
-                            await page.wait_for_function('document.readyState === "complete"', timeout=5000)
-                        except Exception:
-                            await page.wait_for_timeout(3000)
-
-                        # 再次检查是否还有 traceid
                         traceid_after = None
-                        try:
-                            traceid_after = await page.evaluate(
-                                """() => {
-                                const traceElement = document.getElementById('traceid');
-                                if (traceElement) {
-                                    const text = traceElement.innerText || traceElement.textContent;
-                                    const match = text.match(/TraceID:\\s*([a-f0-9]+)/i);
-                                    return match ? match[1] : null;
-                                }
-                                return null;
-                            }"""
-                            )
-                        except Exception:
-                            traceid_after = None
 
-                        if traceid_after:
-                            print(
-                                f"❌ {self.account_name}: Captcha verification failed, "
-                                f"traceid still present: {traceid_after}"
-                            )
-                            return None
+                    if traceid_after:
+                        print(
+                            f"❌ {self.account_name}: Captcha verification failed, "
+                            f"traceid still present: {traceid_after}"
+                        )
+                        return None
 
-                        print(f"✅ {self.account_name}: Captcha verification successful, " f"traceid cleared")
+                    print(f"✅ {self.account_name}: Captcha verification successful, " f"traceid cleared")
 
-                    cookies = await browser.cookies()
+                cookies = await browser.cookies()
 
-                    aliyun_captcha_cookies = {}
-                    print(f"ℹ️ {self.account_name}: Aliyun Captcha cookies")
-                    for cookie in cookies:
-                        cookie_name = cookie.get("name")
-                        cookie_value = cookie.get("value")
-                        print(f"  📚 Cookie: {cookie_name} (value: {cookie_value})")
-                        # if cookie_name in ["acw_tc", "cdn_sec_tc", "acw_sc__v2"]
-                        # and cookie_value is not None:
-                        aliyun_captcha_cookies[cookie_name] = cookie_value
+                aliyun_captcha_cookies = {}
+                print(f"ℹ️ {self.account_name}: Aliyun Captcha cookies")
+                for cookie in cookies:
+                    cookie_name = cookie.get("name")
+                    cookie_value = cookie.get("value")
+                    print(f"  📚 Cookie: {cookie_name} (value: {cookie_value})")
+                    # if cookie_name in ["acw_tc", "cdn_sec_tc", "acw_sc__v2"]
+                    # and cookie_value is not None:
+                    aliyun_captcha_cookies[cookie_name] = cookie_value
 
-                    print(
-                        f"ℹ️ {self.account_name}: "
-                        f"Got {len(aliyun_captcha_cookies)} "
-                        f"Aliyun Captcha cookies after step 1"
-                    )
+                print(
+                    f"ℹ️ {self.account_name}: "
+                    f"Got {len(aliyun_captcha_cookies)} "
+                    f"Aliyun Captcha cookies after step 1"
+                )
 
-                    # 检查是否至少获取到一个 Aliyun Captcha cookie
-                    if not aliyun_captcha_cookies:
-                        print(f"❌ {self.account_name}: " f"No Aliyun Captcha cookies obtained")
-                        return None
+                # 检查是否至少获取到一个 Aliyun Captcha cookie
+                if not aliyun_captcha_cookies:
+                    print(f"❌ {self.account_name}: " f"No Aliyun Captcha cookies obtained")
+                    return None
 
-                    # 显示获取到的 cookies
-                    cookie_names = list(aliyun_captcha_cookies.keys())
-                    print(f"✅ {self.account_name}: " f"Successfully got Aliyun Captcha cookies: {cookie_names}")
+                # 显示获取到的 cookies
+                cookie_names = list(aliyun_captcha_cookies.keys())
+                print(f"✅ {self.account_name}: " f"Successfully got Aliyun Captcha cookies: {cookie_names}")
 
-                    return aliyun_captcha_cookies
+                return aliyun_captcha_cookies
 
-                except Exception as e:
-                    print(f"❌ {self.account_name}: " f"Error occurred while getting Aliyun Captcha cookies, {e}")
-                    return None
-                finally:
-                    await page.close()
+            except Exception as e:
+                print(f"❌ {self.account_name}: " f"Error occurred while getting Aliyun Captcha cookies, {e}")
+                return None
+            finally:
+                await page.close()
 
+    @tracer.phase("status_browser")
     async def get_status_with_browser(self) -> dict | None:
         """使用 Camoufox 获取状态信息并缓存
         Returns:
@@ -298,59 +330,52 @@ class CheckIn:
             f"ℹ️ {self.account_name}: Starting browser to get status (using proxy: {'true' if self.camoufox_proxy_config else 'false'})"
         )
 
-        with tempfile.TemporaryDirectory(prefix=f"camoufox_{self.safe_account_name}_status_") as tmp_dir:
-            print(f"ℹ️ {self.account_name}: Using temporary directory: {tmp_dir}")
-            async with AsyncCamoufox(
-                user_data_dir=tmp_dir,
-                persistent_context=True,
-                headless=False,
-                humanize=True,
-                locale="en-US",
-                geoip=True if self.camoufox_proxy_config else False,
-                proxy=self.camoufox_proxy_config,
-                os="macos",  # 强制使用 macOS 指纹，避免跨平台指纹不一致问题
-            ) as browser:
-                page = await browser.new_page()
+        async with browser_pool.context(
+            self.account_name,
+            proxy_config=self.camoufox_proxy_config,
+            profile_key=profile_store.make_key(self.provider_config.name, self.camoufox_proxy_config),
+        ) as browser:
+            page = await browser.new_page()
 
-                try:
-                    print(f"ℹ️ {self.account_name}: Access status page to get status from localStorage")
-                    await page.goto(self.provider_config.get_login_url(), wait_until="networkidle")
+            try:
+                print(f"ℹ️ {self.account_name}: Access status page to get status from localStorage")
+                await page.goto(self.provider_config.get_login_url(), wait_until="networkidle")
 
-                    try:
-                        await page.wait_for_function('document.readyState === "complete"', timeout=5000)
-                    except Exception:
-                        await page.wait_for_timeout(3000)
+                await wait_for_condition(
+                    self.account_name,
+                    "Page loaded",
+                    page.wait_for_function('document.readyState === "complete"', timeout=5000),
+                )
 
-                    if self.provider_config.aliyun_captcha:
-                        captcha_check = await aliyun_captcha_check(page, self.account_name)
-                        if captcha_check:
-                            await page.wait_for_timeout(3000)
+                if self.provider_config.aliyun_captcha:
+                    await aliyun_captcha_check(page, self.account_name)
 
-                    # 从 localStorage 获取 status
-                    status_data = None
-                    try:
-                        status_str = await page.evaluate("() => localStorage.getItem('status')")
-                        if status_str:
-                            status_data = json.loads(status_str)
-                            print(f"✅ {self.account_name}: Got status from localStorage")
-                        else:
-                            print(f"⚠️ {self.account_name}: No status found in localStorage")
-                    except Exception as e:
-                        print(f"⚠️ {self.account_name}: Error reading status from localStorage: {e}")
+                # 从 localStorage 获取 status
+                status_data = None
+                try:
+                    status_str = await page.evaluate("() => localStorage.getItem('status')")
+                    if status_str:
+                        status_data = json.loads(status_str)
+                        print(f"✅ {self.account_name}: Got status from localStorage")
+                    else:
+                        print(f"⚠️ {self.account_name}: No status found in localStorage")
+                except Exception as e:
+                    print(f"⚠️ {self.account_name}: Error reading status from localStorage: {e}")
 
-                    return status_data
+                return status_data
 
-                except Exception as e:
-                    print(f"❌ {self.account_name}: Error occurred while getting status: {e}")
-                    return None
-                finally:
-                    await page.close()
+            except Exception as e:
+                print(f"❌ {self.account_name}: Error occurred while getting status: {e}")
+                return None
+            finally:
+                await page.close()
 
-    async def get_auth_client_id(self, session: curl_requests.Session, headers: dict, provider: str) -> dict:
+    @tracer.phase("client_id")
+    async def get_auth_client_id(self, session: curl_requests.AsyncSession, headers: dict, provider: str) -> dict:
         """获取状态信息
 
         Args:
-            session: curl_cffi Session 客户端
+            session: curl_cffi AsyncSession 客户端
             headers: 请求头
             provider: 提供商类型 (github/linuxdo)
 
@@ -358,7 +383,8 @@ class CheckIn:
             包含 success 和 client_id 或 error 的字典
         """
         try:
-            response = session.get(self.provider_config.get_status_url(), headers=headers, timeout=30)
+            response = await session.get(self.provider_config.get_status_url(), headers=headers, timeout=30)
+            self._check_challenge(response, "get_auth_client_id")
 
             if response.status_code == 200:
                 data = response_resolve(response, f"get_auth_client_id_{provider}", self.account_name)
@@ -421,6 +447,7 @@ class CheckIn:
                 "error": f"Failed to get client id, {e}",
             }
 
+    @tracer.phase("auth_state_browser")
     async def get_auth_state_with_browser(self) -> dict:
         """使用 Camoufox 获取认证 URL 和 cookies
 
@@ -435,87 +462,80 @@ class CheckIn:
             f"ℹ️ {self.account_name}: Starting browser to get auth state (using proxy: {'true' if self.camoufox_proxy_config else 'false'})"
         )
 
-        with tempfile.TemporaryDirectory(prefix=f"camoufox_{self.safe_account_name}_auth_") as tmp_dir:
-            print(f"ℹ️ {self.account_name}: Using temporary directory: {tmp_dir}")
-            async with AsyncCamoufox(
-                user_data_dir=tmp_dir,
-                persistent_context=True,
-                headless=False,
-                humanize=True,
-                locale="en-US",
-                geoip=True if self.camoufox_proxy_config else False,
-                proxy=self.camoufox_proxy_config,
-                os="macos",  # 强制使用 macOS 指纹，避免跨平台指纹不一致问题
-            ) as browser:
-                page = await browser.new_page()
+        async with browser_pool.context(
+            self.account_name,
+            proxy_config=self.camoufox_proxy_config,
+        ) as browser:
+            page = await browser.new_page()
 
-                try:
-                    # 1. Open the login page first
-                    print(f"ℹ️ {self.account_name}: Opening login page")
-                    await page.goto(self.provider_config.get_login_url(), wait_until="networkidle")
+            try:
+                # 1. Open the login page first
+                print(f"ℹ️ {self.account_name}: Opening login page")
+                await page.goto(self.provider_config.get_login_url(), wait_until="networkidle")
+
+                # Wait for page to be fully loaded
+                await wait_for_condition(
+                    self.account_name,
+                    "Page loaded",
+                    page.wait_for_function('document.readyState === "complete"', timeout=5000),
+                )
 
-                    # Wait for page to be fully loaded
-                    try:
-                        await page.wait_for_function('document.readyState === "complete"', timeout=5000)
-                    except Exception:
-                        await page.wait_for_timeout(3000)
-
-                    if self.provider_config.aliyun_captcha:
-                        captcha_check = await aliyun_captcha_check(page, self.account_name)
-                        if captcha_check:
-                            await page.wait_for_timeout(3000)
-
-                    response = await page.evaluate(
-                        f"""async () => {{
-                            try{{
-                                const response = await fetch('{self.provider_config.get_auth_state_url()}');
-                                const data = await response.json();
-                                return data;
-                            }}catch(e){{
-                                return {{
-                                    success: false,
-                                    message: e.message
-                                }};
-                            }}
-                        }}"""
-                    )
+                if self.provider_config.aliyun_captcha:
+                    await aliyun_captcha_check(page, self.account_name)
+
+                response = await page.evaluate(
+                    f"""async () => {{
+                        try{{
+                            const response = await fetch('{self.provider_config.get_auth_state_url()}');
+                            const data = await response.json();
+                            return data;
+                        }}catch(e){{
+                            return {{
+                                success: false,
+                                message: e.message
+                            }};
+                        }}
+                    }}"""
+                )
 
-                    if response and "data" in response:
-                        cookies = await browser.cookies()
-                        return {
-                            "success": True,
-                            "state": response.get("data"),
-                            "cookies": cookies,
-                        }
+                if response and "data" in response:
+                    cookies = await browser.cookies()
+                    return {
+                        "success": True,
+                        "state": response.get("data"),
+                        "cookies": cookies,
+                    }
 
-                    return {"success": False, "error": f"Failed to get state, \n{json.dumps(response, indent=2)}"}
+                return {"success": False, "error": f"Failed to get state, \n{json.dumps(response, indent=2)}"}
 
-                except Exception as e:
-                    print(f"❌ {self.account_name}: Failed to get state, {e}")
-                    await take_screenshot(page, "auth_url_error", self.account_name)
-                    return {"success": False, "error": "Failed to get state"}
-                finally:
-                    await page.close()
+            except Exception as e:
+                print(f"❌ {self.account_name}: Failed to get state, {e}")
+                await take_screenshot(page, "auth_url_error", self.account_name)
+                return {"success": False, "error": "Failed to get state"}
+            finally:
+                await page.close()
 
+    @tracer.phase("auth_state")
     async def get_auth_state(
         self,
-        session: curl_requests.Session,
+        session: curl_requests.AsyncSession,
         headers: dict,
     ) -> dict:
         """获取认证状态
         
-        使用 curl_cffi Session 发送请求。Session 可在创建时设置全局 impersonate。
+        使用 curl_cffi AsyncSession 发送请求。AsyncSession 可在创建时设置全局 impersonate。
         
         Args:
-            session: curl_cffi Session 客户端（已包含 cookies，可能已设置 impersonate）
+            session: curl_cffi AsyncSession 客户端（已包含 cookies，可能已设置 impersonate）
             headers: 请求头
         """
         try:
-            response = session.get(
+            response = await session.get(
                 self.provider_config.get_auth_state_url(),
                 headers=headers,
                 timeout=30,
             )
+            self._check_challenge(response, "get_auth_state")
 
             if response.status_code == 200:
                 json_data = response_resolve(response, "get_auth_state", self.account_name)
@@ -587,6 +607,7 @@ class CheckIn:
                 "error": f"Failed to get auth state, {e}",
             }
 
+    @tracer.phase("user_info_browser")
     async def get_user_info_with_browser(self, auth_cookies: list[dict]) -> dict:
         """使用 Camoufox 获取用户信息
 
@@ -597,82 +618,75 @@ class CheckIn:
             f"ℹ️ {self.account_name}: Starting browser to get user info (using proxy: {'true' if self.camoufox_proxy_config else 'false'})"
         )
 
-        with tempfile.TemporaryDirectory(prefix=f"camoufox_{self.safe_account_name}_user_info_") as tmp_dir:
-            print(f"ℹ️ {self.account_name}: Using temporary directory: {tmp_dir}")
-            async with AsyncCamoufox(
-                user_data_dir=tmp_dir,
-                persistent_context=True,
-                headless=False,
-                humanize=True,
-                locale="en-US",
-                geoip=True if self.camoufox_proxy_config else False,
-                proxy=self.camoufox_proxy_config,
-                os="macos",  # 强制使用 macOS 指纹，避免跨平台指纹不一致问题
-            ) as browser:
-                page = await browser.new_page()
-
-                browser.add_cookies(auth_cookies)
+        async with browser_pool.context(
+            self.account_name,
+            proxy_config=self.camoufox_proxy_config,
+        ) as browser:
+            page = await browser.new_page()
 
-                try:
-                    # 1. 打开登录页面
-                    print(f"ℹ️ {self.account_name}: Opening main page")
-                    await page.goto(self.provider_config.origin, wait_until="networkidle")
+            await browser.add_cookies(auth_cookies)
 
-                    # 等待页面完全加载
-                    try:
-                        await page.wait_for_function('document.readyState === "complete"', timeout=5000)
-                    except Exception:
-                        await page.wait_for_timeout(3000)
-
-                    if self.provider_config.aliyun_captcha:
-                        captcha_check = await aliyun_captcha_check(page, self.account_name)
-                        if captcha_check:
-                            await page.wait_for_timeout(3000)
-
-                    # 获取用户信息
-                    response = await page.evaluate(
-                        f"""async () => {{
-                           const response = await fetch(
-                               '{self.provider_config.get_user_info_url()}'
-                           );
-                           const data = await response.json();
-                           return data;
-                        }}"""
-                    )
+            try:
+                # 1. 打开登录页面
+                print(f"ℹ️ {self.account_name}: Opening main page")
+                await page.goto(self.provider_config.origin, wait_until="networkidle")
+
+                # 等待页面完全加载
+                await wait_for_condition(
+                    self.account_name,
+                    "Page loaded",
+                    page.wait_for_function('document.readyState === "complete"', timeout=5000),
+                )
 
-                    if response and "data" in response:
-                        user_data = response.get("data", {})
-                        quota = round(user_data.get("quota", 0) / 500000, 2)
-                        used_quota = round(user_data.get("used_quota", 0) / 500000, 2)
-                        bonus_quota = round(user_data.get("bonus_quota", 0) / 500000, 2)
-                        print(
-                            f"✅ {self.account_name}: "
-                            f"Current balance: ${quota}, Used: ${used_quota}, Bonus: ${bonus_quota}"
-                        )
-                        return {
-                            "success": True,
-                            "quota": quota,
-                            "used_quota": used_quota,
-                            "bonus_quota": bonus_quota,
-                            "display": f"Current balance: ${quota}, Used: ${used_quota}, Bonus: ${bonus_quota}",
-                        }
+                if self.provider_config.aliyun_captcha:
+                    await aliyun_captcha_check(page, self.account_name)
+
+                # 获取用户信息
+                response = await page.evaluate(
+                    f"""async () => {{
+                       const response = await fetch(
+                           '{self.provider_config.get_user_info_url()}'
+                       );
+                       const data = await response.json();
+                       return data;
+                    }}"""
+                )
 
+                if response and "data" in response:
+                    user_data = response.get("data", {})
+                    quota = round(user_data.get("quota", 0) / 500000, 2)
+                    used_quota = round(user_data.get("used_quota", 0) / 500000, 2)
+                    bonus_quota = round(user_data.get("bonus_quota", 0) / 500000, 2)
+                    print(
+                        f"✅ {self.account_name}: "
+                        f"Current balance: ${quota}, Used: ${used_quota}, Bonus: ${bonus_quota}"
+                    )
                     return {
-                        "success": False,
-                        "error": f"Failed to get user info, \n{json.dumps(response, indent=2)}",
+                        "success": True,
+                        "quota": quota,
+                        "used_quota": used_quota,
+                        "bonus_quota": bonus_quota,
+                        "display": f"Current balance: ${quota}, Used: ${used_quota}, Bonus: ${bonus_quota}",
                     }
 
-                except Exception as e:
-                    print(f"❌ {self.account_name}: Failed to get user info, {e}")
-                    await take_screenshot(page, "user_info_error", self.account_name)
-                    return {"success": False, "error": "Failed to get user info"}
-                finally:
-                    await page.close()
+                return {
+                    "success": False,
+                    "error": f"Failed to get user info, \n{json.dumps(response, indent=2)}",
+                }
 
-    async def get_user_info(self, session: curl_requests.Session, headers: dict) -> dict:
+            except Exception as e:
+                print(f"❌ {self.account_name}: Failed to get user info, {e}")
+                await take_screenshot(page, "user_info_error", self.account_name)
+                return {"success": False, "error": "Failed to get user info"}
+            finally:
+                await page.close()
+
+    @tracer.phase("user_info")
+    async def get_user_info(self, session: curl_requests.AsyncSession, headers: dict) -> dict:
         """获取用户信息"""
         try:
-            response = session.get(self.provider_config.get_user_info_url(), headers=headers, timeout=30)
+            response = await session.get(self.provider_config.get_user_info_url(), headers=headers, timeout=30)
+            self._check_challenge(response, "get_user_info")
 
             if response.status_code == 200:
                 json_data = response_resolve(response, "get_user_info", self.account_name)
@@ -714,10 +728,13 @@ class CheckIn:
                     return {
                         "success": False,
                         "error": f"Failed to get user info: {error_msg}",
+                        # 接口正常响应但拒绝了当前会话（未登录 / 会话过期）
+                        "auth_rejected": True,
                     }
             return {
                 "success": False,
                 "error": f"Failed to get user info: HTTP {response.status_code}",
+                "auth_rejected": response.status_code in (401, 403),
             }
         except Exception as e:
             return {
@@ -725,9 +742,10 @@ class CheckIn:
                 "error": f"Failed to get user info, {e}",
             }
 
-    def execute_check_in(
+    @tracer.phase("check_in")
+    async def execute_check_in(
         self,
-        session: curl_requests.Session,
+        session: curl_requests.AsyncSession,
         headers: dict,
         api_user: str | int,
     ) -> dict:
@@ -746,7 +764,8 @@ class CheckIn:
             print(f"❌ {self.account_name}: No check-in URL configured")
             return {"success": False, "error": "No check-in URL configured"}
 
-        response = session.post(check_in_url, headers=checkin_headers, timeout=30)
+        response = await session.post(check_in_url, headers=checkin_headers, timeout=30)
+        self._check_challenge(response, "execute_check_in")
 
         print(f"📨 {self.account_name}: Response status code {response.status_code}")
 
@@ -796,6 +815,7 @@ class CheckIn:
             print(f"❌ {self.account_name}: Check-in failed - HTTP {response.status_code}")
             return {"success": False, "error": f"HTTP {response.status_code}"}
 
+    @tracer.phase("topup")
     async def execute_topup(
         self,
         headers: dict,
@@ -887,7 +907,7 @@ class CheckIn:
             topup_count += 1
             print(f"💰 {self.account_name}: Executing topup #{topup_count} with CDK: {cdk}")
 
-            topup_result = topup(
+            topup_result = await topup(
                 provider_config=self.provider_config,
                 account_config=self.account_config,
                 headers=topup_headers,
@@ -949,7 +969,9 @@ class CheckIn:
             f"ℹ️ {self.account_name}: Executing check-in with existing cookies (using proxy: {'true' if self.http_proxy_config else 'false'})"
         )
 
-        session = curl_requests.Session(impersonate=impersonate, proxy=self.http_proxy_config, timeout=30)
+        # 每种认证方式使用独立的 cookies 作用域，连接池在账号之间共享
+        http_scope = http_sessions.open_scope()
+        session = http_sessions.get(self.provider_config.origin, self.http_proxy_config, impersonate)
         
         try:
             # 打印 cookies 的键和值
@@ -969,29 +991,36 @@ class CheckIn:
                 # 如果配置了签到状态查询，先检查是否已签到
                 check_in_status_func = self.provider_config.get_check_in_status_func()
                 if check_in_status_func:
-                    checked_in_today = check_in_status_func(
-                        provider_config=self.provider_config,
-                        account_config=self.account_config,
-                        cookies=cookies,
-                        headers=headers,
-                    )
+                    with tracer.span("check_in_status"):
+                        checked_in_today = check_in_status_func(
+                            provider_config=self.provider_config,
+                            account_config=self.account_config,
+                            cookies=cookies,
+                            headers=headers,
+                        )
+                        # 兼容同步和异步的签到状态查询函数
+                        if inspect.isawaitable(checked_in_today):
+                            checked_in_today = await checked_in_today
                     if checked_in_today:
                         print(f"ℹ️ {self.account_name}: Already checked in today, skipping check-in")
                     else:
                         # 未签到，执行签到
-                        check_in_result = self.execute_check_in(session, headers, api_user)
+                        check_in_result = await self.execute_check_in(session, headers, api_user)
                         if not check_in_result.get("success"):
                             return False, {"error": check_in_result.get("error", "Check-in failed")}
                         # 签到成功后再次查询状态（显示最新状态）
-                        check_in_status_func(
-                            provider_config=self.provider_config,
-                            account_config=self.account_config,
-                            cookies=cookies,
-                            headers=headers,
-                        )
+                        with tracer.span("check_in_status"):
+                            latest_status = check_in_status_func(
+                                provider_config=self.provider_config,
+                                account_config=self.account_config,
+                                cookies=cookies,
+                                headers=headers,
+                            )
+                            if inspect.isawaitable(latest_status):
+                                await latest_status
                 else:
                     # 没有配置签到状态查询函数，直接执行签到
-                    check_in_result = self.execute_check_in(session, headers, api_user)
+                    check_in_result = await self.execute_check_in(session, headers, api_user)
                     if not check_in_result.get("success"):
                         return False, {"error": check_in_result.get("error", "Check-in failed")}
             else:
@@ -1027,7 +1056,76 @@ class CheckIn:
             print(f"❌ {self.account_name}: Error occurred during check-in process - {e}")
             return False, {"error": "Error occurred during check-in process"}
         finally:
-            session.close()
+            await http_sessions.close_scope(http_scope)
+
+    def _save_provider_session(self, auth_type: str, username: str, user_cookies: dict, api_user: str | int) -> None:
+        """OAuth 签到成功后缓存 provider 会话，下次运行直接使用"""
+        cache_key = provider_sessions.make_key(self.provider_config.name, auth_type, username)
+        provider_sessions.save(cache_key, user_cookies, api_user)
+        print(f"ℹ️ {self.account_name}: Cached {auth_type} session for next run")
+
+    @tracer.phase("cached_session")
+    async def check_in_with_cached_session(
+        self,
+        auth_type: str,
+        username: str,
+        bypass_cookies: dict,
+        common_headers: dict,
+    ) -> tuple[bool, dict] | None:
+        """使用缓存的 provider 会话执行签到
+
+        先通过用户信息接口校验缓存会话，有效时直接执行 check_in_with_cookies
+
+        Args:
+            auth_type: 认证方式（github / linuxdo）
+            username: OAuth 账号用户名
+            bypass_cookies: bypass cookies
+            common_headers: 公用请求头（包含 User-Agent 和可能的 Client Hints）
+
+        Returns:
+            签到结果；没有缓存或缓存会话被拒绝（401/403 或接口返回未登录）时返回 None，调用方继续执行 OAuth 流程；
+            临时故障时返回失败结果并保留缓存
+        """
+        cache_key = provider_sessions.make_key(self.provider_config.name, auth_type, username)
+        cached = provider_sessions.get(cache_key)
+        if not cached:
+            return None
+
+        print(f"ℹ️ {self.account_name}: Found cached {auth_type} session, validating")
+
+        user_agent = common_headers.get("User-Agent", "")
+        impersonate = get_curl_cffi_impersonate(user_agent)
+        api_user = cached["api_user"]
+        cookies = {**bypass_cookies, **cached["cookies"]}
+
+        headers = common_headers.copy()
+        headers[self.provider_config.api_user_key] = f"{api_user}"
+        headers["Referer"] = self.provider_config.get_login_url()
+        headers["Origin"] = self.provider_config.origin
+
+        http_scope = http_sessions.open_scope()
+        try:
+            session = http_sessions.get(self.provider_config.origin, self.http_proxy_config, impersonate)
+            session.cookies.update(cookies)
+            user_info = await self.get_user_info(session, headers)
+        finally:
+            await http_sessions.close_scope(http_scope)
+
+        if not user_info or not user_info.get("success"):
+            if self.challenge_detected:
+                # 验证页面导致的失败交给 _run_with_bypass_retry 刷新 bypass cookies 后重试
+                return False, {"error": "Challenge page detected while validating cached session"}
+            if not user_info or user_info.get("auth_rejected"):
+                print(f"⚠️ {self.account_name}: Cached {auth_type} session rejected, falling back to OAuth")
+                provider_sessions.invalidate(cache_key)
+                return None
+            # 5xx、网络错误或熔断等临时故障与会话本身无关，保留缓存，下次运行继续使用
+            error_msg = user_info.get("error", "Unknown error")
+            print(f"❌ {self.account_name}: Failed to validate cached {auth_type} session, keeping cache: {error_msg}")
+            return False, {"error": error_msg}
+
+        print(f"✅ {self.account_name}: Cached {auth_type} session is valid, skipping OAuth")
+        return await self.check_in_with_cookies(cookies, common_headers, api_user, impersonate)
 
     async def check_in_with_github(
         self,
@@ -1048,11 +1146,18 @@ class CheckIn:
             f"ℹ️ {self.account_name}: Executing check-in with GitHub account (using proxy: {'true' if self.http_proxy_config else 'false'})"
         )
 
+        # 优先使用缓存的 provider 会话，有效时跳过 OAuth 流程
+        cached_result = await self.check_in_with_cached_session("github", username, bypass_cookies, common_headers)
+        if cached_result is not None:
+            return cached_result
+
         # 根据 User-Agent 自动推断 impersonate 值，在 Session 上设置全局 impersonate
         user_agent = common_headers.get("User-Agent", "")
         impersonate = get_curl_cffi_impersonate(user_agent)
         
-        session = curl_requests.Session(impersonate=impersonate, proxy=self.http_proxy_config, timeout=30)
+        # 每种认证方式使用独立的 cookies 作用域，连接池在账号之间共享
+        http_scope = http_sessions.open_scope()
+        session = http_sessions.get(self.provider_config.origin, self.http_proxy_config, impersonate)
         if impersonate:
             print(f"ℹ️ {self.account_name}: Using curl_cffi Session with impersonate={impersonate}")
         
@@ -1098,21 +1203,38 @@ class CheckIn:
             username_hash = hashlib.sha256(username.encode("utf-8")).hexdigest()[:8]
             cache_file_path = f"{self.storage_state_dir}/github_{username_hash}_storage_state.json"
 
-            from sign_in_with_github import GitHubSignIn
+            # IdP 登录状态已缓存时先尝试通过 HTTP 完成授权，需要交互时再启动浏览器
+            with tracer.span("oauth_http"):
+                oauth_query = await authorize_over_http(
+                    "github",
+                    client_id=client_id_result["client_id"],
+                    auth_state=auth_state_result.get("state"),
+                    cache_file_path=cache_file_path,
+                    redirect_origin=self.provider_config.origin,
+                    account_name=self.account_name,
+                    headers=headers,
+                    proxy=self.http_proxy_config,
+                    impersonate=impersonate,
+                )
+            if oauth_query:
+                success, result_data, oauth_browser_headers = True, oauth_query, None
+            else:
+                from sign_in_with_github import GitHubSignIn
 
-            github = GitHubSignIn(
-                account_name=self.account_name,
-                provider_config=self.provider_config,
-                username=username,
-                password=password,
-            )
+                github = GitHubSignIn(
+                    account_name=self.account_name,
+                    provider_config=self.provider_config,
+                    username=username,
+                    password=password,
+                )
 
-            success, result_data, oauth_browser_headers = await github.signin(
-                client_id=client_id_result["client_id"],
-                auth_state=auth_state_result.get("state"),
-                auth_cookies=auth_state_result.get("cookies", []),
-                cache_file_path=cache_file_path
-            )
+                with tracer.span("oauth_browser"):
+                    success, result_data, oauth_browser_headers = await github.signin(
+                        client_id=client_id_result["client_id"],
+                        auth_state=auth_state_result.get("state"),
+                        auth_cookies=auth_state_result.get("cookies", []),
+                        cache_file_path=cache_file_path
+                    )
 
             # 检查是否成功获取 cookies 和 api_user
             if success and "cookies" in result_data and "api_user" in result_data:
@@ -1127,7 +1249,10 @@ class CheckIn:
                     updated_headers.update(oauth_browser_headers)
 
                 merged_cookies = {**bypass_cookies, **user_cookies}
-                return await self.check_in_with_cookies(merged_cookies, updated_headers, api_user, impersonate)
+                success, user_info = await self.check_in_with_cookies(merged_cookies, updated_headers, api_user, impersonate)
+                if success:
+                    self._save_provider_session("github", username, user_cookies, api_user)
+                return success, user_info
             elif success and "code" in result_data and "state" in result_data:
                 # 收到 OAuth code，通过 HTTP 调用回调接口获取 api_user
                 print(f"ℹ️ {self.account_name}: Received OAuth code, calling callback API")
@@ -1148,7 +1273,9 @@ class CheckIn:
                         print(f"ℹ️ {self.account_name}: Updating headers with OAuth browser fingerprint")
                         updated_headers.update(oauth_browser_headers)
 
-                    response = session.get(callback_url, headers=updated_headers, timeout=30)
+                    with tracer.span("oauth_callback"):
+                        response = await session.get(callback_url, headers=updated_headers, timeout=30)
+                    self._check_challenge(response, "oauth_callback")
 
                     if response.status_code == 200:
                         json_data = response_resolve(response, "github_oauth_callback", self.account_name)
@@ -1168,7 +1295,10 @@ class CheckIn:
                                     f"ℹ️ {self.account_name}: Extracted {len(user_cookies)} user cookies: {list(user_cookies.keys())}"
                                 )
                                 merged_cookies = {**bypass_cookies, **user_cookies}
-                                return await self.check_in_with_cookies(merged_cookies, updated_headers, api_user, impersonate)
+                                success, user_info = await self.check_in_with_cookies(merged_cookies, updated_headers, api_user, impersonate)
+                                if success:
+                                    self._save_provider_session("github", username, user_cookies, api_user)
+                                return success, user_info
                             else:
                                 print(f"❌ {self.account_name}: No user ID in callback response")
                                 return False, {"error": "No user ID in OAuth callback response"}
@@ -1190,7 +1320,7 @@ class CheckIn:
             print(f"❌ {self.account_name}: Error occurred during check-in process - {e}")
             return False, {"error": "GitHub check-in process error"}
         finally:
-            session.close()
+            await http_sessions.close_scope(http_scope)
 
     async def check_in_with_linuxdo(
         self,
@@ -1211,11 +1341,18 @@ class CheckIn:
             f"ℹ️ {self.account_name}: Executing check-in with Linux.do account (using proxy: {'true' if self.http_proxy_config else 'false'})"
         )
 
+        # 优先使用缓存的 provider 会话，有效时跳过 OAuth 流程
+        cached_result = await self.check_in_with_cached_session("linuxdo", username, bypass_cookies, common_headers)
+        if cached_result is not None:
+            return cached_result
+
         # 根据 User-Agent 自动推断 impersonate 值，在 Session 上设置全局 impersonate
         user_agent = common_headers.get("User-Agent", "")
         impersonate = get_curl_cffi_impersonate(user_agent)
         
-        session = curl_requests.Session(impersonate=impersonate, proxy=self.http_proxy_config, timeout=30)
+        # 每种认证方式使用独立的 cookies 作用域，连接池在账号之间共享
+        http_scope = http_sessions.open_scope()
+        session = http_sessions.get(self.provider_config.origin, self.http_proxy_config, impersonate)
         if impersonate:
             print(f"ℹ️ {self.account_name}: Using curl_cffi Session with impersonate={impersonate}")
         
@@ -1261,21 +1398,38 @@ class CheckIn:
             username_hash = hashlib.sha256(username.encode("utf-8")).hexdigest()[:8]
             cache_file_path = f"{self.storage_state_dir}/linuxdo_{username_hash}_storage_state.json"
 
-            from sign_in_with_linuxdo import LinuxDoSignIn
+            # IdP 登录状态已缓存时先尝试通过 HTTP 完成授权，需要交互时再启动浏览器
+            with tracer.span("oauth_http"):
+                oauth_query = await authorize_over_http(
+                    "linuxdo",
+                    client_id=client_id_result["client_id"],
+                    auth_state=auth_state_result["state"],
+                    cache_file_path=cache_file_path,
+                    redirect_origin=self.provider_config.origin,
+                    account_name=self.account_name,
+                    headers=headers,
+                    proxy=self.http_proxy_config,
+                    impersonate=impersonate,
+                )
+            if oauth_query:
+                success, result_data, oauth_browser_headers = True, oauth_query, None
+            else:
+                from sign_in_with_linuxdo import LinuxDoSignIn
 
-            linuxdo = LinuxDoSignIn(
-                account_name=self.account_name,
-                provider_config=self.provider_config,
-                username=username,
-                password=password,
-            )
+                linuxdo = LinuxDoSignIn(
+                    account_name=self.account_name,
+                    provider_config=self.provider_config,
+                    username=username,
+                    password=password,
+                )
 
-            success, result_data, oauth_browser_headers = await linuxdo.signin(
-                client_id=client_id_result["client_id"],
-                auth_state=auth_state_result["state"],
-                auth_cookies=auth_state_result.get("cookies", []),
-                cache_file_path=cache_file_path
-            )
+                with tracer.span("oauth_browser"):
+                    success, result_data, oauth_browser_headers = await linuxdo.signin(
+                        client_id=client_id_result["client_id"],
+                        auth_state=auth_state_result["state"],
+                        auth_cookies=auth_state_result.get("cookies", []),
+                        cache_file_path=cache_file_path
+                    )
 
             # 检查是否成功获取 cookies 和 api_user
             if success and "cookies" in result_data and "api_user" in result_data:
@@ -1290,7 +1444,10 @@ class CheckIn:
                     updated_headers.update(oauth_browser_headers)
 
                 merged_cookies = {**bypass_cookies, **user_cookies}
-                return await self.check_in_with_cookies(merged_cookies, updated_headers, api_user, impersonate)
+                success, user_info = await self.check_in_with_cookies(merged_cookies, updated_headers, api_user, impersonate)
+                if success:
+                    self._save_provider_session("linuxdo", username, user_cookies, api_user)
+                return success, user_info
             elif success and "code" in result_data and "state" in result_data:
                 # 收到 OAuth code，通过 HTTP 调用回调接口获取 api_user
                 print(f"ℹ️ {self.account_name}: Received OAuth code, calling callback API")
@@ -1311,7 +1468,9 @@ class CheckIn:
                         print(f"ℹ️ {self.account_name}: Updating headers with OAuth browser fingerprint")
                         updated_headers.update(oauth_browser_headers)
 
-                    response = session.get(callback_url, headers=updated_headers, timeout=30)
+                    with tracer.span("oauth_callback"):
+                        response = await session.get(callback_url, headers=updated_headers, timeout=30)
+                    self._check_challenge(response, "oauth_callback")
 
                     if response.status_code == 200:
                         json_data = response_resolve(response, "linuxdo_oauth_callback", self.account_name)
@@ -1331,7 +1490,10 @@ class CheckIn:
                                     f"ℹ️ {self.account_name}: Extracted {len(user_cookies)} user cookies: {list(user_cookies.keys())}"
                                 )
                                 merged_cookies = {**bypass_cookies, **user_cookies}
-                                return await self.check_in_with_cookies(merged_cookies, updated_headers, api_user, impersonate)
+                                success, user_info = await self.check_in_with_cookies(merged_cookies, updated_headers, api_user, impersonate)
+                                if success:
+                                    self._save_provider_session("linuxdo", username, user_cookies, api_user)
+                                return success, user_info
                             else:
                                 print(f"❌ {self.account_name}: No user ID in callback response")
                                 return False, {"error": "No user ID in OAuth callback response"}
@@ -1353,50 +1515,16 @@ class CheckIn:
             print(f"❌ {self.account_name}: Error occurred during check-in process - {e}")
             return False, {"error": "Linux.do check-in process error"}
         finally:
-            session.close()
+            await http_sessions.close_scope(http_scope)
 
-    async def execute(self) -> list[tuple[str, bool, dict | None]]:
-        """为单个账号执行签到操作，支持多种认证方式"""
-        print(f"\n\n⏳ Starting to process {self.account_name}")
-
-        bypass_cookies = {}
-        browser_headers = None  # 浏览器指纹头部信息
-        
-        if self.provider_config.needs_waf_cookies():
-            waf_cookies = await self.get_waf_cookies_with_browser()
-            if waf_cookies:
-                bypass_cookies = waf_cookies
-                print(f"✅ {self.account_name}: WAF cookies obtained")
-            else:
-                print(f"⚠️ {self.account_name}: Unable to get WAF cookies, continuing with empty cookies")
+    def _build_common_headers(self, browser_headers: dict | None) -> dict:
+        """生成公用请求头（只生成一次 User-Agent，整个签到流程保持一致）
 
-        elif self.provider_config.needs_cf_clearance():
-            # 直接调用公共模块的 get_cf_clearance 函数
-            try:
-                cf_result = await get_cf_clearance(
-                    url=self.provider_config.get_login_url(),
-                    account_name=self.account_name,
-                    proxy_config=self.camoufox_proxy_config,
-                )
-                
-                if cf_result[0]:
-                    bypass_cookies = cf_result[0]
-                    print(f"✅ {self.account_name}: Cloudflare cookies obtained")
-                else:
-                    print(f"⚠️ {self.account_name}: Unable to get Cloudflare cookies, continuing with empty cookies")
+        注意：Referer 和 Origin 不在这里设置，由各个签到方法根据实际请求动态设置
 
-                # 因为 Cloudflare 验证需要一致的浏览器指纹
-                if cf_result[1]:
-                    browser_headers = cf_result[1]
-                    print(f"✅ {self.account_name}: Cloudflare fingerprint headers obtained")
-            except Exception as e:
-                print(f"❌ {self.account_name}: Error occurred while getting cf_clearance cookie: {e}")
-                print(f"⚠️ {self.account_name}: Continuing with empty cookies")
-        else:
-            print(f"ℹ️ {self.account_name}: Bypass not required, using user cookies directly")
-
-        # 生成公用请求头（只生成一次 User-Agent，整个签到流程保持一致）
-        # 注意：Referer 和 Origin 不在这里设置，由各个签到方法根据实际请求动态设置
+        Args:
+            browser_headers: 浏览器指纹头部（来自 cf_clearance 获取），可为 None
+        """
         if browser_headers:
             # 如果有浏览器指纹头部（来自 cf_clearance 获取），使用它
             common_headers = {
@@ -1443,93 +1571,286 @@ class CheckIn:
             }
             print(f"ℹ️ {self.account_name}: Using random User-Agent (generated once)")
 
-        # 解析账号配置
-        cookies_data = self.account_config.cookies
-        github_accounts = self.account_config.github  # 现在是 List[OAuthAccountConfig] 类型
-        linuxdo_accounts = self.account_config.linux_do  # 现在是 List[OAuthAccountConfig] 类型
-        results = []
+        return common_headers
 
-        # 尝试 cookies 认证
-        if cookies_data:
-            print(f"\nℹ️ {self.account_name}: Trying cookies authentication")
-            try:
-                user_cookies = parse_cookies(cookies_data)
-                if not user_cookies:
-                    print(f"❌ {self.account_name}: Invalid cookies format")
-                    results.append(("cookies", False, {"error": "Invalid cookies format"}))
-                else:
-                    api_user = self.account_config.api_user
-                    if not api_user:
-                        print(f"❌ {self.account_name}: API user identifier not found for cookies")
-                        results.append(("cookies", False, {"error": "API user identifier not found"}))
-                    else:
-                        # 使用已有 cookies 执行签到，传入公用请求头
-                        all_cookies = {**bypass_cookies, **user_cookies}
-                        success, user_info = await self.check_in_with_cookies(all_cookies, common_headers, api_user)
-                        if success:
-                            print(f"✅ {self.account_name}: Cookies authentication successful")
-                            results.append(("cookies", True, user_info))
-                        else:
-                            print(f"❌ {self.account_name}: Cookies authentication failed")
-                            results.append(("cookies", False, user_info))
-            except Exception as e:
-                print(f"❌ {self.account_name}: Cookies authentication error: {e}")
-                results.append(("cookies", False, {"error": str(e)}))
-
-        # 尝试 GitHub 认证（支持多个账号）
-        if github_accounts:
-            for idx, github_account in enumerate(github_accounts):
-                account_label = f"github[{idx}]" if len(github_accounts) > 1 else "github"
-                print(f"\nℹ️ {self.account_name}: Trying GitHub authentication ({mask_username(github_account.username)})")
-                try:
-                    username = github_account.username
-                    password = github_account.password
-                    if not username or not password:
-                        print(f"❌ {self.account_name}: Incomplete GitHub account information")
-                        results.append((account_label, False, {"error": "Incomplete GitHub account information"}))
-                    else:
-                        # 使用 GitHub 账号执行签到，传入公用请求头
-                        success, user_info = await self.check_in_with_github(
-                            username, password, bypass_cookies, common_headers
-                        )
-                        if success:
-                            print(f"✅ {self.account_name}: GitHub authentication successful ({mask_username(github_account.username)})")
-                            results.append((account_label, True, user_info))
-                        else:
-                            print(f"❌ {self.account_name}: GitHub authentication failed ({mask_username(github_account.username)})")
-                            results.append((account_label, False, user_info))
-                except Exception as e:
-                    print(f"❌ {self.account_name}: GitHub authentication error ({mask_username(github_account.username)}): {e}")
-                    results.append((account_label, False, {"error": str(e)}))
-
-        # 尝试 Linux.do 认证（支持多个账号）
-        if linuxdo_accounts:
-            for idx, linuxdo_account in enumerate(linuxdo_accounts):
-                account_label = f"linux.do[{idx}]" if len(linuxdo_accounts) > 1 else "linux.do"
-                print(f"\nℹ️ {self.account_name}: Trying Linux.do authentication ({mask_username(linuxdo_account.username)})")
-                try:
-                    username = linuxdo_account.username
-                    password = linuxdo_account.password
-                    if not username or not password:
-                        print(f"❌ {self.account_name}: Incomplete Linux.do account information")
-                        results.append((account_label, False, {"error": "Incomplete Linux.do account information"}))
-                    else:
-                        # 使用 Linux.do 账号执行签到，传入公用请求头
-                        success, user_info = await self.check_in_with_linuxdo(
-                            username,
-                            password,
-                            bypass_cookies,
-                            common_headers,
-                        )
-                        if success:
-                            print(f"✅ {self.account_name}: Linux.do authentication successful ({mask_username(linuxdo_account.username)})")
-                            results.append((account_label, True, user_info))
-                        else:
-                            print(f"❌ {self.account_name}: Linux.do authentication failed ({mask_username(linuxdo_account.username)})")
-                            results.append((account_label, False, user_info))
-                except Exception as e:
-                    print(f"❌ {self.account_name}: Linux.do authentication error ({mask_username(linuxdo_account.username)}): {e}")
-                    results.append((account_label, False, {"error": str(e)}))
+    async def _fetch_bypass_cookies(self) -> tuple[dict | None, dict | None]:
+        """启动浏览器获取 bypass cookies
+
+        Returns:
+            (bypass cookies, 浏览器指纹头部)
+        """
+        if self.provider_config.needs_waf_cookies():
+            waf_cookies = await self.get_waf_cookies_with_browser()
+            if waf_cookies:
+                print(f"✅ {self.account_name}: WAF cookies obtained")
+            else:
+                print(f"⚠️ {self.account_name}: Unable to get WAF cookies, continuing with empty cookies")
+            return waf_cookies, None
+
+        # 直接调用公共模块的 get_cf_clearance 函数
+        try:
+            cf_cookies, cf_headers = await get_cf_clearance(
+                url=self.provider_config.get_login_url(),
+                account_name=self.account_name,
+                proxy_config=self.camoufox_proxy_config,
+                block_resources=self.provider_config.use_resource_blocking(),
+                profile_key=profile_store.make_key(self.provider_config.name, self.camoufox_proxy_config),
+            )
+
+            if cf_cookies:
+                print(f"✅ {self.account_name}: Cloudflare cookies obtained")
+            else:
+                print(f"⚠️ {self.account_name}: Unable to get Cloudflare cookies, continuing with empty cookies")
+
+            # 因为 Cloudflare 验证需要一致的浏览器指纹
+            if cf_headers:
+                print(f"✅ {self.account_name}: Cloudflare fingerprint headers obtained")
+            return cf_cookies, cf_headers
+        except Exception as e:
+            print(f"❌ {self.account_name}: Error occurred while getting cf_clearance cookie: {e}")
+            print(f"⚠️ {self.account_name}: Continuing with empty cookies")
+            return None, None
+
+    def _get_bypass_key(self) -> str | None:
+        """获取 bypass cookies 的共享缓存 key，不需要 bypass 时返回 None"""
+        if not (self.provider_config.needs_waf_cookies() or self.provider_config.needs_cf_clearance()):
+            return None
+        # 浏览器指纹与 Camoufox 启动参数 os="macos" 保持一致
+        return bypass_broker.make_key(self.provider_config.origin, self.camoufox_proxy_config, "macos")
+
+    async def _probe_challenge(self, common_headers: dict) -> bool:
+        """使用 HTTP 直连请求用户信息接口，判断当前是否会遇到 WAF / Cloudflare 验证页面
+
+        Returns:
+            是否遇到验证页面，请求失败时也按需要 bypass 处理
+        """
+        http_scope = http_sessions.open_scope()
+        try:
+            session = http_sessions.get(self.provider_config.origin, self.http_proxy_config, "firefox135")
+            response = await session.get(self.provider_config.get_user_info_url(), headers=common_headers, timeout=30)
+            return is_challenge_response(response)
+        except Exception as e:
+            print(f"⚠️ {self.account_name}: HTTP probe failed ({e}), falling back to browser bypass")
+            return True
+        finally:
+            await http_sessions.close_scope(http_scope)
+
+    @tracer.phase("bypass")
+    async def prepare_bypass(self, lazy: bool = False) -> None:
+        """获取 bypass cookies 并生成公用请求头
+
+        同一 (origin, 代理, 指纹) 的 bypass cookies 由 bypass_broker 在所有账号间共享
+
+        Args:
+            lazy: 没有可用的缓存 cookies 时，先用 HTTP 直连探测，未遇到验证页面则不启动浏览器
+        """
+        browser_headers = None
+        self.bypass_cookies = {}
+        self.bypass_from_cache = False
+        self.bypass_deferred = False
+
+        bypass_key = self._get_bypass_key()
+        if bypass_key and lazy and not bypass_broker.has_valid(bypass_key):
+            common_headers = self._build_common_headers(None)
+            if not await self._probe_challenge(common_headers):
+                print(f"ℹ️ {self.account_name}: No challenge detected over HTTP, skipping browser bypass (lazy mode)")
+                self.bypass_deferred = True
+                self.common_headers = common_headers
+                return
+            print(f"⚠️ {self.account_name}: Challenge detected over HTTP, escalating to browser bypass")
+
+        if bypass_key:
+            cookies, browser_headers, from_cache = await bypass_broker.get(
+                bypass_key, self._fetch_bypass_cookies, self.account_name
+            )
+            self.bypass_cookies = cookies or {}
+            self.bypass_from_cache = from_cache
+        else:
+            print(f"ℹ️ {self.account_name}: Bypass not required, using user cookies directly")
+
+        self.common_headers = self._build_common_headers(browser_headers)
+
+    async def _run_with_bypass_retry(
+        self,
+        check_in: Callable[[dict, dict], Awaitable[tuple[bool, dict]]],
+    ) -> tuple[bool, dict]:
+        """执行签到，遇到验证页面时使 bypass cookies 失效
+
+        如果失效的 cookies 来自缓存，或 lazy 模式下跳过了 bypass，获取 bypass cookies 后重试一次
+
+        Args:
+            check_in: 接收 (bypass_cookies, common_headers) 的签到函数
+        """
+        self.challenge_detected = False
+        success, user_info = await check_in(self.bypass_cookies, self.common_headers)
+        if success or not self.challenge_detected:
+            return success, user_info
+
+        bypass_key = self._get_bypass_key()
+        if not bypass_key:
+            return success, user_info
+
+        if self.bypass_deferred:
+            print(f"🔄 {self.account_name}: Challenge detected in lazy mode, escalating to browser bypass and retrying")
+        else:
+            bypass_broker.invalidate(bypass_key, stale_cookies=self.bypass_cookies)
+            if not self.bypass_from_cache:
+                return success, user_info
+            print(f"🔄 {self.account_name}: Cached bypass cookies rejected, refreshing and retrying")
+
+        await self.prepare_bypass()
+        self.challenge_detected = False
+        return await check_in(self.bypass_cookies, self.common_headers)
+
+    async def _auth_with_cookies(self) -> tuple[str, bool, dict | None]:
+        """使用已有 cookies 认证并签到"""
+        print(f"\nℹ️ {self.account_name}: Trying cookies authentication")
+        try:
+            user_cookies = parse_cookies(self.account_config.cookies)
+            if not user_cookies:
+                print(f"❌ {self.account_name}: Invalid cookies format")
+                return "cookies", False, {"error": "Invalid cookies format"}
+
+            api_user = self.account_config.api_user
+            if not api_user:
+                print(f"❌ {self.account_name}: API user identifier not found for cookies")
+                return "cookies", False, {"error": "API user identifier not found"}
+
+            # 使用已有 cookies 执行签到，传入公用请求头
+            with tracer.labels(auth_method="cookies"):
+                success, user_info = await self._run_with_bypass_retry(
+                    lambda bypass_cookies, common_headers: self.check_in_with_cookies(
+                        {**bypass_cookies, **user_cookies}, common_headers, api_user
+                    )
+                )
+            if success:
+                print(f"✅ {self.account_name}: Cookies authentication successful")
+            else:
+                print(f"❌ {self.account_name}: Cookies authentication failed")
+            return "cookies", success, user_info
+        except Exception as e:
+            print(f"❌ {self.account_name}: Cookies authentication error: {e}")
+            return "cookies", False, {"error": str(e)}
+
+    async def _auth_with_github(self, account_label: str, github_account: OAuthAccountConfig) -> tuple[str, bool, dict | None]:
+        """使用 GitHub 账号认证并签到"""
+        print(f"\nℹ️ {self.account_name}: Trying GitHub authentication ({mask_username(github_account.username)})")
+        try:
+            username = github_account.username
+            password = github_account.password
+            if not username or not password:
+                print(f"❌ {self.account_name}: Incomplete GitHub account information")
+                return account_label, False, {"error": "Incomplete GitHub account information"}
+
+            # 使用 GitHub 账号执行签到，传入公用请求头
+            with tracer.labels(auth_method=account_label):
+                success, user_info = await self._run_with_bypass_retry(
+                    lambda bypass_cookies, common_headers: self.check_in_with_github(
+                        username, password, bypass_cookies, common_headers
+                    )
+                )
+            if success:
+                print(f"✅ {self.account_name}: GitHub authentication successful ({mask_username(github_account.username)})")
+            else:
+                print(f"❌ {self.account_name}: GitHub authentication failed ({mask_username(github_account.username)})")
+            return account_label, success, user_info
+        except Exception as e:
+            print(f"❌ {self.account_name}: GitHub authentication error ({mask_username(github_account.username)}): {e}")
+            return account_label, False, {"error": str(e)}
+
+    async def _auth_with_linuxdo(self, account_label: str, linuxdo_account: OAuthAccountConfig) -> tuple[str, bool, dict | None]:
+        """使用 Linux.do 账号认证并签到"""
+        print(f"\nℹ️ {self.account_name}: Trying Linux.do authentication ({mask_username(linuxdo_account.username)})")
+        try:
+            username = linuxdo_account.username
+            password = linuxdo_account.password
+            if not username or not password:
+                print(f"❌ {self.account_name}: Incomplete Linux.do account information")
+                return account_label, False, {"error": "Incomplete Linux.do account information"}
+
+            # 使用 Linux.do 账号执行签到，传入公用请求头
+            with tracer.labels(auth_method=account_label):
+                success, user_info = await self._run_with_bypass_retry(
+                    lambda bypass_cookies, common_headers: self.check_in_with_linuxdo(
+                        username, password, bypass_cookies, common_headers
+                    )
+                )
+            if success:
+                print(f"✅ {self.account_name}: Linux.do authentication successful ({mask_username(linuxdo_account.username)})")
+            else:
+                print(f"❌ {self.account_name}: Linux.do authentication failed ({mask_username(linuxdo_account.username)})")
+            return account_label, success, user_info
+        except Exception as e:
+            print(f"❌ {self.account_name}: Linux.do authentication error ({mask_username(linuxdo_account.username)}): {e}")
+            return account_label, False, {"error": str(e)}
+
+    def _build_auth_plan(
+        self, auth_order: list[str]
+    ) -> list[tuple[str, Callable[[], Awaitable[tuple[str, bool, dict | None]]]]]:
+        """按认证顺序生成待执行的认证方式列表
+
+        Args:
+            auth_order: 认证方式顺序，取值 cookies / github / linux.do
+
+        Returns:
+            (认证方式标签, 认证函数) 列表
+        """
+        github_accounts = self.account_config.github or []  # List[OAuthAccountConfig] 类型
+        linuxdo_accounts = self.account_config.linux_do or []  # List[OAuthAccountConfig] 类型
+
+        plan = []
+        for auth_type in auth_order:
+            if auth_type == "cookies" and self.account_config.cookies:
+                plan.append(("cookies", self._auth_with_cookies))
+            elif auth_type == "github":
+                # 支持多个 GitHub 账号
+                for idx, github_account in enumerate(github_accounts):
+                    account_label = f"github[{idx}]" if len(github_accounts) > 1 else "github"
+                    plan.append((account_label, partial(self._auth_with_github, account_label, github_account)))
+            elif auth_type == "linux.do":
+                # 支持多个 Linux.do 账号
+                for idx, linuxdo_account in enumerate(linuxdo_accounts):
+                    account_label = f"linux.do[{idx}]" if len(linuxdo_accounts) > 1 else "linux.do"
+                    plan.append((account_label, partial(self._auth_with_linuxdo, account_label, linuxdo_account)))
+        return plan
+
+    async def execute(self, completed: dict[str, dict] | None = None) -> list[tuple[str, bool, dict | None]]:
+        """为单个账号执行签到操作，支持多种认证方式
+
+        auth_strategy 为 all 时依次执行所有认证方式；为 first-success 时遇到第一个成功的认证方式即停止，
+        后续认证方式（通常是需要启动浏览器的 OAuth 登录）不再执行
+
+        Args:
+            completed: 签到台账中今日已成功的认证方式 {认证方式: 用户信息}，直接使用记录的结果，不再执行
+        """
+        print(f"\n\n⏳ Starting to process {self.account_name}")
+
+        completed = completed or {}
+        auth_strategy = self.account_config.get_auth_strategy(self.provider_config)
+        plan = self._build_auth_plan(self.account_config.get_auth_order(self.provider_config))
+        results = []
+        bypass_prepared = False
+
+        for step, (label, auth) in enumerate(plan):
+            if label in completed:
+                print(f"⏭️ {self.account_name}: {label} already checked in today, skipping")
+                auth_method, success, user_info = label, True, completed[label]
+            elif circuit_breakers.is_open(self.provider_config.origin):
+                # provider 在本次运行中连续失败，不再启动浏览器和执行签到流程
+                print(f"⛔ {self.account_name}: {self.provider_config.origin} circuit open, skipping {label} authentication")
+                auth_method, success, user_info = label, False, {"error": "Provider unavailable (circuit open)"}
+            else:
+                # 只有需要实际执行认证时才准备 bypass
+                if not bypass_prepared:
+                    await self.prepare_bypass(lazy=self.provider_config.use_lazy_bypass())
+                    bypass_prepared = True
+                auth_method, success, user_info = await auth()
+            results.append((auth_method, success, user_info))
+            if success and auth_strategy != "all":
+                skipped = len(plan) - step - 1
+                if skipped:
+                    print(f"⏭️ {self.account_name}: {auth_method} succeeded, skipping {skipped} remaining authentication method(s) ({auth_strategy})")
+                break
 
         if not results:
             print(f"❌ {self.account_name}: No valid authentication method found in configuration")
@@ -2,9 +2,10 @@
 """
 qaq.al 自动签到 - CheckIn 类
 PoW 签到流程: 获取 cf_clearance → 检查签到状态 → 获取挑战 → 计算 nonce → 提交签到
+prepare / solve / submit 分别对应网络、计算、网络阶段，供 main 按流水线并行执行多个账号
 """
 
-import hashlib
+import asyncio
 import statistics
 import sys
 import time
@@ -13,51 +14,55 @@ from pathlib import Path
 from curl_cffi import requests as curl_requests
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from hps_cache import hps_cache
+from pipeline import PowTask
+from pow_solver import count_leading_zero_bits, pow_solver, search_range
+from tier_planner import tier_planner
+
+from utils.bypass_broker import bypass_broker
 from utils.get_cf_clearance import get_cf_clearance
 from utils.get_headers import get_curl_cffi_impersonate
-from utils.http_utils import proxy_resolve, response_resolve
+from utils.http_utils import is_challenge_response, proxy_resolve, response_resolve
 
 BASE_URL = "https://sign.qaq.al"
 BENCH_ROUNDS = 3
 BENCH_DURATION_MS = 1200
+# 测算算力时每批计算的 nonce 数
+BATCH_SIZE = 10000
+# 单线程求解时每批计算的 nonce 数，每批结束后输出进度
+PROGRESS_BATCH_SIZE = 500000
 
 
-def count_leading_zero_bits(hash_bytes: bytes) -> int:
-    """计算哈希值的前导零位数"""
-    count = 0
-    for byte in hash_bytes:
-        if byte == 0:
-            count += 8
-        else:
-            b = byte
-            while (b & 0x80) == 0 and count < 256:
-                count += 1
-                b <<= 1
-            break
-    return count
+def _measure_single_hps(duration: float) -> int:
+    """在当前进程中测算单线程算力"""
+    challenge_prefix = b"benchmark:"
+    nonce = 0
+    start = time.time()
+    end_time = start + duration
+
+    while time.time() < end_time:
+        # 难度 256 不会命中，只用于计时
+        search_range(challenge_prefix, 256, nonce, nonce + BATCH_SIZE)
+        nonce += BATCH_SIZE
+
+    elapsed = time.time() - start
+    return round(nonce / elapsed) if elapsed > 0 else 0
 
 
 def benchmark_hps() -> int:
     """自动测算本机 HPS (Hashes Per Second)
 
     执行 3 轮测试，每轮 1.2 秒，取中位数。
-    使用纯 Python hashlib SHA-256，与 WASM 算法一致。
+    使用与求解相同的 hashlib SHA-256 内核和求解模式（单线程或多进程），与 WASM 算法一致。
     """
-    print("⚙️ 正在测算本机算力 (HPS)...")
-    challenge_prefix = b"benchmark:"
+    print(f"⚙️ 正在测算本机算力 (HPS, {pow_solver.mode})...")
     samples = []
 
     for i in range(BENCH_ROUNDS):
-        nonce = 0
-        start = time.time()
-        end_time = start + BENCH_DURATION_MS / 1000
-
-        while time.time() < end_time:
-            hashlib.sha256(challenge_prefix + str(nonce).encode()).digest()
-            nonce += 1
-
-        elapsed = time.time() - start
-        hps = round(nonce / elapsed) if elapsed > 0 else 0
+        if pow_solver.workers > 1:
+            hps = pow_solver.measure_hps(BENCH_DURATION_MS / 1000)
+        else:
+            hps = _measure_single_hps(BENCH_DURATION_MS / 1000)
         samples.append(hps)
         print(f"  第 {i + 1}/{BENCH_ROUNDS} 轮: {hps:,} H/s")
 
@@ -66,34 +71,43 @@ def benchmark_hps() -> int:
     return final_hps
 
 
+def get_hps() -> int:
+    """获取当前求解模式的算力，缓存有效时直接使用缓存，否则测算并写入缓存"""
+    cached = hps_cache.get(pow_solver.mode)
+    if cached:
+        print(f"⚙️ 使用缓存的算力: {cached:,} H/s ({pow_solver.mode})")
+        return cached
+
+    hps = benchmark_hps()
+    hps_cache.update(pow_solver.mode, hps)
+    return hps
+
+
 def calculate_nonce(challenge: str, difficulty: int) -> dict:
     """计算满足难度要求的 nonce
 
     算法: SHA-256(challenge + ":" + str(nonce))，找到前导零位数 >= difficulty 的 nonce。
+    按批次调用 search_range，每批结束后输出进度。
     """
     print(f"  开始计算 nonce (difficulty={difficulty})...")
     challenge_prefix = (challenge + ":").encode()
     nonce = 0
     start = time.time()
-    last_report = 0
 
     while True:
-        hash_bytes = hashlib.sha256(challenge_prefix + str(nonce).encode()).digest()
-        leading = count_leading_zero_bits(hash_bytes)
-
-        if nonce - last_report >= 100000:
-            last_report = nonce
+        found = search_range(challenge_prefix, difficulty, nonce, nonce + PROGRESS_BATCH_SIZE)
+        if found:
+            nonce, hash_bytes = found
+            leading = count_leading_zero_bits(hash_bytes)
             elapsed = time.time() - start
-            hps = round(nonce / elapsed) if elapsed > 0 else 0
-            print(f"    进度: {nonce:,} | leading={leading} | {hps:,} H/s | {elapsed:.1f}s")
-
-        if leading >= difficulty:
-            elapsed = time.time() - start
-            hps = round(nonce / elapsed) if elapsed > 0 else 0
+            hps = round((nonce + 1) / elapsed) if elapsed > 0 else 0
             print(f"  ✓ 找到 nonce={nonce}, leading={leading}, 耗时 {elapsed:.1f}s, {hps:,} H/s")
             return {"nonce": nonce, "leading": leading, "hash": hash_bytes.hex(), "elapsed": round(elapsed, 1), "hps": hps}
 
-        nonce += 1
+        nonce += PROGRESS_BATCH_SIZE
+        elapsed = time.time() - start
+        hps = round(nonce / elapsed) if elapsed > 0 else 0
+        print(f"    进度: {nonce:,} | {hps:,} H/s | {elapsed:.1f}s")
 
 
 class CheckIn:
@@ -105,8 +119,14 @@ class CheckIn:
         self.http_proxy_config = proxy_resolve(global_proxy)
         # camoufox 代理格式与 curl_cffi 不同
         self.camoufox_proxy_config = global_proxy if global_proxy else None
+        # 最近一次 /api/me 请求是否被 Cloudflare 拦截（验证页面或 403），用于判断共享的 cf_clearance 是否失效
+        self.challenge_detected = False
 
-    async def _get_cf_clearance(self) -> tuple[dict | None, dict | None]:
+    def _get_bypass_key(self) -> str:
+        """cf_clearance 的共享缓存 key，与 Camoufox 启动参数 os="macos" 保持一致"""
+        return bypass_broker.make_key(BASE_URL, self.camoufox_proxy_config, "macos")
+
+    async def _fetch_cf_clearance(self) -> tuple[dict | None, dict | None]:
         """通过 Camoufox 浏览器获取 cf_clearance cookie 和浏览器指纹"""
         print(f"  {self.account_name}: 正在通过浏览器获取 cf_clearance...")
         try:
@@ -124,6 +144,14 @@ class CheckIn:
             print(f"  {self.account_name}: ❌ 获取 cf_clearance 异常: {e}")
             return None, None
 
+    async def _get_cf_clearance(self) -> tuple[dict | None, dict | None, bool]:
+        """获取 cf_clearance，同一代理下的所有 sid 通过 bypass_broker 共享，只在缓存失效时启动浏览器
+
+        Returns:
+            (cookies, 浏览器指纹头部, 是否来自缓存)
+        """
+        return await bypass_broker.get(self._get_bypass_key(), self._fetch_cf_clearance, self.account_name)
+
     def _build_session(
         self, sid: str, cf_cookies: dict | None, browser_headers: dict | None
     ) -> curl_requests.Session:
@@ -151,8 +179,13 @@ class CheckIn:
     def _check_me(self, session: curl_requests.Session) -> dict | None:
         """调用 /api/me 检查当前用户状态和今日签到情况"""
         print(f"  {self.account_name}: 检查签到状态...")
+        self.challenge_detected = False
         try:
             resp = session.get(f"{BASE_URL}/api/me", timeout=30)
+            if resp.status_code == 403 or is_challenge_response(resp):
+                self.challenge_detected = True
+                print(f"  ⚠️ {self.account_name}: 请求被 Cloudflare 拦截 (HTTP {resp.status_code})")
+                return None
             data = response_resolve(resp, "check_me", self.account_name)
             if data and "user" in data:
                 user = data["user"]
@@ -192,6 +225,22 @@ class CheckIn:
             print(f"  ❌ {self.account_name}: 获取挑战异常 - {e}")
             return None
 
+    def _get_planned_challenge(
+        self, session: curl_requests.Session, max_tier: int, hps: int
+    ) -> tuple[int, dict] | None:
+        """从 max_tier 开始获取挑战，预计求解时间超出 QAQ_AL_TIME_BUDGET 时降低难度等级
+
+        Returns:
+            (难度等级, 挑战数据)，获取挑战失败时返回 None
+        """
+        for tier in tier_planner.candidate_tiers(max_tier):
+            challenge_data = self._get_challenge(session, tier, hps)
+            if not challenge_data:
+                return None
+            if tier_planner.accept(tier, challenge_data["difficulty"], hps, challenge_data.get("targetSeconds")):
+                return tier, challenge_data
+        return None
+
     def _submit(self, session: curl_requests.Session, challenge_id: str, nonce: int, tier: int) -> dict | None:
         """提交签到"""
         print(f"  {self.account_name}: 提交签到...")
@@ -216,50 +265,93 @@ class CheckIn:
             print(f"  ❌ {self.account_name}: 提交异常 - {e}")
             return None
 
-    async def execute(self, sid: str, tier: int = 4) -> tuple[bool, dict]:
-        """执行完整签到流程
+    async def prepare(self, sid: str, tier: int = 4, hps: int | None = None) -> PowTask:
+        """签到的网络阶段：获取 cf_clearance、检查签到状态、获取挑战
 
         Args:
             sid: 用户 session ID (从 cookie 获取)
-            tier: 难度等级 1-4，默认 4 (最高奖励)
+            tier: 最高难度等级 1-4，默认 4 (最高奖励)，设置了 QAQ_AL_TIME_BUDGET 时可能降低
+            hps: 算力，None 表示通过 get_hps 获取（可能需要测算）
 
         Returns:
-            (是否成功, 签到结果或错误信息)
+            待求解的任务；今日已签到或失败时 outcome 为最终结果
         """
         print(f"\n⏳ 开始处理 {self.account_name}")
 
-        # 1. 获取 cf_clearance
-        cf_cookies, browser_headers = await self._get_cf_clearance()
+        # 1. 获取 cf_clearance（所有 sid 共享）
+        cf_cookies, browser_headers, from_cache = await self._get_cf_clearance()
 
         session = self._build_session(sid, cf_cookies, browser_headers)
         try:
             # 2. 检查是否已签到
-            me_data = self._check_me(session)
+            me_data = await asyncio.to_thread(self._check_me, session)
+            if not me_data and from_cache and self.challenge_detected:
+                # 共享的 cf_clearance 已失效，重新获取后重试一次；sid 失效等其他错误与 cf_clearance 无关，不影响其他账号
+                print(f"  🔄 {self.account_name}: 共享的 cf_clearance 已失效，重新获取")
+                bypass_broker.invalidate(self._get_bypass_key(), stale_cookies=cf_cookies)
+                session.close()
+                cf_cookies, browser_headers, _ = await self._get_cf_clearance()
+                session = self._build_session(sid, cf_cookies, browser_headers)
+                me_data = await asyncio.to_thread(self._check_me, session)
+
             if me_data and me_data.get("signedInToday"):
                 today = me_data.get("todaySignin", {})
                 print(f"  ✅ {self.account_name}: 今日已签到，跳过 PoW")
-                return True, {
-                    "reward_final": today.get("reward_final", "0"),
-                    "tier_name": today.get("tier_name", ""),
-                    "already_signed": True,
-                }
+                session.close()
+                return PowTask(
+                    outcome=(
+                        True,
+                        {
+                            "reward_final": today.get("reward_final", "0"),
+                            "tier_name": today.get("tier_name", ""),
+                            "already_signed": True,
+                        },
+                    )
+                )
 
             if not me_data:
-                return False, {"error": "获取用户信息失败，可能 cf_clearance 无效"}
-
-            # 3. 测算 HPS
-            hps = benchmark_hps()
-
-            # 4. 获取挑战
-            challenge_data = self._get_challenge(session, tier, hps)
-            if not challenge_data:
-                return False, {"error": "获取挑战失败"}
-
-            # 5. 计算 nonce
+                session.close()
+                if self.challenge_detected:
+                    return PowTask(outcome=(False, {"error": "获取用户信息失败，cf_clearance 无效"}))
+                return PowTask(outcome=(False, {"error": "获取用户信息失败，sid 可能已失效"}))
+
+            # 3. 测算 HPS（优先使用缓存），测算是 CPU 密集任务，在线程中执行，不阻塞事件循环
+            if hps is None:
+                hps = await asyncio.to_thread(get_hps)
+
+            # 4. 获取挑战（在时间预算内选择奖励最高的难度等级）
+            planned = await asyncio.to_thread(self._get_planned_challenge, session, tier, hps)
+            if not planned:
+                session.close()
+                return PowTask(outcome=(False, {"error": "获取挑战失败"}))
+            tier, challenge_data = planned
+            return PowTask(session=session, tier=tier, challenge_data=challenge_data, hps=hps)
+        except Exception as e:
+            print(f"❌ {self.account_name}: 签到流程异常 - {e}")
+            session.close()
+            return PowTask(outcome=(False, {"error": f"签到流程异常: {str(e)}"}))
+
+    def solve(self, task: PowTask) -> dict:
+        """签到的计算阶段：计算 nonce（多核时使用多进程求解），同步阻塞"""
+        challenge_data = task.challenge_data
+        print(f"  🧮 {self.account_name}: 开始求解 tier={task.tier}")
+        if pow_solver.workers > 1:
+            result = pow_solver.solve(challenge_data["challenge"], challenge_data["difficulty"])
+        else:
             result = calculate_nonce(challenge_data["challenge"], challenge_data["difficulty"])
+        hps_cache.record_solve(pow_solver.mode, result["hps"], result["elapsed"])
+        return result
+
+    async def submit(self, task: PowTask, result: dict) -> tuple[bool, dict]:
+        """签到的提交阶段：提交 nonce 并关闭 session
 
-            # 6. 提交签到
-            submit_data = self._submit(session, challenge_data["challengeId"], result["nonce"], tier)
+        Returns:
+            (是否成功, 签到结果或错误信息)
+        """
+        try:
+            submit_data = await asyncio.to_thread(
+                self._submit, task.session, task.challenge_data["challengeId"], result["nonce"], task.tier
+            )
             if not submit_data:
                 return False, {"error": "提交签到失败"}
 
@@ -269,6 +361,7 @@ class CheckIn:
                 "multiplier": submit_data.get("multiplier", "1"),
                 "tier_name": submit_data.get("tierName", ""),
                 "notes": submit_data.get("notes", ""),
+                "tier": task.tier,
                 "pow_elapsed": result["elapsed"],
                 "pow_hps": result["hps"],
             }
@@ -276,4 +369,26 @@ class CheckIn:
             print(f"❌ {self.account_name}: 签到流程异常 - {e}")
             return False, {"error": f"签到流程异常: {str(e)}"}
         finally:
-            session.close()
+            task.close()
+
+    async def execute(self, sid: str, tier: int = 4) -> tuple[bool, dict]:
+        """执行完整签到流程
+
+        Args:
+            sid: 用户 session ID (从 cookie 获取)
+            tier: 最高难度等级 1-4，默认 4 (最高奖励)，设置了 QAQ_AL_TIME_BUDGET 时可能降低
+
+        Returns:
+            (是否成功, 签到结果或错误信息)
+        """
+        task = await self.prepare(sid, tier)
+        if task.outcome:
+            return task.outcome
+
+        try:
+            result = await asyncio.to_thread(self.solve, task)
+        except Exception as e:
+            print(f"❌ {self.account_name}: 签到流程异常 - {e}")
+            task.close()
+            return False, {"error": f"签到流程异常: {str(e)}"}
+        return await self.submit(task, result)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+qaq.al 算力 (HPS) 缓存
+
+按 (CPU 型号, 核心数, 求解模式) 缓存测得的算力，缓存有效期内不再重复测算；
+每次实际求解的算力也会更新缓存，使发送给 /api/pow/challenge 的 hps 与当前求解模式的实际算力保持一致
+"""
+
+import json
+import os
+import platform
+import time
+
+DEFAULT_CACHE_FILE = "qaq_al_hps.json"
+DEFAULT_TTL_HOURS = 72
+
+# 求解时间太短时测得的算力误差较大，不用于更新缓存
+MIN_SOLVE_SECONDS = 1.0
+# 实际求解算力与缓存值的加权系数
+SOLVE_WEIGHT = 0.5
+
+
+def cpu_model() -> str:
+    """获取 CPU 型号"""
+    try:
+        if os.path.exists("/proc/cpuinfo"):
+            with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith("model name"):
+                        return line.split(":", 1)[1].strip()
+    except Exception:
+        pass
+    return platform.processor() or platform.machine() or "unknown"
+
+
+class HpsCache:
+    """算力缓存
+
+    - QAQ_AL_HPS_CACHE_FILE: 缓存文件路径，默认 qaq_al_hps.json
+    - QAQ_AL_HPS_TTL_HOURS: 缓存有效期（小时），默认 72，设置为 0 时每次都重新测算
+    """
+
+    def __init__(self):
+        self._entries: dict[str, dict] | None = None
+
+    @property
+    def cache_file(self) -> str:
+        return os.getenv("QAQ_AL_HPS_CACHE_FILE", DEFAULT_CACHE_FILE)
+
+    @property
+    def ttl(self) -> float:
+        try:
+            return max(0.0, float(os.getenv("QAQ_AL_HPS_TTL_HOURS", str(DEFAULT_TTL_HOURS)))) * 3600
+        except ValueError:
+            return DEFAULT_TTL_HOURS * 3600
+
+    @staticmethod
+    def make_key(mode: str) -> str:
+        """生成缓存 key
+
+        Args:
+            mode: 求解模式（single / parallel-N）
+        """
+        return f"{cpu_model()}|{os.cpu_count() or 1}|{mode}"
+
+    def _load(self) -> dict[str, dict]:
+        """加载缓存（只加载一次）"""
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._entries = data
+        except Exception as e:
+            print(f"⚠️ 加载算力缓存失败: {e}")
+        return self._entries
+
+    def _save(self) -> None:
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(self._load(), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"⚠️ 保存算力缓存失败: {e}")
+
+    def get(self, mode: str) -> int | None:
+        """获取有效期内的缓存算力，没有时返回 None"""
+        entry = self._load().get(self.make_key(mode))
+        if not entry or time.time() - entry.get("updated_at", 0) > self.ttl:
+            return None
+        return entry.get("hps") or None
+
+    def update(self, mode: str, hps: int) -> None:
+        """保存测算得到的算力"""
+        if hps <= 0:
+            return
+        self._load()[self.make_key(mode)] = {"hps": int(hps), "updated_at": time.time()}
+        self._save()
+
+    def record_solve(self, mode: str, hps: int, elapsed: float) -> None:
+        """用实际求解的算力更新缓存（与缓存值加权平均）
+
+        Args:
+            mode: 求解模式
+            hps: 实际求解算力
+            elapsed: 求解耗时（秒）
+        """
+        if hps <= 0 or elapsed < MIN_SOLVE_SECONDS:
+            return
+        cached = self.get(mode)
+        if cached:
+            hps = round(cached * (1 - SOLVE_WEIGHT) + hps * SOLVE_WEIGHT)
+        self.update(mode, hps)
+
+
+hps_cache = HpsCache()
@@ -13,11 +13,15 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 from checkin import CheckIn
+from pipeline import run_pipeline
+from pow_solver import pow_solver
+from tier_planner import tier_planner
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.notify import notify
 from utils.balance_hash import load_balance_hash, save_balance_hash
+from utils.browser_pool import browser_pool
 
 load_dotenv(override=True)
 
@@ -96,44 +100,49 @@ async def main():
     # 签到等级
     tier = int(os.getenv("QAQ_AL_TIER", "4"))
     print(f"⚙️ 签到难度等级: {tier}")
+    if tier_planner.budget:
+        print(f"⚙️ 每个账号 PoW 时间预算: {tier_planner.budget:.0f}s，超出时自动降低难度等级")
 
     success_count = 0
     total_count = len(sids)
     notification_content = []
     current_info = {}
 
-    for i, sid in enumerate(sids):
+    checkins = [CheckIn(f"account_{i + 1}", global_proxy=global_proxy) for i in range(len(sids))]
+    results = await run_pipeline(
+        [checkin.account_name for checkin in checkins],
+        prepare=lambda i, hps: checkins[i].prepare(sids[i], tier=tier, hps=hps),
+        solve=lambda i, task: checkins[i].solve(task),
+        submit=lambda i, task, result: checkins[i].submit(task, result),
+    )
+
+    for i, (success, result) in enumerate(results):
         account_name = f"account_{i + 1}"
 
         if notification_content:
             notification_content.append("\n-------------------------------")
 
-        try:
-            print(f"🌀 处理 {account_name}")
-            checkin = CheckIn(account_name, global_proxy=global_proxy)
-            success, result = await checkin.execute(sid, tier=tier)
-
-            if success:
-                success_count += 1
-                current_info[account_name] = result
-                if result.get("already_signed"):
-                    notification_content.append(
-                        f"  📝 {account_name}: "
-                        f"✅ 今日已签到 | 💰奖励 {result.get('reward_final', '?')} ({result.get('tier_name', '')})"
-                    )
-                else:
-                    notification_content.append(
-                        f"  📝 {account_name}: "
-                        f"💰奖励 {result.get('reward_final', '?')} ({result.get('tier_name', '')}) | "
-                        f"⚡PoW {result.get('pow_elapsed', '?')}s @ {result.get('pow_hps', 0):,} H/s"
-                    )
+        if success:
+            success_count += 1
+            current_info[account_name] = result
+            if result.get("already_signed"):
+                notification_content.append(
+                    f"  📝 {account_name}: "
+                    f"✅ 今日已签到 | 💰奖励 {result.get('reward_final', '?')} ({result.get('tier_name', '')})"
+                )
             else:
-                error_msg = result.get("error", "未知错误") if result else "未知错误"
-                notification_content.append(f"  ❌ {account_name}: {error_msg}")
+                notification_content.append(
+                    f"  📝 {account_name}: "
+                    f"💰奖励 {result.get('reward_final', '?')} ({result.get('tier_name', '')}) | "
+                    f"⚡PoW {result.get('pow_elapsed', '?')}s @ {result.get('pow_hps', 0):,} H/s"
+                )
+        else:
+            error_msg = result.get("error", "未知错误") if result else "未知错误"
+            notification_content.append(f"  ❌ {account_name}: {error_msg}")
 
-        except Exception as e:
-            print(f"❌ {account_name} 处理异常: {e}")
-            notification_content.append(f"  ❌ {account_name} 异常: {str(e)[:100]}...")
+    # 关闭浏览器池中的浏览器进程和 PoW 求解进程
+    await browser_pool.close()
+    pow_solver.close()
 
     # hash 比较
     current_hash = generate_checkin_hash(current_info)
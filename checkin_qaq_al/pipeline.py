@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+qaq.al 多账号签到流水线
+
+每个账号的签到分为准备（网络）、求解（计算）、提交（网络）三个阶段：
+准备阶段依次执行，并与上一个账号的求解阶段重叠；求解阶段在线程中依次执行（多核时由多进程求解器使用所有核心）；
+提交阶段不阻塞下一个账号的求解。已获取挑战但尚未开始求解的账号数不超过 QAQ_AL_PREFETCH，避免挑战在求解前过期
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from curl_cffi import requests as curl_requests
+
+
+@dataclass
+class PowTask:
+    """准备好待求解的签到任务"""
+
+    session: curl_requests.Session | None = None
+    tier: int = 0
+    challenge_data: dict | None = None
+    hps: int = 0
+    # 今日已签到或准备阶段失败时的最终结果，此时不需要求解
+    outcome: tuple[bool, dict] | None = None
+
+    def close(self) -> None:
+        if self.session:
+            self.session.close()
+            self.session = None
+
+
+def get_prefetch() -> int:
+    """QAQ_AL_PREFETCH: 求解当前账号时最多提前准备好（已获取挑战）的账号数，默认 1"""
+    try:
+        return max(1, int(os.getenv("QAQ_AL_PREFETCH", "1")))
+    except ValueError:
+        return 1
+
+
+async def run_pipeline(
+    account_names: list[str],
+    prepare: Callable[[int, int | None], Awaitable[PowTask]],
+    solve: Callable[[int, PowTask], dict],
+    submit: Callable[[int, PowTask, dict], Awaitable[tuple[bool, dict]]],
+    prefetch: int | None = None,
+) -> list[tuple[bool, dict]]:
+    """按流水线执行所有账号签到
+
+    Args:
+        account_names: 账号名称列表（用于日志输出）
+        prepare: 准备阶段 (账号序号, 算力) -> 任务，算力为 None 时由准备阶段获取
+        solve: 求解阶段 (账号序号, 任务) -> 求解结果，同步阻塞，在线程中执行
+        submit: 提交阶段 (账号序号, 任务, 求解结果) -> (是否成功, 签到结果或错误信息)
+        prefetch: 已准备但尚未开始求解的账号数上限，None 表示使用 QAQ_AL_PREFETCH 环境变量
+
+    Returns:
+        按账号顺序排列的 (是否成功, 签到结果或错误信息) 列表
+    """
+    results: list[tuple[bool, dict]] = [(False, {"error": "未执行"})] * len(account_names)
+    ready: asyncio.Queue = asyncio.Queue()
+    # 准备账号前先占用一个名额，该账号开始求解（或不需要求解）时释放
+    prefetch_slots = asyncio.Semaphore(prefetch or get_prefetch())
+
+    async def produce():
+        hps = None
+        try:
+            for i, account_name in enumerate(account_names):
+                await prefetch_slots.acquire()
+                print(f"🌀 处理 {account_name}")
+                try:
+                    task = await prepare(i, hps)
+                except Exception as e:
+                    print(f"❌ {account_name} 处理异常: {e}")
+                    task = PowTask(outcome=(False, {"error": f"异常: {str(e)[:100]}..."}))
+                # 算力只测算一次，避免与其他账号的求解同时测算
+                hps = task.hps or hps
+                await ready.put((i, task))
+        finally:
+            await ready.put(None)
+
+    async def finish(i: int, task: PowTask, result: dict):
+        results[i] = await submit(i, task, result)
+
+    async def consume():
+        submits = []
+        while (item := await ready.get()) is not None:
+            i, task = item
+            prefetch_slots.release()
+            if task.outcome:
+                results[i] = task.outcome
+                continue
+            try:
+                result = await asyncio.to_thread(solve, i, task)
+            except Exception as e:
+                print(f"❌ {account_names[i]} 求解异常: {e}")
+                task.close()
+                results[i] = (False, {"error": f"求解异常: {str(e)[:100]}..."})
+                continue
+            submits.append(asyncio.create_task(finish(i, task, result)))
+        await asyncio.gather(*submits)
+
+    started = time.time()
+    await asyncio.gather(produce(), consume())
+    print(f"\n⏱️ 所有账号处理完成，总耗时 {time.time() - started:.1f}s")
+    return results
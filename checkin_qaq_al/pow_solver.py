@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+qaq.al PoW 多进程求解器
+
+算法与 checkin.calculate_nonce 一致: SHA-256(challenge + ":" + str(nonce))，找到前导零位数 >= difficulty 的 nonce。
+nonce 空间按固定大小的块交错分配给各个工作进程（进程 k 负责第 k, k+N, k+2N... 块），
+任一进程找到结果后通知所有进程停止。工作进程在第一次求解时启动，之后的账号复用，避免重复启动进程的开销
+
+单核对比测试: python checkin_qaq_al/pow_solver.py [哈希数]
+"""
+
+import hashlib
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+# 每个工作进程一次处理的 nonce 数，处理完一块后检查停止信号并更新计数
+CHUNK_SIZE = 20000
+PROGRESS_INTERVAL = 5.0
+
+
+def count_leading_zero_bits(hash_bytes: bytes) -> int:
+    """计算哈希值的前导零位数"""
+    count = 0
+    for byte in hash_bytes:
+        if byte == 0:
+            count += 8
+        else:
+            b = byte
+            while (b & 0x80) == 0 and count < 256:
+                count += 1
+                b <<= 1
+            break
+    return count
+
+
+# 按 1000 个 nonce 分组：同一组的 nonce 共享十进制高位，只需追加 3 位低位后缀
+_GROUP_SIZE = 1000
+_LOW_SUFFIXES = [b"%03d" % low for low in range(_GROUP_SIZE)]
+_SMALL_NONCES = [str(nonce).encode() for nonce in range(_GROUP_SIZE)]
+
+
+def difficulty_target(difficulty: int) -> bytes | None:
+    """把难度转换为 32 字节的比较阈值
+
+    前导零位数 >= difficulty 等价于 SHA-256 摘要按大端整数小于 2^(256-difficulty)，
+    相同长度的 bytes 按字典序比较与按大端整数比较一致，因此每个哈希只需一次比较
+
+    Returns:
+        阈值，difficulty <= 0 时返回 None（任意哈希都满足）
+    """
+    if difficulty <= 0:
+        return None
+    return (1 << (256 - min(difficulty, 256))).to_bytes(32, "big")
+
+
+def search_range(prefix: bytes, difficulty: int, start: int, stop: int) -> tuple[int, bytes] | None:
+    """在 [start, stop) 中按顺序查找第一个满足难度要求的 nonce
+
+    结果与逐个计算 SHA-256(prefix + str(nonce)) 并统计前导零位数完全一致：
+    - 常量前缀只哈希一次，每个 nonce 复制哈希状态后只追加 nonce 部分
+    - 每 1000 个 nonce 共享十进制高位的哈希状态，组内只追加预先编码好的 3 位低位后缀
+    - 用 bytes 比较代替逐字节统计前导零位数
+
+    Returns:
+        (nonce, 摘要)，未找到时返回 None
+    """
+    target = difficulty_target(difficulty)
+    if target is None:
+        return (start, hashlib.sha256(prefix + str(start).encode()).digest()) if start < stop else None
+
+    base = hashlib.sha256(prefix)
+    nonce = start
+    while nonce < stop:
+        high, low = divmod(nonce, _GROUP_SIZE)
+        group_stop = min(stop, (high + 1) * _GROUP_SIZE) - high * _GROUP_SIZE
+        if high:
+            group = base.copy()
+            group.update(str(high).encode())
+            suffixes = _LOW_SUFFIXES
+        else:
+            group = base
+            suffixes = _SMALL_NONCES
+        copy = group.copy
+        for index in range(low, group_stop):
+            h = copy()
+            h.update(suffixes[index])
+            digest = h.digest()
+            if digest < target:
+                return high * _GROUP_SIZE + index, digest
+        nonce = high * _GROUP_SIZE + group_stop
+    return None
+
+
+def get_pow_workers() -> int:
+    """QAQ_AL_POW_WORKERS: PoW 求解进程数，默认 CPU 核心数，设置为 1 时在当前进程中单线程求解"""
+    default = os.cpu_count() or 1
+    try:
+        return max(1, int(os.getenv("QAQ_AL_POW_WORKERS", str(default))))
+    except ValueError:
+        return default
+
+
+def _worker_main(index: int, workers: int, jobs, results, stop, counters) -> None:
+    """工作进程：循环接收求解任务，None 表示退出"""
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        job_id, prefix, difficulty = job
+        chunk = index
+        while not stop.is_set():
+            start = chunk * CHUNK_SIZE
+            found = search_range(prefix, difficulty, start, start + CHUNK_SIZE)
+            counters[index] += (found[0] - start + 1) if found else CHUNK_SIZE
+            if found:
+                nonce, hash_bytes = found
+                results.put(("found", job_id, nonce, hash_bytes.hex()))
+                stop.set()
+                break
+            chunk += workers
+        results.put(("done", job_id, index))
+
+
+class PowSolver:
+    """多进程 PoW 求解器"""
+
+    def __init__(self, workers: int | None = None):
+        """
+        Args:
+            workers: 工作进程数，None 表示使用 QAQ_AL_POW_WORKERS 环境变量
+        """
+        self._workers = workers
+        self._processes: list = []
+        self._jobs: list = []
+        self._results = None
+        self._stop = None
+        self._counters = None
+        self._job_id = 0
+
+    @property
+    def workers(self) -> int:
+        if self._processes:
+            return len(self._processes)
+        return self._workers or get_pow_workers()
+
+    def _ensure_started(self) -> None:
+        if self._processes:
+            return
+        workers = self.workers
+        ctx = multiprocessing.get_context()
+        self._results = ctx.Queue()
+        self._stop = ctx.Event()
+        self._counters = ctx.Array("Q", workers, lock=False)
+        for index in range(workers):
+            jobs = ctx.Queue()
+            process = ctx.Process(
+                target=_worker_main,
+                args=(index, workers, jobs, self._results, self._stop, self._counters),
+                name=f"pow-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            self._jobs.append(jobs)
+            self._processes.append(process)
+        print(f"  ⚙️ 已启动 {workers} 个 PoW 求解进程")
+
+    @property
+    def mode(self) -> str:
+        """求解模式，用于区分不同模式下测得的算力"""
+        return "single" if self.workers <= 1 else f"parallel-{self.workers}"
+
+    def _run_job(self, prefix: bytes, difficulty: int, duration: float | None = None) -> tuple[tuple | None, int, float]:
+        """把求解任务分发给所有工作进程并等待结束
+
+        Args:
+            prefix: challenge + ":" 编码后的前缀
+            difficulty: 难度
+            duration: 最长运行时间（秒），到达后通知所有进程停止，None 表示直到找到结果
+
+        Returns:
+            (找到的结果消息或 None, 所有进程计算的哈希数, 耗时)
+        """
+        self._ensure_started()
+        self._job_id += 1
+        job_id = self._job_id
+
+        self._stop.clear()
+        baseline = sum(self._counters)
+        start = time.time()
+        for jobs in self._jobs:
+            jobs.put((job_id, prefix, difficulty))
+
+        found = None
+        done = 0
+        while done < self.workers:
+            timeout = PROGRESS_INTERVAL
+            if duration is not None:
+                timeout = max(0.05, min(timeout, start + duration - time.time()))
+            try:
+                message = self._results.get(timeout=timeout)
+            except queue.Empty:
+                if not all(process.is_alive() for process in self._processes):
+                    self.close()
+                    raise RuntimeError("PoW 求解进程意外退出")
+                if duration is not None:
+                    if time.time() - start >= duration:
+                        self._stop.set()
+                    continue
+                hashes = sum(self._counters) - baseline
+                elapsed = time.time() - start
+                hps = round(hashes / elapsed) if elapsed > 0 else 0
+                print(f"    进度: {hashes:,} | {hps:,} H/s | {elapsed:.1f}s")
+                continue
+            if message[1] != job_id:
+                continue
+            if message[0] == "found" and found is None:
+                found = message
+                self._stop.set()
+            elif message[0] == "done":
+                done += 1
+
+        return found, sum(self._counters) - baseline, time.time() - start
+
+    def solve(self, challenge: str, difficulty: int) -> dict:
+        """并行计算满足难度要求的 nonce
+
+        Returns:
+            与 calculate_nonce 相同格式的结果（nonce、leading、hash、elapsed、hps），hps 为所有进程的合计算力
+        """
+        print(f"  开始计算 nonce (difficulty={difficulty}, workers={self.workers})...")
+        found, hashes, elapsed = self._run_job((challenge + ":").encode(), difficulty)
+        hps = round(hashes / elapsed) if elapsed > 0 else 0
+        if found is None:
+            raise RuntimeError("PoW 求解未找到结果")
+        _, _, nonce, hash_hex = found
+        leading = count_leading_zero_bits(bytes.fromhex(hash_hex))
+        print(f"  ✓ 找到 nonce={nonce}, leading={leading}, 耗时 {elapsed:.1f}s, {hps:,} H/s ({self.workers} 进程)")
+        return {"nonce": nonce, "leading": leading, "hash": hash_hex, "elapsed": round(elapsed, 1), "hps": hps}
+
+    def measure_hps(self, duration: float) -> int:
+        """测算所有工作进程的合计算力
+
+        Args:
+            duration: 测算时间（秒）
+        """
+        # 难度 256 不会命中，只用于计时
+        _, hashes, elapsed = self._run_job(b"benchmark:", 256, duration)
+        return round(hashes / elapsed) if elapsed > 0 else 0
+
+    def close(self) -> None:
+        """停止所有工作进程"""
+        for jobs in self._jobs:
+            jobs.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._jobs = []
+
+
+pow_solver = PowSolver()
+
+
+def benchmark_kernels(count: int = 1000000) -> dict:
+    """对比逐个计算的原始实现和 search_range 内核的单核算力
+
+    Args:
+        count: 每种实现计算的哈希数
+
+    Returns:
+        {"naive_hps": 原始实现算力, "kernel_hps": 内核算力, "speedup": 加速比}
+    """
+    prefix = b"benchmark-challenge:"
+
+    start = time.perf_counter()
+    for nonce in range(count):
+        count_leading_zero_bits(hashlib.sha256(prefix + str(nonce).encode()).digest())
+    naive_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    search_range(prefix, 256, 0, count)
+    kernel_elapsed = time.perf_counter() - start
+
+    return {
+        "naive_hps": round(count / naive_elapsed),
+        "kernel_hps": round(count / kernel_elapsed),
+        "speedup": round(naive_elapsed / kernel_elapsed, 2),
+    }
+
+
+if __name__ == "__main__":
+    # 用法: python checkin_qaq_al/pow_solver.py [哈希数]
+    result = benchmark_kernels(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
+    print(f"原始实现: {result['naive_hps']:,} H/s")
+    print(f"求解内核: {result['kernel_hps']:,} H/s")
+    print(f"加速比: {result['speedup']}x")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+qaq.al 签到难度等级规划
+
+根据本机算力和 /api/pow/challenge 返回的 difficulty / targetSeconds 估算求解时间，
+在每个账号的时间预算内选择奖励最高的难度等级；超出预算的等级会被记住，后续账号不再请求
+"""
+
+import os
+
+
+def estimate_solve_seconds(difficulty: int, hps: int, target_seconds: float | None = None) -> float:
+    """估算求解时间（秒）
+
+    满足 difficulty 个前导零位的哈希平均需要计算 2^difficulty 次
+
+    Args:
+        difficulty: 难度（前导零位数）
+        hps: 算力
+        target_seconds: 服务端给出的预计时间，算力未知时使用
+    """
+    if hps > 0:
+        return (2**difficulty) / hps
+    return float(target_seconds or 0)
+
+
+class TierPlanner:
+    """难度等级规划器
+
+    - QAQ_AL_TIME_BUDGET: 每个账号求解 PoW 的时间预算（秒），默认 0（不限制，始终使用 QAQ_AL_TIER）
+    """
+
+    def __init__(self, budget: float | None = None):
+        """
+        Args:
+            budget: 时间预算（秒），None 表示使用 QAQ_AL_TIME_BUDGET 环境变量
+        """
+        self._budget = budget
+        # 本次运行中预计超出预算的等级
+        self._over_budget: set[int] = set()
+
+    @property
+    def budget(self) -> float:
+        if self._budget is not None:
+            return self._budget
+        try:
+            return max(0.0, float(os.getenv("QAQ_AL_TIME_BUDGET", "0")))
+        except ValueError:
+            return 0.0
+
+    def candidate_tiers(self, max_tier: int) -> list[int]:
+        """按奖励从高到低返回待尝试的等级，跳过已知超出预算的等级（最低等级始终保留）"""
+        tiers = [tier for tier in range(max_tier, 0, -1) if tier not in self._over_budget]
+        return tiers or [1]
+
+    def accept(self, tier: int, difficulty: int, hps: int, target_seconds: float | None = None) -> bool:
+        """判断挑战是否在时间预算内
+
+        Args:
+            tier: 难度等级
+            difficulty: 挑战难度
+            hps: 算力
+            target_seconds: 服务端给出的预计时间
+
+        Returns:
+            是否接受该挑战，最低等级或未设置预算时总是接受
+        """
+        budget = self.budget
+        if not budget:
+            return True
+
+        estimate = estimate_solve_seconds(difficulty, hps, target_seconds)
+        if estimate <= budget or tier <= 1:
+            print(f"  📐 tier={tier} 预计 {estimate:.1f}s，时间预算 {budget:.0f}s")
+            return True
+
+        print(f"  📐 tier={tier} 预计 {estimate:.1f}s 超出时间预算 {budget:.0f}s，降低难度等级")
+        self._over_budget.add(tier)
+        return False
+
+
+tier_planner = TierPlanner()
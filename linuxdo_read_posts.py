@@ -12,7 +12,7 @@ import random
 from datetime import datetime
 from dotenv import load_dotenv
 from camoufox.async_api import AsyncCamoufox
-from utils.browser_utils import take_screenshot, save_page_content_to_file
+from utils.browser_utils import block_heavy_resources, resource_blocking_enabled, take_screenshot, save_page_content_to_file
 from utils.notify import notify
 from utils.mask_utils import mask_username
 
@@ -379,6 +379,10 @@ class LinuxDoReadPosts:
                     await context.storage_state(path=cache_file_path)
                     print(f"✅ {self.masked_username}: Storage state saved to cache file")
 
+                # 浏览帖子时只需要页面内容，拦截图片、字体等资源
+                if resource_blocking_enabled():
+                    await block_heavy_resources(context, self.masked_username)
+
                 # 浏览帖子
                 print(f"ℹ️ {self.masked_username}: Starting to read posts...")
                 last_topic_id, read_count = await self._read_posts(page, base_topic_id, max_posts)
@@ -3,15 +3,26 @@
 自动签到脚本
 """
 
+import argparse
 import asyncio
 import hashlib
 import json
+import os
 import sys
 from datetime import datetime
+from functools import partial
 from dotenv import load_dotenv
-from utils.config import AppConfig
-from utils.notify import notify
+from utils.config import AccountConfig, AppConfig
+from utils.notify_outbox import notify_outbox
 from utils.balance_hash import load_balance_hash, save_balance_hash
+from utils.browser_pool import browser_pool
+from utils.identity_session import identity_sessions
+from utils.ledger import check_in_day, check_in_ledger
+from utils.http_session import http_sessions
+from utils.rate_limit import rate_limiter
+from utils.scheduler import AccountScheduler
+from utils.shard import account_shard, load_shard_results, parse_shard, save_shard_result
+from utils.trace import tracer
 from checkin import CheckIn
 
 load_dotenv(override=True)
@@ -34,116 +45,218 @@ def generate_balance_hash(balances: dict) -> str:
     return hashlib.sha256(balance_json.encode("utf-8")).hexdigest()[:16]
 
 
-async def main():
-    """运行签到流程
+async def process_account(index: int, account_config: AccountConfig, app_config: AppConfig, force: bool = False) -> dict:
+    """执行单个账号的签到并生成结果报告
+
+    Args:
+        index: 账号在配置中的索引
+        account_config: 账号配置
+        app_config: 应用配置
+        force: 忽略签到台账，重新执行今日已完成的认证方式
 
     Returns:
-            退出码: 0 表示至少有一个账号成功, 1 表示全部失败
+        包含 index、account_key、notification、balances、success_count、total_count、need_notify 的字典
     """
+    account_key = f"account_{index + 1}"
+    account_name = account_config.get_display_name(index)
+    report = {
+        "index": index,
+        "account_key": account_key,
+        "notification": "",
+        "balances": None,
+        "success_count": 0,
+        "total_count": 0,
+        "need_notify": False,
+    }
 
-    print("🚀 newapi.ai multi-account auto check-in script started (using Camoufox)")
-    print(f'🕒 Execution time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+    try:
+        provider_config = app_config.get_provider(account_config.provider)
+        if not provider_config:
+            print(f"❌ {account_name}: Provider '{account_config.provider}' configuration not found")
+            report["need_notify"] = True
+            report["notification"] = f"[FAIL] {account_name}: Provider '{account_config.provider}' configuration not found"
+            return report
+
+        print(f"🌀 Processing {account_name} using provider '{account_config.provider}'")
+        checkin = CheckIn(account_name, account_config, provider_config, global_proxy=app_config.global_proxy)
+        # 签到台账中今日已成功的认证方式直接使用记录的结果
+        ledger_key = check_in_ledger.make_key(account_config.provider, account_name)
+        ledger_day = check_in_day(provider_config.check_in_timezone)
+        completed = {} if force else check_in_ledger.completed(ledger_key, ledger_day)
+
+        with tracer.labels(account=account_name, provider=account_config.provider), tracer.span("account"):
+            results = await checkin.execute(completed=completed)
+
+        check_in_ledger.record(
+            ledger_key, ledger_day, [result for result in results if result[0] not in completed]
+        )
+
+        report["total_count"] = len(results)
+
+        # 处理多个认证方式的结果
+        account_success = False
+        successful_methods = []
+        failed_methods = []
+
+        this_account_balances = {}
+        # 构建详细的结果报告
+        account_result = f"📣 {account_name} Summary:\n"
+        for auth_method, success, user_info in results:
+            status = "✅ SUCCESS" if success else "❌ FAILED"
+            account_result += f"  {status} with {auth_method} authentication\n"
+
+            if success and user_info and user_info.get("success"):
+                account_success = True
+                report["success_count"] += 1
+                successful_methods.append(auth_method)
+                account_result += f"    💰 {user_info['display']}\n"
+                # 记录余额信息
+                current_quota = user_info["quota"]
+                current_used = user_info["used_quota"]
+                current_bonus = user_info["bonus_quota"]
+                this_account_balances[f"{auth_method}"] = {
+                    "quota": current_quota,
+                    "used": current_used,
+                    "bonus": current_bonus,
+                }
+            else:
+                failed_methods.append(auth_method)
+                error_msg = user_info.get("error", "Unknown error") if user_info else "Unknown error"
+                account_result += f"    🔺 {str(error_msg)}\n"
+
+        if account_success:
+            report["balances"] = this_account_balances
+
+        # 如果所有认证方式都失败，需要通知
+        if not account_success and results:
+            report["need_notify"] = True
+            print(f"🔔 {account_name} all authentication methods failed, will send notification")
+
+        # 如果有失败的认证方式，也通知
+        if failed_methods and successful_methods:
+            report["need_notify"] = True
+            print(f"🔔 {account_name} has some failed authentication methods, will send notification")
+
+        # 添加统计信息
+        success_count_methods = len(successful_methods)
+        failed_count_methods = len(failed_methods)
+
+        account_result += f"\n📊 Statistics: {success_count_methods}/{len(results)} methods successful"
+        if failed_count_methods > 0:
+            account_result += f" ({failed_count_methods} failed)"
+
+        report["notification"] = account_result
 
-    app_config = AppConfig.load_from_env()
-    print(f"⚙️ Loaded {len(app_config.providers)} provider(s)")
+    except Exception as e:
+        print(f"❌ {account_name} processing exception: {e}")
+        report["need_notify"] = True  # 异常也需要通知
+        report["notification"] = f"❌ {account_name} Exception: {str(e)[:100]}..."
+
+    return report
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="newapi.ai multi-account auto check-in")
+    parser.add_argument(
+        "--shard",
+        default=os.getenv("SHARD"),
+        help="只执行分片 i/N 中的账号（i 从 1 开始），结果写入 SHARD_RESULTS_DIR 由 --merge 汇总，也可以通过 SHARD 环境变量设置",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="*",
+        metavar="FILE",
+        help="合并分片结果文件（默认读取 SHARD_RESULTS_DIR 下的所有结果），计算余额变化并发送通知",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        default=os.getenv("FORCE_CHECK_IN", "false").lower() in ("true", "1", "yes"),
+        help="忽略签到台账，重新执行今日已完成的账号，也可以通过 FORCE_CHECK_IN 环境变量设置",
+    )
+    return parser.parse_args(argv)
+
+
+async def run_accounts(app_config: AppConfig, shard: tuple[int, int] | None = None, force: bool = False) -> list[dict]:
+    """执行账号签到
+
+    Args:
+        app_config: 应用配置
+        shard: (i, N)，只执行属于该分片的账号，None 表示执行所有账号
+        force: 忽略签到台账，重新执行今日已完成的账号
 
-    # 检查账号配置
-    if not app_config.accounts:
-        print("❌ Unable to load account configuration, program exits")
-        return 1
-    
-    print(f"⚙️ Found {len(app_config.accounts)} account(s)")
+    Returns:
+        按账号原始顺序排列的结果报告列表
+    """
+    accounts = list(enumerate(app_config.accounts))
+    if shard:
+        accounts = [
+            (i, account_config)
+            for i, account_config in accounts
+            if account_shard(account_config, i, shard[1]) == shard[0]
+        ]
+        print(f"⚙️ Shard {shard[0]}/{shard[1]}: running {len(accounts)} of {len(app_config.accounts)} account(s)")
+
+    # 所有账号共享按 host 的请求速率上限
+    rate_limiter.configure(app_config.get_rate_limits())
+
+    # 并发执行所有账号签到（受全局和 provider 并发上限约束）
+    scheduler = AccountScheduler(
+        max_concurrency=app_config.max_concurrency,
+        provider_limits=app_config.get_provider_concurrency_limits(),
+    )
+    print(f"⚙️ Running accounts with max concurrency {scheduler.max_concurrency}")
+    jobs = [
+        (account_config.provider, partial(process_account, i, account_config, app_config, force))
+        for i, account_config in accounts
+    ]
+    try:
+        return await scheduler.run(jobs)
+    finally:
+        # 所有账号执行完毕后关闭 OAuth 身份会话、浏览器池中的浏览器进程和 HTTP 连接池
+        await identity_sessions.close()
+        await browser_pool.close()
+        await http_sessions.close()
+        tracer.print_summary()
+        tracer.export()
+
+
+def finalize(reports: list[dict], missing_shards: list[int] | None = None) -> int:
+    """汇总结果、检查余额变化并发送通知
+
+    Args:
+        reports: 按账号原始顺序排列的结果报告列表
+        missing_shards: 合并分片结果时缺失的分片编号，结果不完整时不保存余额 hash
 
+    Returns:
+        退出码: 0 表示至少有一个账号成功, 1 表示全部失败或分片结果不完整
+    """
     # 加载余额hash
     last_balance_hash = load_balance_hash(BALANCE_HASH_FILE)
 
-    # 为每个账号执行签到
+    # 按账号原始顺序汇总结果
     success_count = 0
     total_count = 0
     notification_content = []
     current_balances = {}
     need_notify = False  # 是否需要发送通知
 
-    for i, account_config in enumerate(app_config.accounts):
-        account_key = f"account_{i + 1}"
-        account_name = account_config.get_display_name(i)
+    for report in reports:
         if len(notification_content) > 0:
             notification_content.append("\n-------------------------------")
+        notification_content.append(report["notification"])
+        success_count += report["success_count"]
+        total_count += report["total_count"]
+        if report["balances"]:
+            current_balances[report["account_key"]] = report["balances"]
+        if report["need_notify"]:
+            need_notify = True
 
-        try:
-            provider_config = app_config.get_provider(account_config.provider)
-            if not provider_config:
-                print(f"❌ {account_name}: Provider '{account_config.provider}' configuration not found")
-                need_notify = True
-                notification_content.append(
-                    f"[FAIL] {account_name}: Provider '{account_config.provider}' configuration not found"
-                )
-                continue
-
-            print(f"🌀 Processing {account_name} using provider '{account_config.provider}'")
-            checkin = CheckIn(account_name, account_config, provider_config, global_proxy=app_config.global_proxy)
-            results = await checkin.execute()
-
-            total_count += len(results)
-
-            # 处理多个认证方式的结果
-            account_success = False
-            successful_methods = []
-            failed_methods = []
-
-            this_account_balances = {}
-            # 构建详细的结果报告
-            account_result = f"📣 {account_name} Summary:\n"
-            for auth_method, success, user_info in results:
-                status = "✅ SUCCESS" if success else "❌ FAILED"
-                account_result += f"  {status} with {auth_method} authentication\n"
-
-                if success and user_info and user_info.get("success"):
-                    account_success = True
-                    success_count += 1
-                    successful_methods.append(auth_method)
-                    account_result += f"    💰 {user_info['display']}\n"
-                    # 记录余额信息
-                    current_quota = user_info["quota"]
-                    current_used = user_info["used_quota"]
-                    current_bonus = user_info["bonus_quota"]
-                    this_account_balances[f"{auth_method}"] = {
-                        "quota": current_quota,
-                        "used": current_used,
-                        "bonus": current_bonus,
-                    }
-                else:
-                    failed_methods.append(auth_method)
-                    error_msg = user_info.get("error", "Unknown error") if user_info else "Unknown error"
-                    account_result += f"    🔺 {str(error_msg)}\n"
-
-            if account_success:
-                current_balances[account_key] = this_account_balances
-
-            # 如果所有认证方式都失败，需要通知
-            if not account_success and results:
-                need_notify = True
-                print(f"🔔 {account_name} all authentication methods failed, will send notification")
-
-            # 如果有失败的认证方式，也通知
-            if failed_methods and successful_methods:
-                need_notify = True
-                print(f"🔔 {account_name} has some failed authentication methods, will send notification")
-
-            # 添加统计信息
-            success_count_methods = len(successful_methods)
-            failed_count_methods = len(failed_methods)
-
-            account_result += f"\n📊 Statistics: {success_count_methods}/{len(results)} methods successful"
-            if failed_count_methods > 0:
-                account_result += f" ({failed_count_methods} failed)"
-
-            notification_content.append(account_result)
-
-        except Exception as e:
-            print(f"❌ {account_name} processing exception: {e}")
-            need_notify = True  # 异常也需要通知
-            notification_content.append(f"❌ {account_name} Exception: {str(e)[:100]}...")
+    if missing_shards:
+        # 缺少整个分片的账号，结果不完整时总是通知
+        notification_content.append(f"\n-------------------------------\n⚠️ Missing results for shard(s) {missing_shards}")
+        need_notify = True
 
     # 检查余额变化
     current_balance_hash = generate_balance_hash(current_balances) if current_balances else None
@@ -160,10 +273,6 @@ async def main():
         else:
             print("ℹ️ No balance changes detected")
 
-    # 保存当前余额hash
-    if current_balance_hash:
-        save_balance_hash(BALANCE_HASH_FILE, current_balance_hash)
-
     if need_notify and notification_content:
         # 构建通知内容
         summary = [
@@ -182,16 +291,81 @@ async def main():
 
         time_info = f'🕓 Execution time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
 
-        notify_content = "\n\n".join([time_info, "\n".join(notification_content), "\n".join(summary)])
+        notify_body = "\n\n".join(["\n".join(notification_content), "\n".join(summary)])
+        notify_content = "\n\n".join([time_info, notify_body])
 
         print(notify_content)
-        notify.push_message("Check-in Alert", notify_content, msg_type="text")
-        print("🔔 Notification sent due to failures or balance changes")
+        # 先写入发件箱再保存余额 hash，发送失败的通知会在下次运行时补发；
+        # 去重 id 不包含执行时间，同一签到日内重新运行得到相同结果时不会重复通知
+        notify_outbox.enqueue(
+            "Check-in Alert", notify_content, msg_type="text", event_id=f"{check_in_day()}\n{notify_body}"
+        )
+        print("🔔 Notification queued due to failures or balance changes")
     else:
         print("ℹ️ All accounts successful and no balance changes detected, notification skipped")
 
+    # 保存当前余额hash（分片结果不完整时跳过，避免下次运行与缺少部分账号的 hash 比较）
+    if current_balance_hash and not missing_shards:
+        save_balance_hash(BALANCE_HASH_FILE, current_balance_hash)
+    elif missing_shards:
+        print(f"⚠️ Shard(s) {missing_shards} missing, balance hash not saved")
+
+    # 在后台发送发件箱中的通知（包括上次运行未送达的通知），只等待有限的时间，未送达的通知下次运行补发
+    notify_outbox.flush_before_exit()
+
+    if missing_shards:
+        return 1
+    return 0 if success_count > 0 else 1
+
+
+async def main():
+    """运行签到流程
+
+    Returns:
+            退出码: 0 表示至少有一个账号成功, 1 表示全部失败
+    """
+    args = parse_args(sys.argv[1:])
+
+    if args.merge is not None:
+        print("🔀 Merging shard results")
+        reports, missing_shards = load_shard_results(args.merge)
+        if not reports:
+            print("❌ No shard results found, program exits")
+            sys.exit(1)
+        print(f"⚙️ Merged {len(reports)} account result(s)")
+        sys.exit(finalize(reports, missing_shards))
+
+    shard = parse_shard(args.shard)
+
+    # 补发上次运行未送达的通知（后台执行，不阻塞签到）；分片运行时由 --merge 统一补发，避免多个分片重复发送
+    if not shard:
+        notify_outbox.flush_in_background()
+
+    print("🚀 newapi.ai multi-account auto check-in script started (using Camoufox)")
+    print(f'🕒 Execution time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+
+    app_config = AppConfig.load_from_env()
+    print(f"⚙️ Loaded {len(app_config.providers)} provider(s)")
+
+    # 检查账号配置
+    if not app_config.accounts:
+        print("❌ Unable to load account configuration, program exits")
+        return 1
+    
+    print(f"⚙️ Found {len(app_config.accounts)} account(s)")
+
+    if args.force:
+        print("⚙️ Force mode: ignoring check-in ledger")
+    reports = await run_accounts(app_config, shard, args.force)
+
+    if shard:
+        # 分片只保存部分结果，余额变化检查和通知由 --merge 统一处理
+        save_shard_result(shard, reports)
+        success_count = sum(report["success_count"] for report in reports)
+        sys.exit(0 if success_count > 0 or not reports else 1)
+
     # 设置退出码
-    sys.exit(0 if success_count > 0 else 1)
+    sys.exit(finalize(reports))
 
 
 def run_main():
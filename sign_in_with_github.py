@@ -3,13 +3,14 @@
 使用 GitHub 账号执行登录授权
 """
 
+import asyncio
 import json
 import os
 from urllib.parse import urlparse, parse_qs
-from camoufox.async_api import AsyncCamoufox
 from playwright_captcha import CaptchaType, ClickSolver, FrameworkType
-from utils.browser_utils import filter_cookies, take_screenshot, save_page_content_to_file
+from utils.browser_utils import filter_cookies, take_screenshot, save_page_content_to_file, wait_for_condition
 from utils.config import ProviderConfig
+from utils.identity_session import identity_sessions
 from utils.wait_for_secrets import WaitForSecrets
 from utils.get_headers import get_browser_headers, print_browser_headers
 
@@ -62,26 +63,23 @@ class GitHubSignIn:
             f"ℹ️ {self.account_name}: Using client_id: {client_id}, auth_state: {auth_state}, cache_file: {cache_file_path}"
         )
 
-        async with AsyncCamoufox(
-            # persistent_context=True,
-            # user_data_dir=tmp_dir,
-            headless=False,
-            humanize=True,
-            locale="en-US",
-            os="macos",  # 强制使用 macOS 指纹，避免跨平台指纹不一致问题
+        # 只有在缓存文件存在时才加载 storage_state
+        if os.path.exists(cache_file_path):
+            print(f"ℹ️ {self.account_name}: Found cache file, restore storage state")
+        else:
+            print(f"ℹ️ {self.account_name}: No cache file found, starting fresh")
+
+        # 同一 OAuth 身份在一次运行中共享浏览器 context，只有首次使用时需要恢复缓存或登录
+        async with identity_sessions.session(
+            "github",
+            self.username,
+            self.account_name,
+            cache_file_path=cache_file_path,
             config={
                 "forceScopeAccess": True,
             },
-        ) as browser:
-            # 只有在缓存文件存在时才加载 storage_state
-            storage_state = cache_file_path if os.path.exists(cache_file_path) else None
-            if storage_state:
-                print(f"ℹ️ {self.account_name}: Found cache file, restore storage state")
-            else:
-                print(f"ℹ️ {self.account_name}: No cache file found, starting fresh")
-
-            context = await browser.new_context(storage_state=storage_state)
-
+        ) as identity:
+            context = identity.context
             # 设置从 auth_state 获取的 session cookies 到页面上下文
             if auth_cookies:
                 await context.add_cookies(auth_cookies)
@@ -100,7 +98,7 @@ class GitHubSignIn:
                     is_logged_in = False
                     oauth_url = f"https://github.com/login/oauth/authorize?response_type=code&client_id={client_id}&state={auth_state}&scope=user:email"
 
-                    if os.path.exists(cache_file_path):
+                    if identity.logged_in or os.path.exists(cache_file_path):
                         try:
                             print(f"ℹ️ {self.account_name}: Checking login status at {oauth_url}")
                             # 直接访问授权页面检查是否已登录
@@ -139,7 +137,11 @@ class GitHubSignIn:
                             await page.fill("#login_field", self.username)
                             await page.fill("#password", self.password)
                             await page.click('input[type="submit"][value="Sign in"]')
-                            await page.wait_for_timeout(10000)
+                            await wait_for_condition(
+                                self.account_name,
+                                "Left GitHub login page",
+                                page.wait_for_url(lambda url: urlparse(url).path not in ("/login", "/session"), timeout=10000),
+                            )
 
                             await save_page_content_to_file(page, "sign_in_result", self.account_name, prefix="github")
 
@@ -152,7 +154,11 @@ class GitHubSignIn:
                                     if submit_btn:
                                         print(f"ℹ️ {self.account_name}: Clicking account selection submit button")
                                         await submit_btn.click()
-                                        await page.wait_for_timeout(5000)
+                                        await wait_for_condition(
+                                            self.account_name,
+                                            "Account selected",
+                                            page.wait_for_load_state("networkidle", timeout=5000),
+                                        )
                                         await save_page_content_to_file(
                                             page, "account_selected", self.account_name, prefix="github"
                                         )
@@ -186,7 +192,9 @@ class GitHubSignIn:
                                                 "description": "OTP from authenticator app",
                                             }
                                         }
-                                        secrets = wait_for_secrets.get(
+                                        # wait-for-secrets 使用阻塞轮询，放到线程中执行避免阻塞其它账号
+                                        secrets = await asyncio.to_thread(
+                                            wait_for_secrets.get,
                                             secret_obj,
                                             timeout=5,
                                             notification={
@@ -234,7 +242,12 @@ class GitHubSignIn:
                                     else:
                                         # 回退到手动输入
                                         print(f"ℹ️ {self.account_name}: Please enter OTP manually in the browser")
-                                        await page.wait_for_timeout(30000)  # 等待30秒让用户手动输入
+                                        # 最多等待30秒让用户手动输入，提交后页面跳转即继续
+                                        await wait_for_condition(
+                                            self.account_name,
+                                            "OTP submitted manually",
+                                            page.wait_for_url(lambda url: url != current_url, timeout=30000),
+                                        )
                             except Exception as e:
                                 print(f"⚠️ {self.account_name}: Error handling 2FA: {e}")
 
@@ -282,7 +295,11 @@ class GitHubSignIn:
                         redirect_pattern = self.provider_config.get_github_auth_redirect_pattern()
                         print(f"ℹ️ {self.account_name}: Waiting for OAuth callback to: {redirect_pattern}")
                         await page.wait_for_url(redirect_pattern, timeout=30000)
-                        await page.wait_for_timeout(5000)
+                        await wait_for_condition(
+                            self.account_name,
+                            "Callback page network idle",
+                            page.wait_for_load_state("networkidle", timeout=5000),
+                        )
 
                         # 检查是否在 Cloudflare 验证页面
                         page_title = await page.title()
@@ -296,7 +313,11 @@ class GitHubSignIn:
                                     captcha_container=page, captcha_type=CaptchaType.CLOUDFLARE_INTERSTITIAL
                                 )
                                 print(f"✅ {self.account_name}: Cloudflare challenge auto-solved")
-                                await page.wait_for_timeout(10000)
+                                await wait_for_condition(
+                                    self.account_name,
+                                    "Cloudflare challenge cleared",
+                                    page.wait_for_function("() => !document.title.includes('Just a moment')", timeout=10000),
+                                )
                             except Exception as solve_err:
                                 print(f"⚠️ {self.account_name}: Auto-solve failed: {solve_err}")
                     except Exception as e:
@@ -313,10 +334,11 @@ class GitHubSignIn:
                     # 从 localStorage 获取 user 对象并提取 id
                     api_user = None
                     try:
-                        try:
-                            await page.wait_for_function('localStorage.getItem("user") !== null', timeout=10000)
-                        except Exception:
-                            await page.wait_for_timeout(5000)
+                        await wait_for_condition(
+                            self.account_name,
+                            "Provider user in localStorage",
+                            page.wait_for_function('localStorage.getItem("user") !== null', timeout=15000),
+                        )
 
                         user_data = await page.evaluate("() => localStorage.getItem('user')")
                         if user_data:
@@ -353,6 +375,7 @@ class GitHubSignIn:
                                 f"ℹ️ {self.account_name}: Browser headers not returned (no Cloudflare challenge detected)"
                             )
 
+                        identity.logged_in = True
                         return True, result, browser_headers
                     else:
                         print(f"⚠️ {self.account_name}: OAuth callback received but no user ID found")
@@ -376,6 +399,7 @@ class GitHubSignIn:
                                 print(
                                     f"ℹ️ {self.account_name}: Browser headers not returned (no Cloudflare challenge detected)"
                                 )
+                            identity.logged_in = True
                             return True, query_params, browser_headers
                         else:
                             print(f"❌ {self.account_name}: OAuth failed, no code in callback")
@@ -393,4 +417,3 @@ class GitHubSignIn:
                     return False, {"error": "GitHub page navigation error"}, None
                 finally:
                     await page.close()
-                    await context.close()
@@ -6,10 +6,10 @@
 import json
 import os
 from urllib.parse import urlparse, parse_qs
-from camoufox.async_api import AsyncCamoufox
 from playwright_captcha import CaptchaType, ClickSolver, FrameworkType
-from utils.browser_utils import filter_cookies, take_screenshot, save_page_content_to_file
+from utils.browser_utils import filter_cookies, take_screenshot, save_page_content_to_file, wait_for_condition
 from utils.config import ProviderConfig
+from utils.identity_session import identity_sessions
 from utils.get_headers import get_browser_headers, print_browser_headers
 
 
@@ -61,26 +61,23 @@ class LinuxDoSignIn:
         )
 
         # 使用 Camoufox 启动浏览器
-        async with AsyncCamoufox(
-            # persistent_context=True,
-            # user_data_dir=tmp_dir,
-            headless=False,
-            humanize=True,
-            locale="en-US",
-            os="macos",  # 强制使用 macOS 指纹，避免跨平台指纹不一致问题
+        # 只有在缓存文件存在时才加载 storage_state
+        if os.path.exists(cache_file_path):
+            print(f"ℹ️ {self.account_name}: Found cache file, restore storage state")
+        else:
+            print(f"ℹ️ {self.account_name}: No cache file found, starting fresh")
+
+        # 同一 OAuth 身份在一次运行中共享浏览器 context，只有首次使用时需要恢复缓存或登录
+        async with identity_sessions.session(
+            "linuxdo",
+            self.username,
+            self.account_name,
+            cache_file_path=cache_file_path,
             config={
                 "forceScopeAccess": True,
             },
-        ) as browser:
-            # 只有在缓存文件存在时才加载 storage_state
-            storage_state = cache_file_path if os.path.exists(cache_file_path) else None
-            if storage_state:
-                print(f"ℹ️ {self.account_name}: Found cache file, restore storage state")
-            else:
-                print(f"ℹ️ {self.account_name}: No cache file found, starting fresh")
-
-            context = await browser.new_context(storage_state=storage_state)
-
+        ) as identity:
+            context = identity.context
             # 设置从参数获取的 auth cookies 到页面上下文
             if auth_cookies:
                 await context.add_cookies(auth_cookies)
@@ -102,7 +99,7 @@ class LinuxDoSignIn:
                         f"response_type=code&client_id={client_id}&state={auth_state}"
                     )
 
-                    if os.path.exists(cache_file_path):
+                    if identity.logged_in or os.path.exists(cache_file_path):
                         try:
                             print(f"ℹ️ {self.account_name}: Checking login status at {oauth_url}")
                             # 直接访问授权页面检查是否已登录
@@ -152,7 +149,11 @@ class LinuxDoSignIn:
                                         captcha_container=page, captcha_type=CaptchaType.CLOUDFLARE_INTERSTITIAL
                                     )
                                     print(f"✅ {self.account_name}: Cloudflare challenge auto-solved")
-                                    await page.wait_for_timeout(10000)
+                                    await wait_for_condition(
+                                        self.account_name,
+                                        "Login form visible",
+                                        page.wait_for_selector("#login-account-name", timeout=10000),
+                                    )
                                 except Exception as solve_err:
                                     print(f"⚠️ {self.account_name}: Auto-solve failed: {solve_err}")
 
@@ -189,7 +190,11 @@ class LinuxDoSignIn:
                                     if retry < 2:
                                         try:
                                             await page.goto("https://linux.do/login", wait_until="domcontentloaded")
-                                            await page.wait_for_timeout(5000)
+                                            await wait_for_condition(
+                                                self.account_name,
+                                                "Login page network idle",
+                                                page.wait_for_load_state("networkidle", timeout=5000),
+                                            )
                                         except Exception as nav_err:
                                             print(
                                                 f"⚠️ {self.account_name}: Failed to reload login page on retry: "
@@ -202,7 +207,11 @@ class LinuxDoSignIn:
                                 await page.fill("#login-account-password", self.password)
                                 await page.wait_for_timeout(2000)
                                 await page.click("#login-button")
-                                await page.wait_for_timeout(10000)
+                                await wait_for_condition(
+                                    self.account_name,
+                                    "Left Linux.do login page",
+                                    page.wait_for_url(lambda url: urlparse(url).path != "/login", timeout=10000),
+                                )
                             else:
                                 print(
                                     f"⚠️ {self.account_name}: Login form still unavailable after retries, "
@@ -259,7 +268,11 @@ class LinuxDoSignIn:
                             # 在等待重定向之前，先检查是否遇到 Cloudflare 挑战
                             try:
                                 print(f"ℹ️ {self.account_name}: Checking for Cloudflare challenge after authorization...")
-                                await page.wait_for_timeout(3000)  # 等待页面响应
+                                await wait_for_condition(
+                                    self.account_name,
+                                    "Left Linux.do authorization page",
+                                    page.wait_for_url(lambda url: not url.startswith("https://connect.linux.do"), timeout=3000),
+                                )
 
                                 page_title = await page.title()
                                 page_content = await page.content()
@@ -274,7 +287,11 @@ class LinuxDoSignIn:
                                             captcha_container=page, captcha_type=CaptchaType.CLOUDFLARE_INTERSTITIAL
                                         )
                                         print(f"✅ {self.account_name}: Cloudflare challenge auto-solved")
-                                        await page.wait_for_timeout(5000)
+                                        await wait_for_condition(
+                                            self.account_name,
+                                            "Cloudflare challenge cleared",
+                                            page.wait_for_function("() => !document.title.includes('Just a moment')", timeout=5000),
+                                        )
                                     except Exception as solve_err:
                                         print(f"⚠️ {self.account_name}: Auto-solve failed: {solve_err}")
                                 else:
@@ -309,7 +326,11 @@ class LinuxDoSignIn:
                             redirect_pattern = self.provider_config.get_linuxdo_auth_redirect_pattern()
                             print(f"ℹ️ {self.account_name}: Waiting for redirect to: {redirect_pattern}")
                             await page.wait_for_url(redirect_pattern, timeout=30000)
-                            await page.wait_for_timeout(5000)
+                            await wait_for_condition(
+                                self.account_name,
+                                "Callback page network idle",
+                                page.wait_for_load_state("networkidle", timeout=5000),
+                            )
 
                         # 检查是否在 Cloudflare 验证页面
                         page_title = await page.title()
@@ -323,7 +344,11 @@ class LinuxDoSignIn:
                                     captcha_container=page, captcha_type=CaptchaType.CLOUDFLARE_INTERSTITIAL
                                 )
                                 print(f"✅ {self.account_name}: Cloudflare challenge auto-solved")
-                                await page.wait_for_timeout(10000)
+                                await wait_for_condition(
+                                    self.account_name,
+                                    "Cloudflare challenge cleared",
+                                    page.wait_for_function("() => !document.title.includes('Just a moment')", timeout=10000),
+                                )
                             except Exception as solve_err:
                                 print(f"⚠️ {self.account_name}: Auto-solve failed: {solve_err}")
                     except Exception as e:
@@ -340,10 +365,11 @@ class LinuxDoSignIn:
                     # 从 localStorage 获取 user 对象并提取 id
                     api_user = None
                     try:
-                        try:
-                            await page.wait_for_function('localStorage.getItem("user") !== null', timeout=10000)
-                        except Exception:
-                            await page.wait_for_timeout(5000)
+                        await wait_for_condition(
+                            self.account_name,
+                            "Provider user in localStorage",
+                            page.wait_for_function('localStorage.getItem("user") !== null', timeout=15000),
+                        )
 
                         user_data = await page.evaluate("() => localStorage.getItem('user')")
                         if user_data:
@@ -380,6 +406,7 @@ class LinuxDoSignIn:
                                 f"ℹ️ {self.account_name}: Browser headers not returned (no Cloudflare challenge detected)"
                             )
 
+                        identity.logged_in = True
                         return True, result, browser_headers
                     else:
                         print(f"⚠️ {self.account_name}: OAuth callback received but no user ID found")
@@ -402,6 +429,7 @@ class LinuxDoSignIn:
                                 print(
                                     f"ℹ️ {self.account_name}: Browser headers not returned (no Cloudflare challenge detected)"
                                 )
+                            identity.logged_in = True
                             return True, query_params, browser_headers
                         else:
                             print(f"❌ {self.account_name}: OAuth failed, no code in callback")
@@ -419,4 +447,3 @@ class LinuxDoSignIn:
                     return False, {"error": "Linux.do page navigation error"}, None
                 finally:
                     await page.close()
-                    await context.close()
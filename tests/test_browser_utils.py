@@ -0,0 +1,73 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.browser_utils import should_block_request, wait_for_condition, wait_for_cookies
+
+
+class FakeContext:
+	def __init__(self, cookies_after):
+		self.calls = 0
+		self.cookies_after = cookies_after
+
+	async def cookies(self):
+		self.calls += 1
+		if self.calls >= self.cookies_after:
+			return [{'name': 'cf_clearance', 'value': 'ok'}]
+		return [{'name': '__cf_bm', 'value': 'x'}]
+
+
+def test_wait_for_cookies_returns_once_cookie_appears():
+	context = FakeContext(cookies_after=3)
+	assert asyncio.run(wait_for_cookies(context, ['cf_clearance'], 'test', timeout=5000, interval=10))
+	assert context.calls == 3
+
+
+def test_wait_for_cookies_deadline():
+	context = FakeContext(cookies_after=10_000)
+	assert not asyncio.run(wait_for_cookies(context, ['cf_clearance'], 'test', timeout=50, interval=10))
+
+
+def test_wait_for_cookies_require_all():
+	class PartialContext:
+		def __init__(self):
+			self.calls = 0
+
+		async def cookies(self):
+			self.calls += 1
+			cookies = [{'name': 'acw_tc', 'value': 'a'}]
+			if self.calls >= 3:
+				cookies.append({'name': 'acw_sc__v2', 'value': 'b'})
+			return cookies
+
+	context = PartialContext()
+	names = ['acw_tc', 'acw_sc__v2']
+	assert asyncio.run(wait_for_cookies(context, names, 'test', timeout=5000, interval=10))
+	assert context.calls == 1
+
+	context = PartialContext()
+	assert asyncio.run(wait_for_cookies(context, names, 'test', timeout=5000, interval=10, require_all=True))
+	assert context.calls == 3
+
+
+def test_wait_for_condition():
+	async def timeout():
+		raise TimeoutError('Timeout 10ms exceeded')
+
+	assert asyncio.run(wait_for_condition('test', 'ready', asyncio.sleep(0)))
+	assert not asyncio.run(wait_for_condition('test', 'ready', timeout()))
+
+
+def test_should_block_request():
+	assert should_block_request('https://example.com/logo.png', 'image')
+	assert should_block_request('https://example.com/font.woff2', 'font')
+	assert should_block_request('https://www.googletagmanager.com/gtag/js?id=1', 'script')
+	assert not should_block_request('https://example.com/app.js', 'script')
+	# 验证相关请求始终放行
+	assert not should_block_request('https://challenges.cloudflare.com/cdn-cgi/challenge-platform/h/b/img.png', 'image')
+	assert not should_block_request('https://example.com/cdn-cgi/challenge-platform/scripts/jsd/main.js', 'script')
+	assert not should_block_request('https://g.alicdn.com/AWSC/nc/slide.png', 'image')
@@ -0,0 +1,71 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.bypass_broker import BypassCookieBroker
+
+
+@pytest.fixture
+def broker(tmp_path, monkeypatch):
+	monkeypatch.setenv('BYPASS_COOKIE_CACHE_FILE', str(tmp_path / 'bypass_cookies.json'))
+	monkeypatch.setenv('BYPASS_COOKIE_TTL', '600')
+	return BypassCookieBroker()
+
+
+def test_make_key_hides_proxy_credentials():
+	key = BypassCookieBroker.make_key(
+		'https://example.com/login',
+		{'server': 'http://proxy:8080', 'username': 'user', 'password': 'secret'},
+	)
+
+	assert key.startswith('https://example.com|')
+	assert 'secret' not in key
+	assert BypassCookieBroker.make_key('https://example.com/login') == 'https://example.com|direct|macos'
+
+
+def test_single_flight_and_persistence(broker):
+	calls = []
+
+	async def fetcher():
+		calls.append(1)
+		await asyncio.sleep(0.01)
+		return {'cf_clearance': 'abc'}, {'User-Agent': 'UA'}
+
+	async def run():
+		return await asyncio.gather(*(broker.get('k', fetcher, f'account_{i}') for i in range(5)))
+
+	results = asyncio.run(run())
+
+	assert len(calls) == 1
+	assert results[0] == ({'cf_clearance': 'abc'}, {'User-Agent': 'UA'}, False)
+	assert all(result[2] for result in results[1:])
+
+	# 新实例从文件加载缓存
+	reloaded = BypassCookieBroker()
+	cookies, headers, from_cache = asyncio.run(reloaded.get('k', fetcher, 'account_x'))
+	assert cookies == {'cf_clearance': 'abc'}
+	assert from_cache
+	assert len(calls) == 1
+
+
+def test_invalidate_keeps_refreshed_entry(broker):
+	values = iter([{'acw_tc': 'old'}, {'acw_tc': 'new'}])
+
+	async def fetcher():
+		return next(values), None
+
+	asyncio.run(broker.get('k', fetcher, 'a'))
+	broker.invalidate('k', stale_cookies={'acw_tc': 'old'})
+	cookies, _, from_cache = asyncio.run(broker.get('k', fetcher, 'a'))
+	assert cookies == {'acw_tc': 'new'} and not from_cache
+
+	# 其它账号持有的旧 cookies 不会删除已刷新的缓存
+	broker.invalidate('k', stale_cookies={'acw_tc': 'old'})
+	cookies, _, from_cache = asyncio.run(broker.get('k', fetcher, 'a'))
+	assert cookies == {'acw_tc': 'new'} and from_cache
@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# utils.config 通过 CDK 获取函数间接依赖浏览器模块
+pytest.importorskip('camoufox')
+
+from utils.config import AccountConfig, AppConfig, ProviderConfig
+
+
+def test_auth_strategy_precedence(monkeypatch):
+	monkeypatch.delenv('AUTH_STRATEGY', raising=False)
+	provider = ProviderConfig.from_dict('example', {'origin': 'https://example.com'})
+	account = AccountConfig.from_dict({'provider': 'example'})
+	assert account.get_auth_strategy(provider) == 'all'
+
+	monkeypatch.setenv('AUTH_STRATEGY', 'first-success')
+	assert account.get_auth_strategy(provider) == 'first-success'
+
+	provider = ProviderConfig.from_dict('example', {'origin': 'https://example.com', 'auth_strategy': 'all'})
+	assert account.get_auth_strategy(provider) == 'all'
+
+	account = AccountConfig.from_dict({'provider': 'example', 'auth_strategy': 'ordered'})
+	assert account.get_auth_strategy(provider) == 'first-success'
+
+
+def test_auth_order():
+	provider = ProviderConfig.from_dict('example', {'origin': 'https://example.com'})
+	assert AccountConfig.from_dict({}).get_auth_order(provider) == ['cookies', 'github', 'linux.do']
+
+	account = AccountConfig.from_dict({'auth_order': ['linuxdo', 'cookies']})
+	assert account.get_auth_order(provider) == ['linux.do', 'cookies', 'github']
+
+
+def test_rate_limits_ignore_unlimited_when_merging():
+	providers = {
+		'a': ProviderConfig.from_dict('a', {'origin': 'https://a.example', 'rate_limit': {'cdk.example': 2}}),
+		'b': ProviderConfig.from_dict('b', {'origin': 'https://b.example', 'rate_limit': {'cdk.example': 0}}),
+		'c': ProviderConfig.from_dict('c', {'origin': 'https://c.example', 'rate_limit': {'cdk.example': 5}}),
+		'd': ProviderConfig.from_dict('d', {'origin': 'https://d.example', 'rate_limit': 0}),
+	}
+	limits = AppConfig(providers=providers).get_rate_limits()
+	# 其他 provider 的 0（不限速）不会覆盖正数上限
+	assert limits['cdk.example'] == 2
+	assert limits['d.example'] == 0
@@ -0,0 +1,58 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from checkin_qaq_al.hps_cache import HpsCache
+from checkin_qaq_al.pow_solver import PowSolver
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+	monkeypatch.setenv('QAQ_AL_HPS_CACHE_FILE', str(tmp_path / 'hps.json'))
+	monkeypatch.delenv('QAQ_AL_HPS_TTL_HOURS', raising=False)
+	return HpsCache()
+
+
+def test_cache_is_keyed_by_mode_and_persisted(cache):
+	assert cache.get('single') is None
+	cache.update('single', 1000000)
+	assert cache.get('single') == 1000000
+	assert cache.get('parallel-4') is None
+	assert HpsCache().get('single') == 1000000
+
+
+def test_cache_expires(cache, monkeypatch):
+	cache.update('single', 1000000)
+	monkeypatch.setenv('QAQ_AL_HPS_TTL_HOURS', '1')
+	entry = next(iter(cache._load().values()))
+	entry['updated_at'] = time.time() - 7200
+	assert cache.get('single') is None
+
+
+def test_record_solve_blends_with_cached_value(cache):
+	# 求解时间太短时不更新
+	cache.record_solve('single', 500000, 0.2)
+	assert cache.get('single') is None
+
+	cache.record_solve('single', 800000, 3.0)
+	assert cache.get('single') == 800000
+	cache.record_solve('single', 1200000, 3.0)
+	assert cache.get('single') == 1000000
+
+
+def test_parallel_solver_measures_combined_hps():
+	solver = PowSolver(workers=2)
+	try:
+		assert solver.mode == 'parallel-2'
+		assert solver.measure_hps(0.3) > 0
+		# 测算后仍然可以正常求解
+		assert solver.solve('abc123', 8)['leading'] >= 8
+	finally:
+		solver.close()
+	assert PowSolver(workers=1).mode == 'single'
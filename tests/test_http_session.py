@@ -0,0 +1,48 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.http_session import HttpSessionManager
+
+
+def test_make_key():
+	key = HttpSessionManager.make_key('https://example.com/api/user/self', None, 'firefox135')
+	assert key == 'https://example.com|direct|firefox135'
+
+
+def test_sessions_share_connection_pool_but_not_cookies():
+	async def run():
+		manager = HttpSessionManager()
+
+		token = manager.open_scope()
+		first = manager.get('https://example.com/a', impersonate='firefox135')
+		assert manager.get('https://example.com/b', impersonate='firefox135') is first
+		first.cookies.set('session', 'account_1')
+
+		nested = manager.open_scope()
+		second = manager.get('https://example.com', impersonate='firefox135')
+		assert second is not first
+		assert second.acurl is first.acurl
+		assert second.cookies.get('session') is None
+		await manager.close_scope(nested)
+
+		# 关闭内层作用域后恢复外层作用域，共享连接池不受影响
+		assert manager.get('https://example.com', impersonate='firefox135') is first
+		assert not first._closed
+		await manager.close_scope(token)
+		assert first._closed
+		# 关闭会话不会关闭共享的连接池
+		reopened = manager.get('https://example.com', impersonate='firefox135')
+		assert reopened is not first
+		assert reopened.acurl is first.acurl
+
+		other = manager.get('https://example.com', impersonate='chrome')
+		assert other.acurl is not first.acurl
+
+		await manager.close()
+
+	asyncio.run(run())
@@ -0,0 +1,72 @@
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip('camoufox')
+
+from utils import identity_session
+from utils.identity_session import IdentitySessionManager
+
+
+class FakeContext:
+	browser = None
+
+
+def test_identity_logs_in_once_and_shares_context(monkeypatch):
+	opened = []
+	closed = []
+
+	@asynccontextmanager
+	async def fake_context(account_name, config=None, storage_state=None):
+		context = FakeContext()
+		opened.append(context)
+		try:
+			yield context
+		finally:
+			closed.append(context)
+
+	monkeypatch.setattr(identity_session.browser_pool, 'context', fake_context)
+	monkeypatch.delenv('OAUTH_IDENTITY_SHARING', raising=False)
+
+	async def run():
+		manager = IdentitySessionManager()
+		active = 0
+		max_active = 0
+
+		async def authorize(provider):
+			nonlocal active, max_active
+			async with manager.session('linuxdo', 'user', provider) as identity:
+				active += 1
+				max_active = max(max_active, active)
+				await asyncio.sleep(0.01)
+				identity.logged_in = True
+				active -= 1
+				return identity.context
+
+		# 首次登录完成前串行执行
+		first = await asyncio.gather(authorize('a'), authorize('b'))
+		assert max_active == 1
+
+		# 登录后各 provider 并发授权
+		max_active = 0
+		second = await asyncio.gather(*(authorize(f'p{i}') for i in range(3)))
+		assert max_active == 3
+
+		assert len(opened) == 1
+		assert all(context is opened[0] for context in first + second)
+
+		async with manager.session('linuxdo', 'other', 'c'):
+			pass
+		assert len(opened) == 2
+
+		await manager.close()
+		assert len(closed) == 2
+
+	asyncio.run(run())
@@ -0,0 +1,64 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.ledger import KEEP_DAYS, CheckInLedger, check_in_day
+
+
+@pytest.fixture
+def ledger_file(tmp_path, monkeypatch):
+	path = tmp_path / 'ledger.json'
+	monkeypatch.setenv('CHECK_IN_LEDGER_FILE', str(path))
+	monkeypatch.delenv('CHECK_IN_LEDGER', raising=False)
+	return path
+
+
+def test_make_key_hides_account_name():
+	key = CheckInLedger.make_key('anyrouter', 'my-secret-account')
+	assert key.startswith('anyrouter|')
+	assert 'my-secret-account' not in key
+
+
+def test_record_and_completed_survive_reload(ledger_file):
+	ledger = CheckInLedger()
+	key = ledger.make_key('anyrouter', 'account 1')
+	user_info = {'success': True, 'quota': 10.0, 'used_quota': 1.0, 'bonus_quota': 0, 'display': 'ok'}
+	ledger.record(key, '2026-10-18', [
+		('cookies', True, user_info),
+		('github', False, {'error': 'timeout'}),
+	])
+
+	# 新实例从文件读取，只返回成功的认证方式
+	completed = CheckInLedger().completed(key, '2026-10-18')
+	assert completed == {'cookies': user_info}
+	assert CheckInLedger().completed(key, '2026-10-19') == {}
+
+	data = json.loads(ledger_file.read_text(encoding='utf-8'))
+	assert data[key]['2026-10-18']['github']['error'] == 'timeout'
+
+
+def test_record_keeps_recent_days(ledger_file):
+	ledger = CheckInLedger()
+	for day in range(1, KEEP_DAYS + 3):
+		ledger.record('p|x', f'2026-10-{day:02d}', [('cookies', True, {'success': True})])
+	days = json.loads(ledger_file.read_text(encoding='utf-8'))['p|x']
+	assert len(days) == KEEP_DAYS
+	assert '2026-10-01' not in days
+
+
+def test_disabled_ledger(ledger_file, monkeypatch):
+	monkeypatch.setenv('CHECK_IN_LEDGER', 'false')
+	ledger = CheckInLedger()
+	ledger.record('p|x', '2026-10-18', [('cookies', True, {'success': True})])
+	assert not ledger_file.exists()
+	assert ledger.completed('p|x', '2026-10-18') == {}
+
+
+def test_check_in_day_unknown_timezone():
+	assert len(check_in_day('Not/AZone')) == len('2026-10-18')
@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -103,3 +104,34 @@ def test_push_message(mock_feishu, mock_pushplus, mock_wecom, mock_dingtalk, moc
 	assert mock_wecom.called
 	assert mock_pushplus.called
 	assert mock_feishu.called
+
+
+def test_push_message_parallel_with_deadline(monkeypatch):
+	for key in ('EMAIL_USER', 'PUSHPLUS_TOKEN', 'SERVERPUSHKEY', 'FEISHU_WEBHOOK', 'WEIXIN_WEBHOOK', 'TELEGRAM_BOT_TOKEN'):
+		monkeypatch.delenv(key, raising=False)
+	monkeypatch.setenv('DINGDING_WEBHOOK', 'http://dingtalk.example.com')
+	monkeypatch.setenv('PUSHPLUS_TOKEN', 'test_token')
+	monkeypatch.setenv('FEISHU_WEBHOOK', 'http://feishu.example.com')
+	monkeypatch.setenv('NOTIFY_TIMEOUT', '1')
+	kit = NotificationKit()
+
+	def slow(*args):
+		time.sleep(5)
+
+	def broken(*args):
+		raise RuntimeError('bad webhook')
+
+	monkeypatch.setattr(kit, 'send_dingtalk', lambda *args: time.sleep(0.5))
+	monkeypatch.setattr(kit, 'send_pushplus', slow)
+	monkeypatch.setattr(kit, 'send_feishu', broken)
+
+	started = time.monotonic()
+	report = kit.push_message('测试标题', '测试内容')
+
+	# 只调用已配置的渠道，并发发送，超时的渠道不再等待
+	assert time.monotonic() - started < 2
+	assert set(report) == {'DingTalk', 'PushPlus', 'Feishu'}
+	assert report['DingTalk']['success']
+	assert not report['PushPlus']['success'] and 'Timed out' in report['PushPlus']['error']
+	assert report['PushPlus']['timed_out'] and not report['Feishu']['timed_out']
+	assert report['Feishu']['error'] == 'bad webhook'
@@ -0,0 +1,219 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils import notify as notify_module
+from utils import notify_outbox as outbox_module
+from utils.notify import NotificationKit
+from utils.notify_outbox import NotificationOutbox
+
+
+class FakeNotify:
+	"""记录发送请求，按渠道返回预设结果"""
+
+	def __init__(self, channels, failing=None):
+		self.channels = channels
+		self.failing = set(failing or [])
+		self.calls = []
+
+	def get_channels(self, title, content, msg_type='text'):
+		return [(name, None) for name in self.channels]
+
+	def push_message(self, title, content, msg_type='text', channels=None):
+		self.calls.append(list(channels))
+		return {
+			name: {
+				'success': name not in self.failing,
+				'error': 'down' if name in self.failing else '',
+				'elapsed': 0,
+				'timed_out': False,
+			}
+			for name in channels
+		}
+
+
+class FakeResponse:
+	def __init__(self, status_code, data=None):
+		self.status_code = status_code
+		self.data = data
+		self.text = str(data)
+
+	def raise_for_status(self):
+		if self.status_code >= 400:
+			raise RuntimeError(f'HTTP Error {self.status_code}')
+
+	def json(self):
+		return self.data
+
+
+@pytest.fixture
+def outbox_file(tmp_path, monkeypatch):
+	path = tmp_path / 'outbox.json'
+	monkeypatch.setenv('NOTIFY_OUTBOX_FILE', str(path))
+	monkeypatch.delenv('NOTIFY_OUTBOX', raising=False)
+	monkeypatch.delenv('NOTIFY_MAX_ATTEMPTS', raising=False)
+	return path
+
+
+def test_enqueue_deduplicates_by_content(outbox_file, monkeypatch):
+	monkeypatch.setattr(outbox_module, 'notify', FakeNotify(['DingTalk']))
+	outbox = NotificationOutbox()
+	assert outbox.enqueue('Check-in Alert', 'balance changed')
+	assert not outbox.enqueue('Check-in Alert', 'balance changed')
+	assert outbox.flush(retries=0) == 0
+	# 已送达的通知也不会重复入队
+	assert not outbox.enqueue('Check-in Alert', 'balance changed')
+	assert outbox.enqueue('Check-in Alert', 'another message')
+
+
+def test_enqueue_deduplicates_by_event_id(outbox_file, monkeypatch):
+	monkeypatch.setattr(outbox_module, 'notify', FakeNotify(['DingTalk']))
+	outbox = NotificationOutbox()
+	assert outbox.enqueue('Check-in Alert', '10:00\nbalance changed', event_id='2026-10-18\nbalance changed')
+	assert outbox.flush(retries=0) == 0
+	# 内容中的执行时间不同，事件 id 相同时仍视为重复
+	assert not outbox.enqueue('Check-in Alert', '11:00\nbalance changed', event_id='2026-10-18\nbalance changed')
+	assert outbox.enqueue('Check-in Alert', '10:00\nbalance changed', event_id='2026-10-19\nbalance changed')
+
+
+def test_send_does_not_block_enqueue(outbox_file, monkeypatch):
+	release = threading.Event()
+	sending = threading.Event()
+	fake = FakeNotify(['DingTalk'])
+	push_message = fake.push_message
+
+	def slow_push_message(title, content, msg_type='text', channels=None):
+		sending.set()
+		release.wait(5)
+		return push_message(title, content, msg_type=msg_type, channels=channels)
+
+	fake.push_message = slow_push_message
+	monkeypatch.setattr(outbox_module, 'notify', fake)
+	outbox = NotificationOutbox()
+	outbox.enqueue('Check-in Alert', 'first')
+
+	thread = outbox.flush_in_background()
+	assert sending.wait(5)
+	try:
+		# 并发的 flush 不会重复发送正在发送的通知，发送期间可以入队
+		assert outbox.flush(retries=0) == 1
+		assert outbox.enqueue('Check-in Alert', 'second')
+		assert fake.calls == []
+	finally:
+		release.set()
+		thread.join(5)
+
+	assert outbox.flush(retries=0) == 0
+	assert fake.calls == [['DingTalk'], ['DingTalk']]
+
+
+def test_flush_before_exit_is_bounded(outbox_file, monkeypatch):
+	monkeypatch.setenv('NOTIFY_FLUSH_WAIT', '0.1')
+	release = threading.Event()
+	fake = FakeNotify(['DingTalk'])
+	fake.push_message = lambda title, content, msg_type='text', channels=None: release.wait(5) and {}
+	monkeypatch.setattr(outbox_module, 'notify', fake)
+	outbox = NotificationOutbox()
+	outbox.enqueue('Check-in Alert', 'balance changed')
+
+	try:
+		assert not outbox.flush_before_exit()
+		# 通知已持久化，下次运行补发
+		assert len(NotificationOutbox().pending()) == 1
+	finally:
+		release.set()
+
+
+def test_failed_channels_are_retried_on_next_run(outbox_file, monkeypatch):
+	fake = FakeNotify(['DingTalk', 'Telegram'], failing=['Telegram'])
+	monkeypatch.setattr(outbox_module, 'notify', fake)
+	outbox = NotificationOutbox()
+	outbox.enqueue('Check-in Alert', 'balance changed')
+
+	assert outbox.flush(retries=1, retry_delay=0) == 1
+	assert fake.calls == [['DingTalk', 'Telegram'], ['Telegram']]
+
+	# 下次运行从文件加载，只补发未送达的渠道
+	fake.failing = set()
+	fake.calls = []
+	next_run = NotificationOutbox()
+	assert len(next_run.pending()) == 1
+	assert next_run.flush(retries=0) == 0
+	assert fake.calls == [['Telegram']]
+	assert next_run.pending() == []
+
+
+def test_gives_up_after_max_attempts(outbox_file, monkeypatch):
+	monkeypatch.setenv('NOTIFY_MAX_ATTEMPTS', '2')
+	fake = FakeNotify(['Email'], failing=['Email'])
+	monkeypatch.setattr(outbox_module, 'notify', fake)
+	outbox = NotificationOutbox()
+	outbox.enqueue('Check-in Alert', 'balance changed')
+
+	assert outbox.flush(retries=0) == 1
+	assert outbox.flush(retries=0) == 0
+	assert len(fake.calls) == 2
+
+
+def test_disabled_outbox_sends_directly(outbox_file, monkeypatch):
+	monkeypatch.setenv('NOTIFY_OUTBOX', 'false')
+	fake = FakeNotify(['DingTalk'])
+	fake.push_message = lambda title, content, msg_type='text', channels=None: fake.calls.append(title)
+	monkeypatch.setattr(outbox_module, 'notify', fake)
+	outbox = NotificationOutbox()
+
+	assert not outbox.enqueue('Check-in Alert', 'balance changed')
+	assert fake.calls == ['Check-in Alert']
+	assert not outbox_file.exists()
+
+
+def test_http_error_keeps_channel_pending(outbox_file, monkeypatch):
+	for key in ('EMAIL_USER', 'PUSHPLUS_TOKEN', 'SERVERPUSHKEY', 'FEISHU_WEBHOOK', 'WEIXIN_WEBHOOK', 'TELEGRAM_BOT_TOKEN'):
+		monkeypatch.delenv(key, raising=False)
+	monkeypatch.setenv('DINGDING_WEBHOOK', 'http://dingtalk.example.com')
+	responses = [FakeResponse(502), FakeResponse(200, {'errcode': 310000, 'errmsg': 'keywords not in content'})]
+	monkeypatch.setattr(notify_module.curl_requests, 'post', lambda *args, **kwargs: responses.pop(0))
+	monkeypatch.setattr(outbox_module, 'notify', NotificationKit())
+	outbox = NotificationOutbox()
+	outbox.enqueue('Check-in Alert', 'balance changed')
+
+	# HTTP 502 和接口返回的错误码都视为发送失败，通知保留在发件箱中
+	assert outbox.flush(retries=1, retry_delay=0) == 1
+	assert responses == []
+	assert NotificationOutbox().pending()[0]['attempts'] == {'DingTalk': 2}
+
+	monkeypatch.setattr(notify_module.curl_requests, 'post', lambda *args, **kwargs: FakeResponse(200, {'errcode': 0}))
+	assert NotificationOutbox().flush(retries=0) == 0
+
+
+def test_timed_out_channel_is_not_resent_in_same_run(outbox_file, monkeypatch):
+	fake = FakeNotify(['DingTalk', 'Telegram'])
+	push_message = fake.push_message
+
+	def timing_out_push_message(title, content, msg_type='text', channels=None):
+		report = push_message(title, content, msg_type=msg_type, channels=channels)
+		if 'Telegram' in report:
+			report['Telegram'] = {'success': False, 'error': 'Timed out after 60s', 'elapsed': 60, 'timed_out': True}
+		return report
+
+	fake.push_message = timing_out_push_message
+	monkeypatch.setattr(outbox_module, 'notify', fake)
+	outbox = NotificationOutbox()
+	outbox.enqueue('Check-in Alert', 'balance changed')
+
+	# 超时的渠道可能仍在后台送达，本次运行不再重发，也不计入尝试次数
+	assert outbox.flush(retries=2, retry_delay=0) == 1
+	assert outbox.flush(retries=0) == 1
+	assert fake.calls == [['DingTalk', 'Telegram']]
+	assert outbox.pending()[0]['attempts'] == {'DingTalk': 1}
+
+	# 下次运行补发结果未知的渠道
+	fake.push_message = push_message
+	assert NotificationOutbox().flush(retries=0) == 0
+	assert fake.calls[-1] == ['Telegram']
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils import oauth_http
+from utils.oauth_http import authorize_over_http, load_idp_cookies
+
+
+class FakeResponse:
+	def __init__(self, status_code, location=None, text=''):
+		self.status_code = status_code
+		self.headers = {'location': location} if location else {}
+		self.text = text
+
+
+class FakeCookies:
+	def __init__(self):
+		self.items = {}
+
+	def set(self, name, value, domain='', path='/'):
+		self.items[name] = (value, domain)
+
+
+class FakeSession:
+	def __init__(self, responses):
+		self.responses = list(responses)
+		self.cookies = FakeCookies()
+		self.urls = []
+
+	async def get(self, url, **kwargs):
+		self.urls.append(url)
+		return self.responses.pop(0)
+
+
+def write_storage_state(tmp_path):
+	cache_file = tmp_path / 'linuxdo_storage_state.json'
+	cache_file.write_text(
+		json.dumps(
+			{
+				'cookies': [
+					{'name': '_t', 'value': 'token', 'domain': '.linux.do', 'path': '/', 'expires': -1},
+					{'name': 'old', 'value': 'x', 'domain': 'connect.linux.do', 'path': '/', 'expires': time.time() - 10},
+					{'name': 'other', 'value': 'y', 'domain': 'example.com', 'path': '/', 'expires': -1},
+				]
+			}
+		),
+		encoding='utf-8',
+	)
+	return str(cache_file)
+
+
+def test_load_idp_cookies(tmp_path):
+	cookies = load_idp_cookies(write_storage_state(tmp_path), 'linux.do')
+	assert [cookie['name'] for cookie in cookies] == ['_t']
+	assert load_idp_cookies(str(tmp_path / 'missing.json'), 'linux.do') == []
+
+
+def test_authorize_follows_approve_link_and_redirect(tmp_path, monkeypatch):
+	session = FakeSession(
+		[
+			FakeResponse(200, text='<a href="/oauth2/approve/abc?x=1&amp;y=2">Allow</a>'),
+			FakeResponse(302, location='https://provider.example/oauth/linuxdo?code=c1&state=s1'),
+		]
+	)
+	monkeypatch.setattr(oauth_http.http_sessions, 'get', lambda url, proxy=None, impersonate=None: session)
+	monkeypatch.delenv('OAUTH_HTTP_FAST_PATH', raising=False)
+
+	result = asyncio.run(
+		authorize_over_http(
+			'linuxdo', 'cid', 's1', write_storage_state(tmp_path), 'https://provider.example', 'test', {'User-Agent': 'ua'}
+		)
+	)
+
+	assert result == {'code': ['c1'], 'state': ['s1']}
+	assert session.urls[1] == 'https://connect.linux.do/oauth2/approve/abc?x=1&y=2'
+	assert session.cookies.items == {'_t': ('token', '.linux.do')}
+
+
+def test_authorize_falls_back_when_login_required(tmp_path, monkeypatch):
+	session = FakeSession(
+		[
+			FakeResponse(302, location='https://linux.do/login'),
+			FakeResponse(200, text='<form id="login-form"></form>'),
+		]
+	)
+	monkeypatch.setattr(oauth_http.http_sessions, 'get', lambda url, proxy=None, impersonate=None: session)
+
+	result = asyncio.run(
+		authorize_over_http('linuxdo', 'cid', 's1', write_storage_state(tmp_path), 'https://provider.example', 'test', {})
+	)
+
+	assert result is None
+
+
+def test_authorize_ignores_lookalike_redirect_origin(tmp_path, monkeypatch):
+	session = FakeSession(
+		[
+			FakeResponse(302, location='https://provider.example.evil.tld/oauth/linuxdo?code=c1&state=s1'),
+			FakeResponse(200, text='<html></html>'),
+		]
+	)
+	monkeypatch.setattr(oauth_http.http_sessions, 'get', lambda url, proxy=None, impersonate=None: session)
+	monkeypatch.delenv('OAUTH_HTTP_FAST_PATH', raising=False)
+
+	result = asyncio.run(
+		authorize_over_http('linuxdo', 'cid', 's1', write_storage_state(tmp_path), 'https://provider.example', 'test', {})
+	)
+
+	assert result is None
@@ -0,0 +1,94 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from checkin_qaq_al.pipeline import PowTask, run_pipeline
+
+
+class FakeStages:
+	"""模拟准备 / 求解 / 提交三个阶段，按发生顺序记录事件"""
+
+	def __init__(self, prepare_delay=0.1, solve_delay=0.1, submit_delay=0.05, signed=(), failing=()):
+		self.prepare_delay = prepare_delay
+		self.solve_delay = solve_delay
+		self.submit_delay = submit_delay
+		self.signed = set(signed)
+		self.failing = set(failing)
+		self.events = []
+		self.hps_seen = []
+		self._lock = threading.Lock()
+
+	def record(self, kind, i):
+		with self._lock:
+			self.events.append((kind, i))
+
+	def index(self, kind, i):
+		return self.events.index((kind, i))
+
+	async def prepare(self, i, hps):
+		self.record('prepare', i)
+		self.hps_seen.append(hps)
+		await asyncio.sleep(self.prepare_delay)
+		if i in self.failing:
+			raise RuntimeError('network down')
+		if i in self.signed:
+			return PowTask(outcome=(True, {'already_signed': True, 'index': i}))
+		return PowTask(tier=4, challenge_data={'challenge': f'c{i}'}, hps=1000)
+
+	def solve(self, i, task):
+		self.record('solve', i)
+		time.sleep(self.solve_delay)
+		return {'nonce': i}
+
+	async def submit(self, i, task, result):
+		self.record('submit', i)
+		await asyncio.sleep(self.submit_delay)
+		return True, {'index': i, 'nonce': result['nonce']}
+
+
+def run(stages, count, prefetch=1):
+	names = [f'account_{i + 1}' for i in range(count)]
+	return asyncio.run(run_pipeline(names, stages.prepare, stages.solve, stages.submit, prefetch=prefetch))
+
+
+def test_results_keep_account_order():
+	stages = FakeStages(prepare_delay=0.01, solve_delay=0.01, signed={1}, failing={2})
+	results = run(stages, 4)
+
+	assert results[0] == (True, {'index': 0, 'nonce': 0})
+	assert results[1] == (True, {'already_signed': True, 'index': 1})
+	assert results[2][0] is False and 'network down' in results[2][1]['error']
+	assert results[3] == (True, {'index': 3, 'nonce': 3})
+	# 算力只在第一个账号获取，之后传给后续账号
+	assert stages.hps_seen == [None, 1000, 1000, 1000]
+
+
+def test_network_phases_overlap_solving():
+	stages = FakeStages()
+	started = time.perf_counter()
+	run(stages, 4)
+	elapsed = time.perf_counter() - started
+
+	# 顺序执行需要 4 * (0.1 + 0.1 + 0.05) = 1.0s，流水线约为 0.1 + 4 * 0.1 + 0.05
+	assert elapsed < 0.8
+	# 下一个账号在当前账号求解时准备
+	assert stages.index('prepare', 1) < stages.index('submit', 0)
+
+
+@pytest.mark.parametrize('prefetch', [1, 2])
+def test_prefetch_caps_prepared_accounts(prefetch):
+	stages = FakeStages(prepare_delay=0.01, solve_delay=0.05, submit_delay=0.01)
+	run(stages, 5, prefetch=prefetch)
+
+	# 已准备但尚未开始求解的账号不超过 prefetch 个：账号 i 在账号 i - prefetch 开始求解后才准备
+	for i in range(prefetch, 5):
+		assert stages.index('prepare', i) > stages.index('solve', i - prefetch)
+	assert stages.index('prepare', prefetch) < stages.index('solve', 1)
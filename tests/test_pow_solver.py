@@ -0,0 +1,77 @@
+import hashlib
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from checkin_qaq_al.pow_solver import (
+	PowSolver,
+	benchmark_kernels,
+	count_leading_zero_bits,
+	difficulty_target,
+	search_range,
+)
+
+
+def naive_search(prefix, difficulty, start, stop):
+	for nonce in range(start, stop):
+		hash_bytes = hashlib.sha256(prefix + str(nonce).encode()).digest()
+		if count_leading_zero_bits(hash_bytes) >= difficulty:
+			return nonce, hash_bytes
+	return None
+
+
+def test_count_leading_zero_bits():
+	assert count_leading_zero_bits(bytes(32)) == 256
+	assert count_leading_zero_bits(b'\x00\x00\x1f' + bytes(29)) == 19
+	assert count_leading_zero_bits(b'\x80' + bytes(31)) == 0
+
+
+def test_parallel_solver_finds_valid_nonce():
+	solver = PowSolver(workers=2)
+	try:
+		for challenge in ('abc123', 'def456'):
+			result = solver.solve(challenge, 12)
+			hash_bytes = hashlib.sha256(f'{challenge}:{result["nonce"]}'.encode()).digest()
+			assert result['hash'] == hash_bytes.hex()
+			assert count_leading_zero_bits(hash_bytes) >= 12
+			assert result['leading'] == count_leading_zero_bits(hash_bytes)
+	finally:
+		solver.close()
+
+
+def test_difficulty_target_matches_leading_zero_bits():
+	for difficulty in (1, 7, 8, 9, 20, 255, 256):
+		target = difficulty_target(difficulty)
+		assert len(target) == 32
+		below = (int.from_bytes(target, 'big') - 1).to_bytes(32, 'big')
+		assert count_leading_zero_bits(below) >= difficulty
+		if difficulty < 256:
+			assert count_leading_zero_bits(target) == difficulty - 1
+	assert difficulty_target(0) is None
+
+
+def test_search_range_matches_naive_search():
+	# 覆盖 1000 分组边界、十进制位数变化和未对齐的区间
+	cases = [(0, 20000), (995, 12345), (99990, 130000), (999999, 1001500), (7, 8)]
+	for difficulty in (0, 1, 4, 10):
+		for start, stop in cases:
+			assert search_range(b'abc:', difficulty, start, stop) == naive_search(b'abc:', difficulty, start, stop)
+	assert search_range(b'abc:', 256, 0, 5000) is None
+
+
+def test_kernel_is_faster_than_naive_loop():
+	result = benchmark_kernels(200000)
+	assert result['speedup'] > 1.3
+
+
+def test_solve_raises_when_no_nonce_found(monkeypatch):
+	solver = PowSolver(workers=2)
+	monkeypatch.setattr(solver, '_run_job', lambda prefix, difficulty: (None, 0, 1.0))
+
+	with pytest.raises(RuntimeError, match='PoW 求解未找到结果'):
+		solver.solve('challenge', 12)
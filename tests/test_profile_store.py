@@ -0,0 +1,64 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.profile_store import ProfileStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+	monkeypatch.setenv('BROWSER_PROFILE_DIR', str(tmp_path / 'profiles'))
+	monkeypatch.setenv('BROWSER_PROFILE_STORE', 'true')
+	monkeypatch.delenv('BROWSER_PROFILE_TMPFS', raising=False)
+	return ProfileStore()
+
+
+def test_make_key_hides_proxy():
+	key = ProfileStore.make_key('anyrouter', {'server': 'http://proxy.example:8080', 'password': 'secret'})
+	assert key.startswith('anyrouter|')
+	assert 'secret' not in key
+	assert ProfileStore.make_key('anyrouter') == 'anyrouter|direct'
+
+
+def test_acquire_reuses_directory_and_evicts_lru(store, monkeypatch):
+	monkeypatch.setenv('BROWSER_PROFILE_MAX_COUNT', '2')
+
+	async def use(key, size=0):
+		async with store.acquire(key) as path:
+			if size:
+				with open(os.path.join(path, 'cache.bin'), 'wb') as f:
+					f.write(b'0' * size)
+			return path
+
+	async def run():
+		first = await use('a|direct', size=10)
+		assert await use('a|direct') == first
+		second = await use('b|direct')
+		await use('c|direct')
+		return first, second
+
+	first, second = asyncio.run(run())
+
+	# 超过数量上限时淘汰最久未使用的 profile
+	assert not os.path.exists(first)
+	assert os.path.exists(second)
+
+
+def test_size_limit(store, monkeypatch):
+	monkeypatch.setenv('BROWSER_PROFILE_MAX_SIZE_MB', '1')
+
+	async def run():
+		async with store.acquire('big|direct') as path:
+			with open(os.path.join(path, 'cache.bin'), 'wb') as f:
+				f.write(b'0' * (2 * 1024 * 1024))
+		return path
+
+	path = asyncio.run(run())
+	assert not os.path.exists(path)
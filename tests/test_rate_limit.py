@@ -0,0 +1,60 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.rate_limit import RateLimiter, TokenBucket, normalize_host
+
+
+def test_normalize_host():
+	assert normalize_host('https://Fuli.hxi.me/api/checkin') == 'fuli.hxi.me'
+	assert normalize_host('tw.b4u.qzz.io/') == 'tw.b4u.qzz.io'
+	assert normalize_host('http://localhost:3000') == 'localhost:3000'
+
+
+def test_token_bucket_spaces_requests_after_burst():
+	bucket = TokenBucket(rate=20, burst=2)
+
+	async def run():
+		started = time.monotonic()
+		await asyncio.gather(*(bucket.acquire() for _ in range(4)))
+		return time.monotonic() - started
+
+	# 前 2 个请求使用突发令牌，后 2 个各等待 1/20 秒
+	elapsed = asyncio.run(run())
+	assert 0.08 <= elapsed < 0.5
+
+
+def test_limiter_only_limits_configured_hosts(monkeypatch):
+	monkeypatch.delenv('RATE_LIMIT', raising=False)
+	limiter = RateLimiter()
+	limiter.configure({'https://anyrouter.top': 5, 'fuli.hxi.me': 1})
+
+	assert limiter.get_rate('https://anyrouter.top/api/user/self') == 5
+	assert limiter.get_rate('https://fuli.hxi.me/api/checkin') == 1
+	assert limiter.get_rate('https://other.example/api') == 0
+
+	monkeypatch.setenv('RATE_LIMIT', '3')
+	assert limiter.get_rate('https://other.example/api') == 3
+
+
+def test_limiter_shares_bucket_per_host(monkeypatch):
+	monkeypatch.delenv('RATE_LIMIT', raising=False)
+	limiter = RateLimiter()
+	limiter.configure({'a.example': 1})
+
+	async def run():
+		await limiter.acquire('https://a.example/x')
+		started = time.monotonic()
+		# 不限速的 host 不等待
+		await limiter.acquire('https://b.example/x')
+		assert time.monotonic() - started < 0.05
+		# 同一 host 的不同路径共享令牌
+		await limiter.acquire('https://a.example/y')
+		return time.monotonic() - started
+
+	assert asyncio.run(run()) >= 0.9
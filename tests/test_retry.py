@@ -0,0 +1,132 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from curl_cffi.const import CurlECode
+from curl_cffi.requests import RequestsError
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.retry import CircuitBreakers, CircuitOpenError, RetryPolicy, policy_for, request_with_retry
+
+NO_DELAY = dict(base_delay=0, max_delay=0)
+
+
+class FakeResponse:
+	def __init__(self, status_code):
+		self.status_code = status_code
+
+
+def sender(outcomes):
+	"""依次返回状态码或抛出异常"""
+	calls = []
+
+	async def send():
+		outcome = outcomes[len(calls)]
+		calls.append(outcome)
+		if isinstance(outcome, Exception):
+			raise outcome
+		return FakeResponse(outcome)
+
+	return send, calls
+
+
+def test_policy_by_method(monkeypatch):
+	monkeypatch.delenv('HTTP_RETRY_ATTEMPTS', raising=False)
+	assert policy_for('get').attempts == 3
+	assert 429 in policy_for('GET').retry_statuses
+	post = policy_for('POST')
+	assert post.attempts == 2
+	assert not post.retry_statuses
+	assert not post.retry_sent_errors
+
+	monkeypatch.setenv('HTTP_RETRY_ATTEMPTS', '1')
+	assert policy_for('GET').attempts == 1
+	assert policy_for('POST').attempts == 1
+
+
+def test_retries_transient_errors_until_success(monkeypatch):
+	monkeypatch.setenv('CIRCUIT_BREAKER_THRESHOLD', '2')
+	breakers = CircuitBreakers()
+	policy = RetryPolicy(attempts=3, retry_statuses=frozenset({502}), **NO_DELAY)
+	send, calls = sender([RequestsError('reset'), 502, 200])
+
+	response = asyncio.run(request_with_retry('GET', 'https://a.example/api/user/self', send, policy, breakers))
+	assert response.status_code == 200
+	assert len(calls) == 3
+	assert not breakers.is_open('https://a.example')
+
+
+def test_non_retryable_status_returned_immediately():
+	policy = RetryPolicy(attempts=3, retry_statuses=frozenset({502}), **NO_DELAY)
+	send, calls = sender([401])
+	response = asyncio.run(request_with_retry('POST', 'https://a.example/api/user/sign_in', send, policy, CircuitBreakers()))
+	assert response.status_code == 401
+	assert len(calls) == 1
+
+
+def test_non_idempotent_retries_only_unsent_errors():
+	policy = policy_for('POST')
+	policy = RetryPolicy(
+		attempts=policy.attempts,
+		retry_statuses=policy.retry_statuses,
+		retry_sent_errors=policy.retry_sent_errors,
+		**NO_DELAY,
+	)
+	url = 'https://a.example/api/user/sign_in'
+
+	# 网关错误可能在后端处理完请求之后返回，不重试
+	send, calls = sender([502, 200])
+	assert asyncio.run(request_with_retry('POST', url, send, policy, CircuitBreakers())).status_code == 502
+	assert len(calls) == 1
+
+	# 超时可能发生在请求发出之后，不重试
+	send, calls = sender([RequestsError('timeout', code=CurlECode.OPERATION_TIMEDOUT), 200])
+	with pytest.raises(RequestsError):
+		asyncio.run(request_with_retry('POST', url, send, policy, CircuitBreakers()))
+	assert len(calls) == 1
+
+	# 连接未建立，请求没有发出，可以重试
+	send, calls = sender([RequestsError('refused', code=CurlECode.COULDNT_CONNECT), 200])
+	assert asyncio.run(request_with_retry('POST', url, send, policy, CircuitBreakers())).status_code == 200
+	assert len(calls) == 2
+
+
+def test_circuit_opens_after_consecutive_failures(monkeypatch):
+	monkeypatch.setenv('CIRCUIT_BREAKER_THRESHOLD', '2')
+	breakers = CircuitBreakers()
+	policy = RetryPolicy(attempts=2, retry_statuses=frozenset({503}), **NO_DELAY)
+
+	async def run():
+		send, _ = sender([503, 503])
+		assert (await request_with_retry('GET', 'https://a.example/x', send, policy, breakers)).status_code == 503
+		send, _ = sender([RequestsError('timeout'), RequestsError('timeout')])
+		with pytest.raises(RequestsError):
+			await request_with_retry('GET', 'https://a.example/y', send, policy, breakers)
+
+		assert breakers.is_open('https://a.example/api/user/self')
+		assert not breakers.is_open('https://b.example')
+
+		send, calls = sender([200])
+		with pytest.raises(CircuitOpenError):
+			await request_with_retry('GET', 'https://a.example/z', send, policy, breakers)
+		assert calls == []
+
+	asyncio.run(run())
+
+
+def test_success_resets_failures_and_threshold_zero_disables(monkeypatch):
+	monkeypatch.setenv('CIRCUIT_BREAKER_THRESHOLD', '2')
+	breakers = CircuitBreakers()
+	breakers.record_failure('https://a.example/x')
+	breakers.record_success('https://a.example/y')
+	breakers.record_failure('https://a.example/x')
+	assert not breakers.is_open('https://a.example')
+
+	breakers.record_failure('https://a.example/x')
+	assert breakers.is_open('https://a.example')
+	monkeypatch.setenv('CIRCUIT_BREAKER_THRESHOLD', '0')
+	assert not breakers.is_open('https://a.example')
@@ -0,0 +1,60 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.scheduler import AccountScheduler
+
+
+def _make_job(name: str, delay: float, running: dict, peaks: dict, provider: str):
+	async def job():
+		running['total'] += 1
+		running[provider] = running.get(provider, 0) + 1
+		peaks['total'] = max(peaks.get('total', 0), running['total'])
+		peaks[provider] = max(peaks.get(provider, 0), running[provider])
+		await asyncio.sleep(delay)
+		running['total'] -= 1
+		running[provider] -= 1
+		return name
+
+	return job
+
+
+def test_results_keep_input_order():
+	running = {'total': 0}
+	peaks = {}
+	jobs = [
+		('a', _make_job('first', 0.03, running, peaks, 'a')),
+		('b', _make_job('second', 0.01, running, peaks, 'b')),
+		('a', _make_job('third', 0.0, running, peaks, 'a')),
+	]
+
+	results = asyncio.run(AccountScheduler(max_concurrency=3).run(jobs))
+
+	assert results == ['first', 'second', 'third']
+
+
+def test_global_limit():
+	running = {'total': 0}
+	peaks = {}
+	jobs = [('a', _make_job(str(i), 0.01, running, peaks, 'a')) for i in range(6)]
+
+	asyncio.run(AccountScheduler(max_concurrency=2).run(jobs))
+
+	assert peaks['total'] == 2
+
+
+def test_provider_limit():
+	running = {'total': 0}
+	peaks = {}
+	jobs = [('a', _make_job(f'a{i}', 0.01, running, peaks, 'a')) for i in range(4)]
+	jobs += [('b', _make_job(f'b{i}', 0.01, running, peaks, 'b')) for i in range(4)]
+
+	asyncio.run(AccountScheduler(max_concurrency=4, provider_limits={'a': 1}).run(jobs))
+
+	assert peaks['a'] == 1
+	assert peaks['b'] > 1
+	assert peaks['total'] <= 4
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.session_cache import ProviderSessionCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+	monkeypatch.setenv('PROVIDER_SESSION_CACHE_FILE', str(tmp_path / 'provider_sessions.json'))
+	monkeypatch.delenv('PROVIDER_SESSION_CACHE', raising=False)
+	return ProviderSessionCache()
+
+
+def test_save_strips_bypass_cookies_and_persists(cache):
+	key = ProviderSessionCache.make_key('anyrouter', 'github', 'user@example.com')
+	assert 'user@example.com' not in key
+
+	cache.save(key, {'session': 'abc', 'acw_tc': 'waf', 'cf_clearance': 'cf'}, 123)
+
+	entry = ProviderSessionCache().get(key)
+	assert entry['cookies'] == {'session': 'abc'}
+	assert entry['api_user'] == 123
+
+
+def test_invalidate(cache):
+	key = ProviderSessionCache.make_key('anyrouter', 'linuxdo', 'user')
+	cache.save(key, {'session': 'abc'}, 1)
+	cache.invalidate(key)
+
+	assert cache.get(key) is None
+	assert ProviderSessionCache().get(key) is None
+
+
+def test_disabled(cache, monkeypatch):
+	monkeypatch.setenv('PROVIDER_SESSION_CACHE', 'false')
+	key = ProviderSessionCache.make_key('anyrouter', 'github', 'user')
+	cache.save(key, {'session': 'abc'}, 1)
+
+	assert cache.get(key) is None
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.shard import account_shard, load_shard_results, parse_shard, save_shard_result
+
+
+class FakeAccount:
+	def __init__(self, provider, name=None):
+		self.provider = provider
+		self.name = name
+
+	def get_display_name(self, index=0):
+		return self.name if self.name else f'{self.provider} {index + 1}'
+
+
+def test_parse_shard():
+	assert parse_shard(None) is None
+	assert parse_shard('2/3') == (2, 3)
+	for value in ('0/3', '4/3', '1', 'a/b'):
+		with pytest.raises(ValueError):
+			parse_shard(value)
+
+
+def test_account_shard_is_stable_and_covers_all_accounts():
+	accounts = [FakeAccount('anyrouter', f'user{i}') for i in range(50)]
+	shards = [account_shard(account, i, 3) for i, account in enumerate(accounts)]
+	assert set(shards) == {1, 2, 3}
+
+	# 设置了 name 的账号不受顺序影响
+	assert account_shard(accounts[10], 0, 3) == shards[10]
+
+
+def test_save_and_merge(tmp_path, monkeypatch):
+	monkeypatch.setenv('SHARD_RESULTS_DIR', str(tmp_path))
+	save_shard_result((2, 2), [{'index': 1, 'account_key': 'account_2'}])
+	save_shard_result((1, 2), [{'index': 0, 'account_key': 'account_1'}, {'index': 2, 'account_key': 'account_3'}])
+
+	reports, missing = load_shard_results()
+	assert [report['account_key'] for report in reports] == ['account_1', 'account_2', 'account_3']
+	assert missing == []
+
+
+def test_merge_reports_missing_shards(tmp_path, monkeypatch):
+	monkeypatch.setenv('SHARD_RESULTS_DIR', str(tmp_path))
+	save_shard_result((1, 3), [{'index': 0, 'account_key': 'account_1'}])
+
+	reports, missing = load_shard_results()
+	assert [report['account_key'] for report in reports] == ['account_1']
+	assert missing == [2, 3]
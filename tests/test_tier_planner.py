@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from checkin_qaq_al.tier_planner import TierPlanner, estimate_solve_seconds
+
+
+def test_estimate_solve_seconds():
+	assert estimate_solve_seconds(20, 2**20) == 1
+	assert estimate_solve_seconds(24, 2**20) == 16
+	# 算力未知时使用服务端给出的预计时间
+	assert estimate_solve_seconds(24, 0, 30) == 30
+
+
+def test_no_budget_always_accepts_highest_tier(monkeypatch):
+	monkeypatch.delenv('QAQ_AL_TIME_BUDGET', raising=False)
+	planner = TierPlanner()
+	assert planner.candidate_tiers(4) == [4, 3, 2, 1]
+	assert planner.accept(4, 40, 1000)
+
+
+def test_budget_lowers_tier_and_remembers():
+	planner = TierPlanner(budget=60)
+	hps = 2**20
+	# tier 4 需要 2^28 次哈希（约 256s），超出预算
+	assert not planner.accept(4, 28, hps)
+	assert planner.accept(3, 25, hps)
+	# 后续账号不再请求超出预算的等级
+	assert planner.candidate_tiers(4) == [3, 2, 1]
+
+
+def test_lowest_tier_is_always_accepted():
+	planner = TierPlanner(budget=1)
+	assert not planner.accept(2, 30, 1000)
+	assert planner.accept(1, 30, 1000)
+	assert planner.candidate_tiers(2) == [1]
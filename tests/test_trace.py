@@ -0,0 +1,62 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.trace import Tracer
+
+
+def test_spans_carry_labels_and_export(tmp_path, monkeypatch):
+	trace_file = tmp_path / 'trace.json'
+	monkeypatch.setenv('TRACE_FILE', str(trace_file))
+	monkeypatch.delenv('TRACE', raising=False)
+	tracer = Tracer()
+
+	@tracer.phase('check_in')
+	async def check_in():
+		with tracer.span('GET /api/user/sign_in', 'http') as args:
+			args['status'] = 200
+		return True
+
+	async def run():
+		with tracer.labels(account='account_1', provider='anyrouter'):
+			with tracer.labels(auth_method='github'):
+				assert await check_in()
+		with tracer.labels(account='account_2', provider='agentrouter'):
+			await check_in()
+
+	asyncio.run(run())
+
+	assert tracer.export() == str(trace_file)
+	data = json.loads(trace_file.read_text(encoding='utf-8'))
+	events = [event for event in data['traceEvents'] if event['ph'] == 'X']
+	assert len(events) == 4
+
+	http_event = events[0]
+	assert http_event['cat'] == 'http'
+	assert http_event['args'] == {'account': 'account_1', 'provider': 'anyrouter', 'auth_method': 'github', 'status': 200}
+	# 每个账号使用独立的泳道
+	assert events[0]['tid'] == events[1]['tid'] != events[2]['tid']
+
+	lanes = {event['args']['name'] for event in data['traceEvents'] if event['ph'] == 'M'}
+	assert lanes == {'account_1', 'account_2'}
+
+	summary = {(row['provider'], row['name']): row['count'] for row in tracer.summary()}
+	assert summary[('anyrouter', 'check_in')] == 1
+	assert summary[('agentrouter', 'GET /api/user/sign_in')] == 1
+
+
+def test_disabled(tmp_path, monkeypatch):
+	monkeypatch.setenv('TRACE', 'false')
+	monkeypatch.setenv('TRACE_FILE', str(tmp_path / 'trace.json'))
+	tracer = Tracer()
+
+	with tracer.span('account'):
+		pass
+
+	assert tracer.summary() == []
+	assert tracer.export() is None
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Camoufox 浏览器池模块
+
+按 (代理, 浏览器指纹, 启动配置) 复用 Camoufox 浏览器进程，
+每个账号使用独立的 BrowserContext，互不共享 cookies 和 storage
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+from camoufox.async_api import AsyncCamoufox
+from playwright.async_api import Browser, BrowserContext
+
+from utils.http_utils import proxy_resolve
+from utils.profile_store import profile_store
+from utils.trace import tracer
+
+DEFAULT_POOL_SIZE = 1
+DEFAULT_MAX_USES = 20
+
+
+@dataclass
+class _BrowserSlot:
+    """池中的单个浏览器进程"""
+
+    launcher: AsyncCamoufox
+    browser: Browser
+    uses: int = 0
+    active: int = 0
+    retiring: bool = False
+
+
+class BrowserPool:
+    """Camoufox 浏览器池
+
+    - BROWSER_POOL_SIZE: 每个 key 最多保留的浏览器进程数，0 表示禁用浏览器池（每次调用单独启动浏览器）
+    - BROWSER_POOL_MAX_USES: 单个浏览器进程最多创建的 context 数，达到后等当前 context 全部关闭再回收
+    """
+
+    def __init__(self):
+        self._slots: dict[str, list[_BrowserSlot]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @property
+    def size(self) -> int:
+        try:
+            return max(0, int(os.getenv("BROWSER_POOL_SIZE", str(DEFAULT_POOL_SIZE))))
+        except ValueError:
+            return DEFAULT_POOL_SIZE
+
+    @property
+    def max_uses(self) -> int:
+        try:
+            return max(1, int(os.getenv("BROWSER_POOL_MAX_USES", str(DEFAULT_MAX_USES))))
+        except ValueError:
+            return DEFAULT_MAX_USES
+
+    @staticmethod
+    def _launch_options(proxy_config: dict | None, os_name: str | None, config: dict | None) -> dict:
+        """生成 Camoufox 启动参数"""
+        options: dict[str, Any] = {
+            "headless": False,
+            "humanize": True,
+            "locale": "en-US",
+            "geoip": True if proxy_config else False,
+            "proxy": proxy_config,
+        }
+        if os_name:
+            options["os"] = os_name
+        if config:
+            options["config"] = config
+        return options
+
+    @staticmethod
+    def _make_key(proxy_config: dict | None, os_name: str | None, config: dict | None) -> str:
+        """生成浏览器池 key，代理地址只保存哈希值"""
+        proxy_url = proxy_resolve(proxy_config)
+        proxy_id = hashlib.sha256(proxy_url.encode("utf-8")).hexdigest()[:12] if proxy_url else "direct"
+        config_id = json.dumps(config or {}, sort_keys=True)
+        return f"{proxy_id}|{os_name or 'default'}|{config_id}"
+
+    def _get_lock(self, key: str) -> asyncio.Lock:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    async def _launch(self, account_name: str, options: dict) -> _BrowserSlot:
+        print(f"🚀 {account_name}: Launching pooled browser (using proxy: {'true' if options.get('proxy') else 'false'})")
+        with tracer.span("browser_launch", "browser", pooled=True):
+            launcher = AsyncCamoufox(**options)
+            browser = await launcher.__aenter__()
+        return _BrowserSlot(launcher=launcher, browser=browser)
+
+    async def _close_slot(self, slot: _BrowserSlot) -> None:
+        try:
+            await slot.launcher.__aexit__(None, None, None)
+        except Exception as e:
+            print(f"⚠️ Failed to close pooled browser: {e}")
+
+    async def _acquire(self, key: str, account_name: str, options: dict) -> _BrowserSlot:
+        """获取可用的浏览器进程，优先使用空闲进程，未达上限时启动新进程"""
+        async with self._get_lock(key):
+            slots = self._slots.setdefault(key, [])
+
+            # 移除已断开连接的浏览器（崩溃或被外部关闭）
+            for slot in [s for s in slots if not s.browser.is_connected()]:
+                slots.remove(slot)
+                print(f"⚠️ {account_name}: Pooled browser disconnected, discarding it")
+
+            alive = [s for s in slots if not s.retiring]
+            idle = [s for s in alive if s.active == 0]
+            if idle:
+                slot = idle[0]
+            elif len(alive) < self.size:
+                slot = await self._launch(account_name, options)
+                slots.append(slot)
+            else:
+                slot = min(alive, key=lambda s: s.active)
+
+            slot.uses += 1
+            slot.active += 1
+            if slot.uses >= self.max_uses:
+                slot.retiring = True
+            return slot
+
+    async def _release(self, key: str, slot: _BrowserSlot) -> None:
+        """归还浏览器进程，达到使用上限且没有活动 context 时回收"""
+        async with self._get_lock(key):
+            slot.active -= 1
+            if slot.retiring and slot.active == 0:
+                slots = self._slots.get(key, [])
+                if slot in slots:
+                    slots.remove(slot)
+                await self._close_slot(slot)
+
+    @asynccontextmanager
+    async def context(
+        self,
+        account_name: str,
+        proxy_config: dict | None = None,
+        os_name: str | None = "macos",
+        config: dict | None = None,
+        storage_state: str | dict | None = None,
+        profile_key: str | None = None,
+    ) -> AsyncIterator[BrowserContext]:
+        """获取独立的浏览器 context
+
+        Args:
+            account_name: 账号名称（用于日志输出）
+            proxy_config: Camoufox 代理配置
+            os_name: 浏览器指纹操作系统（Camoufox os 参数），默认 macOS 避免跨平台指纹不一致
+            config: Camoufox config 参数
+            storage_state: 恢复的 storage state 文件路径或字典
+            profile_key: 持久化 profile key，启用 profile 存储时使用该 profile 单独启动浏览器（不能与 storage_state 同时使用）
+
+        Yields:
+            BrowserContext，退出时自动关闭
+        """
+        options = self._launch_options(proxy_config, os_name, config)
+
+        if profile_key and profile_store.enabled:
+            async with profile_store.acquire(profile_key) as user_data_dir:
+                launcher = AsyncCamoufox(**options, persistent_context=True, user_data_dir=user_data_dir)
+                with tracer.span("browser_launch", "browser", pooled=False, profile=True):
+                    context = await launcher.__aenter__()
+                try:
+                    # 只复用 HTTP 缓存、service worker 等数据，cookies 每次重新获取
+                    await context.clear_cookies()
+                    yield context
+                finally:
+                    await launcher.__aexit__(None, None, None)
+            return
+
+        if self.size <= 0:
+            launcher = AsyncCamoufox(**options)
+            with tracer.span("browser_launch", "browser", pooled=False):
+                browser = await launcher.__aenter__()
+            try:
+                context = await browser.new_context(storage_state=storage_state)
+                try:
+                    yield context
+                finally:
+                    await context.close()
+            finally:
+                await launcher.__aexit__(None, None, None)
+            return
+
+        key = self._make_key(proxy_config, os_name, config)
+        slot = await self._acquire(key, account_name, options)
+        try:
+            context = await slot.browser.new_context(storage_state=storage_state)
+            try:
+                yield context
+            finally:
+                try:
+                    await context.close()
+                except Exception as e:
+                    print(f"⚠️ {account_name}: Failed to close browser context: {e}")
+        finally:
+            await self._release(key, slot)
+
+    async def close(self) -> None:
+        """关闭池中所有浏览器进程"""
+        slots = [slot for key_slots in self._slots.values() for slot in key_slots]
+        self._slots = {}
+        self._locks = {}
+        for slot in slots:
+            await self._close_slot(slot)
+        if slots:
+            print(f"ℹ️ Browser pool closed ({len(slots)} browser(s))")
+
+
+browser_pool = BrowserPool()
@@ -3,9 +3,12 @@
 浏览器自动化相关的公共工具函数
 """
 
+import asyncio
 import os
 import random
+import time
 from datetime import datetime
+from typing import Awaitable
 from urllib.parse import urlparse
 
 
@@ -105,6 +108,136 @@ def get_random_user_agent() -> str:
     return random.choice(user_agents)
 
 
+# 拦截的资源类型
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# 常见统计 / 广告脚本域名
+TRACKER_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "static.cloudflareinsights.com",
+    "clarity.ms",
+    "hotjar.com",
+    "hm.baidu.com",
+    "cnzz.com",
+    "umeng.com",
+    "plausible.io",
+)
+
+# 验证相关的请求（Cloudflare 验证、阿里云滑块验证）始终放行
+CHALLENGE_HOSTS = ("challenges.cloudflare.com", "alicdn.com", "aliyun.com", "aliyuncs.com")
+CHALLENGE_PATHS = ("/cdn-cgi/",)
+
+
+def _host_matches(host: str, domains: tuple[str, ...]) -> bool:
+    return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+
+def should_block_request(url: str, resource_type: str) -> bool:
+    """判断是否拦截请求：图片、媒体、字体和统计脚本，验证相关请求除外
+
+    Args:
+        url: 请求 URL
+        resource_type: Playwright 资源类型
+
+    Returns:
+        bool: 是否拦截
+    """
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if _host_matches(host, CHALLENGE_HOSTS) or parsed.path.startswith(CHALLENGE_PATHS):
+        return False
+    return resource_type in BLOCKED_RESOURCE_TYPES or _host_matches(host, TRACKER_HOSTS)
+
+
+def resource_blocking_enabled() -> bool:
+    """BLOCK_RESOURCES 设置为 false 时不拦截资源，默认开启"""
+    return os.getenv("BLOCK_RESOURCES", "true").lower() in ("true", "1", "yes")
+
+
+async def block_heavy_resources(context, account_name: str) -> dict:
+    """在浏览器 context 上拦截图片、媒体、字体和统计脚本，减少代理流量并缩短 networkidle 等待
+
+    Args:
+        context: 浏览器 context
+        account_name: 账号名称（用于日志输出）
+
+    Returns:
+        拦截统计字典 {"blocked": int}，随请求实时更新
+    """
+    stats = {"blocked": 0}
+
+    async def handle_route(route):
+        request = route.request
+        if should_block_request(request.url, request.resource_type):
+            stats["blocked"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle_route)
+    print(f"ℹ️ {account_name}: Blocking images, media, fonts and trackers in this browser context")
+    return stats
+
+
+async def wait_for_condition(account_name: str, description: str, waiter: Awaitable) -> bool:
+    """等待条件满足并输出实际等待时间
+
+    Args:
+        account_name: 账号名称（用于日志输出）
+        description: 等待条件描述
+        waiter: 带超时的等待协程，例如 page.wait_for_url(..., timeout=...)
+
+    Returns:
+        bool: 条件是否在超时前满足
+    """
+    start = time.perf_counter()
+    try:
+        await waiter
+        print(f"⏱️ {account_name}: {description} after {time.perf_counter() - start:.1f}s")
+        return True
+    except Exception as e:
+        print(f"⚠️ {account_name}: {description} not reached within {time.perf_counter() - start:.1f}s: {e}")
+        return False
+
+
+async def wait_for_cookies(
+    context,
+    names: list[str],
+    account_name: str,
+    timeout: int = 30000,
+    interval: int = 250,
+    require_all: bool = False,
+) -> bool:
+    """等待浏览器 context 中出现指定的 cookie
+
+    Args:
+        context: 浏览器 context
+        names: cookie 名称列表
+        account_name: 账号名称（用于日志输出）
+        timeout: 最大等待时间（毫秒）
+        interval: 检查间隔（毫秒）
+        require_all: 为 True 时等待所有 cookie 都出现，否则出现任意一个即返回
+
+    Returns:
+        bool: 是否在超时前获取到 cookie
+    """
+    start = time.perf_counter()
+    deadline = start + timeout / 1000
+    while True:
+        cookies = await context.cookies()
+        found = [cookie.get("name") for cookie in cookies if cookie.get("name") in names and cookie.get("value")]
+        if found and (not require_all or set(names) <= set(found)):
+            print(f"⏱️ {account_name}: Cookie {', '.join(found)} present after {time.perf_counter() - start:.1f}s")
+            return True
+        if time.perf_counter() >= deadline:
+            print(f"⚠️ {account_name}: Cookie {', '.join(names)} not present within {time.perf_counter() - start:.1f}s")
+            return False
+        await asyncio.sleep(interval / 1000)
+
+
 async def take_screenshot(
     page,
     reason: str,
@@ -255,8 +388,15 @@ async def aliyun_captcha_check(page, account_name: str) -> bool:
                     await page.mouse.up()
                     await take_screenshot(page, "aliyun_captcha_slider_completed", account_name)
 
-                    # Wait for page to be fully loaded
-                    await page.wait_for_timeout(20000)
+                    # 验证通过后页面会重新加载，等待验证码元素消失并加载完成
+                    await wait_for_condition(
+                        account_name,
+                        "Aliyun captcha passed",
+                        page.wait_for_function("() => !document.getElementById('traceid')", timeout=20000),
+                    )
+                    await wait_for_condition(
+                        account_name, "Page network idle", page.wait_for_load_state("networkidle", timeout=10000)
+                    )
 
                     await take_screenshot(page, "aliyun_captcha_slider_result", account_name)
                     return True
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Bypass cookies 共享模块
+
+按 (origin, 代理, 浏览器指纹) 缓存 WAF / Cloudflare bypass cookies，
+同一次运行中的所有账号共享，并持久化到文件供下次运行复用
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Awaitable, Callable
+from urllib.parse import urlparse
+
+from utils.http_utils import proxy_resolve
+
+DEFAULT_CACHE_FILE = "storage-states/bypass_cookies.json"
+DEFAULT_TTL = 1800
+
+# 获取 bypass cookies 的函数类型：返回 (cookies, browser_headers)
+BypassFetcher = Callable[[], Awaitable[tuple[dict | None, dict | None]]]
+
+
+class BypassCookieBroker:
+    """Bypass cookies 代理类
+
+    - 同一 key 同一时刻只会启动一次浏览器，其它账号等待并复用结果
+    - cookies 带有效期持久化，下次运行在有效期内直接复用
+    - 请求遇到验证页面时由调用方 invalidate，再重新获取
+    """
+
+    def __init__(self):
+        self._entries: dict[str, dict] | None = None
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @property
+    def cache_file(self) -> str:
+        return os.getenv("BYPASS_COOKIE_CACHE_FILE", DEFAULT_CACHE_FILE)
+
+    @property
+    def ttl(self) -> int:
+        try:
+            return int(os.getenv("BYPASS_COOKIE_TTL", str(DEFAULT_TTL)))
+        except ValueError:
+            return DEFAULT_TTL
+
+    @staticmethod
+    def make_key(url: str, proxy_config: dict | None = None, fingerprint: str = "macos") -> str:
+        """生成缓存 key
+
+        代理地址只保存哈希值，避免把代理账号密码写入缓存文件
+
+        Args:
+            url: 目标 URL（只取 scheme + host）
+            proxy_config: 代理配置
+            fingerprint: 浏览器指纹标识（Camoufox os 参数）
+        """
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        proxy_url = proxy_resolve(proxy_config)
+        proxy_id = hashlib.sha256(proxy_url.encode("utf-8")).hexdigest()[:12] if proxy_url else "direct"
+        return f"{origin}|{proxy_id}|{fingerprint}"
+
+    def _load(self) -> dict[str, dict]:
+        """加载持久化缓存（只加载一次）"""
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._entries = data
+        except Exception as e:
+            print(f"⚠️ Failed to load bypass cookie cache: {e}")
+        return self._entries
+
+    def _save(self) -> None:
+        """保存缓存到文件，只保留未过期的条目"""
+        entries = self._load()
+        now = time.time()
+        valid_entries = {key: entry for key, entry in entries.items() if entry.get("expires_at", 0) > now}
+        try:
+            cache_dir = os.path.dirname(self.cache_file)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(valid_entries, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"⚠️ Failed to save bypass cookie cache: {e}")
+
+    def _get_lock(self, key: str) -> asyncio.Lock:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    def _get_valid_entry(self, key: str) -> dict | None:
+        entry = self._load().get(key)
+        if entry and entry.get("cookies") and entry.get("expires_at", 0) > time.time():
+            return entry
+        return None
+
+    def has_valid(self, key: str) -> bool:
+        """判断 key 是否有未过期的缓存 cookies"""
+        return self._get_valid_entry(key) is not None
+
+    async def get(
+        self,
+        key: str,
+        fetcher: BypassFetcher,
+        account_name: str,
+    ) -> tuple[dict | None, dict | None, bool]:
+        """获取 bypass cookies
+
+        Args:
+            key: 缓存 key，通过 make_key 生成
+            fetcher: 缓存未命中时调用的获取函数
+            account_name: 账号名称（用于日志输出）
+
+        Returns:
+            (cookies, browser_headers, 是否来自缓存)
+        """
+        async with self._get_lock(key):
+            entry = self._get_valid_entry(key)
+            if entry:
+                remaining = int(entry["expires_at"] - time.time())
+                print(
+                    f"♻️ {account_name}: Reusing cached bypass cookies for {key.split('|')[0]} "
+                    f"({list(entry['cookies'].keys())}, expires in {remaining}s)"
+                )
+                return dict(entry["cookies"]), entry.get("headers"), True
+
+            cookies, browser_headers = await fetcher()
+            if cookies:
+                now = time.time()
+                self._load()[key] = {
+                    "cookies": cookies,
+                    "headers": browser_headers,
+                    "created_at": now,
+                    "expires_at": now + self.ttl,
+                }
+                self._save()
+            return cookies, browser_headers, False
+
+    def invalidate(self, key: str, stale_cookies: dict | None = None) -> None:
+        """使缓存失效
+
+        Args:
+            key: 缓存 key
+            stale_cookies: 已失效的 cookies；如果缓存已被其它账号刷新为新值则不删除
+        """
+        entries = self._load()
+        entry = entries.get(key)
+        if not entry:
+            return
+        if stale_cookies is not None and entry.get("cookies") != stale_cookies:
+            return
+        entries.pop(key, None)
+        self._save()
+
+
+bypass_broker = BypassCookieBroker()
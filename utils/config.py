@@ -6,9 +6,11 @@
 import json
 import os
 from dataclasses import dataclass, field
-from typing import Callable, Dict, Generator, AsyncGenerator, List, Literal
+from typing import Awaitable, Callable, Dict, Generator, AsyncGenerator, List, Literal
 
+from utils.browser_utils import resource_blocking_enabled
 from utils.get_check_in_status import newapi_check_in_status
+from utils.rate_limit import normalize_host
 from utils.get_cdk import (
     get_runawaytime_cdk,
     get_x666_cdk,
@@ -26,10 +28,44 @@ CdkGetterFunc = Callable[["AccountConfig"], Generator[tuple[bool, dict], None, N
 AsyncCdkGetterFunc = Callable[["AccountConfig"], AsyncGenerator[tuple[bool, dict], None]]
 
 # 签到状态查询函数类型：接收 ProviderConfig 和 AccountConfig 参数，返回 bool（今日是否已签到）
-# 函数签名: (provider_config, account_config, cookies, headers) -> bool
+# 函数签名: (provider_config, account_config, cookies, headers) -> bool，也可以是返回 bool 的协程函数
 # 代理配置从 account_config.proxy 或 account_config.get("global_proxy") 获取
 # headers 中已包含 api_user_key，无需单独传递 api_user
-CheckInStatusFunc = Callable[["ProviderConfig", "AccountConfig", dict, dict], bool]
+CheckInStatusFunc = Callable[["ProviderConfig", "AccountConfig", dict, dict], bool | Awaitable[bool]]
+
+# 认证策略只有两种：all=依次执行所有认证方式，first-success=按 auth_order 顺序执行，遇到第一个成功的认证方式即停止
+# ordered / ordered-fallback 只是 first-success 的别名（兼容旧配置），没有单独的行为，认证顺序由 auth_order 决定
+AUTH_STRATEGY_ALIASES = {
+    "all": "all",
+    "first-success": "first-success",
+    "first_success": "first-success",
+    "ordered": "first-success",
+    "ordered-fallback": "first-success",
+    "ordered_fallback": "first-success",
+}
+DEFAULT_AUTH_ORDER = ["cookies", "github", "linux.do"]
+
+
+def normalize_auth_strategy(value: str | None) -> str | None:
+    """规范化认证策略名称，无法识别时返回 None"""
+    if not value:
+        return None
+    return AUTH_STRATEGY_ALIASES.get(str(value).strip().lower())
+
+
+def normalize_auth_order(value: list | str | None) -> List[str] | None:
+    """规范化认证顺序，支持列表或逗号分隔的字符串，未列出的认证方式按默认顺序追加在后面"""
+    if not value:
+        return None
+    items = value.split(",") if isinstance(value, str) else value
+    order = []
+    for item in items:
+        auth_type = str(item).strip().lower()
+        if auth_type in ("linuxdo", "linux_do"):
+            auth_type = "linux.do"
+        if auth_type in DEFAULT_AUTH_ORDER and auth_type not in order:
+            order.append(auth_type)
+    return order + [auth_type for auth_type in DEFAULT_AUTH_ORDER if auth_type not in order]
 
 
 @dataclass
@@ -55,6 +91,13 @@ class ProviderConfig:
     linuxdo_auth_redirect_path: str = "/oauth/**"  # OAuth 回调路径匹配模式，支持通配符
     aliyun_captcha: bool = False
     bypass_method: Literal["waf_cookies", "cf_clearance"] | None = None
+    lazy_bypass: bool | None = None  # 先 HTTP 直连，遇到验证页面再启动浏览器；None 表示使用 LAZY_BYPASS 环境变量
+    max_concurrency: int | None = None  # 该 provider 同时执行的账号数上限，None 表示仅受全局上限约束
+    auth_strategy: str | None = None  # 认证策略（all / first-success，ordered 为 first-success 的别名，顺序由 auth_order 决定），None 表示使用 AUTH_STRATEGY 环境变量
+    auth_order: List[str] | None = None  # 认证方式顺序，例如 ["cookies", "linux.do", "github"]
+    block_resources: bool | None = None  # 获取 bypass cookies 时拦截图片、字体等资源；None 表示使用 BLOCK_RESOURCES 环境变量
+    check_in_timezone: str | None = None  # 签到日切换所在的时区（签到台账使用），None 表示使用 CHECK_IN_TIMEZONE 环境变量
+    rate_limit: float | Dict[str, float] | None = None  # 每秒请求数上限：数字表示 origin 的上限，字典表示 {host: 上限}（可包含 CDK 等站点）
     isCustomize: bool = False  # 是否为自定义 provider（从环境变量加载）
 
     @classmethod
@@ -90,6 +133,13 @@ class ProviderConfig:
             linuxdo_auth_redirect_path=data.get("linuxdo_auth_redirect_path", "/oauth/**"),
             aliyun_captcha=data.get("aliyun_captcha", False),
             bypass_method=data.get("bypass_method"),
+            lazy_bypass=data.get("lazy_bypass"),
+            max_concurrency=data.get("max_concurrency"),
+            auth_strategy=data.get("auth_strategy"),
+            auth_order=data.get("auth_order"),
+            block_resources=data.get("block_resources"),
+            check_in_timezone=data.get("check_in_timezone"),
+            rate_limit=data.get("rate_limit"),
             isCustomize=is_customize,
         )
 
@@ -101,6 +151,20 @@ class ProviderConfig:
         """判断是否需要获取 Cloudflare cf_clearance cookie"""
         return self.bypass_method == "cf_clearance"
 
+    def use_lazy_bypass(self) -> bool:
+        """判断是否使用 lazy bypass：先用 HTTP 直连，遇到验证页面时再启动浏览器获取 bypass cookies"""
+        if self.bypass_method is None:
+            return False
+        if self.lazy_bypass is not None:
+            return bool(self.lazy_bypass)
+        return os.getenv("LAZY_BYPASS", "false").lower() in ("true", "1", "yes")
+
+    def use_resource_blocking(self) -> bool:
+        """判断获取 bypass cookies 的浏览器页面是否拦截图片、媒体、字体和统计脚本"""
+        if self.block_resources is not None:
+            return bool(self.block_resources)
+        return resource_blocking_enabled()
+
     def needs_manual_check_in(self) -> bool:
         """判断是否需要手动调用签到接口"""
         return self.check_in_path is not None
@@ -267,6 +331,31 @@ class AccountConfig:
         """
         return self.name if self.name else f"{self.provider} {index + 1}"
 
+    def get_auth_strategy(self, provider_config: "ProviderConfig") -> str:
+        """获取认证策略，优先级：账号配置 > provider 配置 > AUTH_STRATEGY 环境变量 > all"""
+        for source, value in (
+            ("account", self.get("auth_strategy")),
+            ("provider", provider_config.auth_strategy),
+            ("AUTH_STRATEGY", os.getenv("AUTH_STRATEGY")),
+        ):
+            if not value:
+                continue
+            strategy = normalize_auth_strategy(value)
+            if strategy:
+                return strategy
+            print(f"⚠️ Unknown auth_strategy '{value}' in {source} config, falling back to 'all'")
+            return "all"
+        return "all"
+
+    def get_auth_order(self, provider_config: "ProviderConfig") -> List[str]:
+        """获取认证方式顺序，优先级：账号配置 > provider 配置 > AUTH_ORDER 环境变量 > cookies, github, linux.do"""
+        return (
+            normalize_auth_order(self.get("auth_order"))
+            or normalize_auth_order(provider_config.auth_order)
+            or normalize_auth_order(os.getenv("AUTH_ORDER"))
+            or list(DEFAULT_AUTH_ORDER)
+        )
+
     def get(self, key: str, default=None):
         """获取配置值，优先从已知属性获取，否则从 extra 中获取"""
         if hasattr(self, key) and key != "extra":
@@ -284,6 +373,7 @@ class AppConfig:
     linux_do_accounts: List["OAuthAccountConfig"] = field(default_factory=list)  # 全局 Linux.do 账号列表
     github_accounts: List["OAuthAccountConfig"] = field(default_factory=list)  # 全局 GitHub 账号列表
     global_proxy: Dict | None = None
+    max_concurrency: int = 1  # 全局并发执行的账号数上限
 
     @classmethod
     def load_from_env(
@@ -293,6 +383,7 @@ class AppConfig:
         linux_do_accounts_env: str = "ACCOUNTS_LINUX_DO",
         github_accounts_env: str = "ACCOUNTS_GITHUB",
         proxy_env: str = "PROXY",
+        max_concurrency_env: str = "MAX_CONCURRENCY",
     ) -> "AppConfig":
         """从环境变量加载配置
 
@@ -302,6 +393,7 @@ class AppConfig:
             linux_do_accounts_env: Linux.do 账号配置的环境变量名称，默认为 "ACCOUNTS_LINUX_DO"
             github_accounts_env: GitHub 账号配置的环境变量名称，默认为 "ACCOUNTS_GITHUB"
             proxy_env: 全局代理配置的环境变量名称，默认为 "PROXY"
+            max_concurrency_env: 全局并发上限的环境变量名称，默认为 "MAX_CONCURRENCY"
         """
         # 加载 providers 配置
         providers = cls._load_providers(providers_env)
@@ -321,12 +413,16 @@ class AppConfig:
         # 加载全局代理配置
         global_proxy = cls._load_proxy(proxy_env)
 
+        # 加载全局并发上限
+        max_concurrency = cls._load_max_concurrency(max_concurrency_env)
+
         return cls(
             providers=providers,
             accounts=accounts,
             linux_do_accounts=linux_do_accounts,
             github_accounts=github_accounts,
             global_proxy=global_proxy,
+            max_concurrency=max_concurrency,
         )
 
     @classmethod
@@ -424,6 +520,33 @@ class AppConfig:
             print(f"⚙️ Global proxy loaded from {proxy_env} environment variable: {proxy_str}")
             return proxy
 
+    @classmethod
+    def _load_max_concurrency(cls, max_concurrency_env: str) -> int:
+        """从环境变量加载全局并发上限
+
+        Args:
+            max_concurrency_env: 环境变量名称
+
+        Returns:
+            并发上限，未配置或配置无效时返回 1（逐个执行）
+        """
+        value = os.getenv(max_concurrency_env)
+        if not value:
+            return 1
+
+        try:
+            max_concurrency = int(value)
+        except ValueError:
+            print(f"⚠️ {max_concurrency_env} must be an integer, got '{value}', using 1")
+            return 1
+
+        if max_concurrency < 1:
+            print(f"⚠️ {max_concurrency_env} must be >= 1, got {max_concurrency}, using 1")
+            return 1
+
+        print(f"⚙️ Max concurrency loaded from {max_concurrency_env}: {max_concurrency}")
+        return max_concurrency
+
     @classmethod
     def _load_providers(cls, providers_env: str) -> Dict[str, ProviderConfig]:
         """从环境变量加载 providers 配置
@@ -1065,3 +1188,36 @@ class AppConfig:
     def get_provider(self, name: str) -> ProviderConfig | None:
         """获取指定 provider 配置"""
         return self.providers.get(name)
+
+    def get_provider_concurrency_limits(self) -> Dict[str, int | None]:
+        """获取各 provider 的并发上限"""
+        return {name: provider.max_concurrency for name, provider in self.providers.items()}
+
+    def get_rate_limits(self) -> Dict[str, float]:
+        """获取各 host 的每秒请求数上限
+
+        所有 provider 的 rate_limit 配置合并，同一 host 取正数上限中的最小值；
+        小于等于 0（不限速）只在该 host 没有其他 provider 设置正数上限时生效，不会覆盖其他 provider 的限速
+        """
+        limits: Dict[str, float] = {}
+        for provider in self.providers.values():
+            if provider.rate_limit is None:
+                continue
+            if isinstance(provider.rate_limit, dict):
+                items = provider.rate_limit.items()
+            else:
+                items = [(provider.origin, provider.rate_limit)]
+            for host, rate in items:
+                try:
+                    rate = float(rate)
+                except (TypeError, ValueError):
+                    print(f"⚠️ Invalid rate_limit for {host} in provider {provider.name}, ignored")
+                    continue
+                host = normalize_host(host)
+                if rate <= 0:
+                    limits.setdefault(host, 0.0)
+                elif limits.get(host, 0) > 0:
+                    limits[host] = min(limits[host], rate)
+                else:
+                    limits[host] = rate
+        return limits
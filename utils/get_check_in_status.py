@@ -10,15 +10,14 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from curl_cffi import requests as curl_requests
-
+from utils.http_session import http_sessions
 from utils.http_utils import proxy_resolve, response_resolve
 
 if TYPE_CHECKING:
     from utils.config import AccountConfig, ProviderConfig
 
 
-def get_newapi_check_in_status(
+async def get_newapi_check_in_status(
     provider_config: "ProviderConfig",
     account_config: "AccountConfig",
     cookies: dict,
@@ -51,48 +50,45 @@ def get_newapi_check_in_status(
     print(f"🔍 {account_name}: Getting check-in status")
 
     try:
-        session = curl_requests.Session(impersonate=impersonate, proxy=http_proxy, timeout=30)
-        try:
-            session.cookies.update(cookies)
-            response = session.get(
-                check_in_status_url,
-                headers=headers,
-                timeout=30,
-            )
-
-            if response.status_code == 200:
-                json_data = response_resolve(response, "get_check_in_status", account_name)
-                if json_data is None:
-                    print(f"❌ {account_name}: Invalid response format for check-in status")
-                    return False
-
-                if json_data.get("success"):
-                    status_data = json_data.get("data", {})
-                    stats = status_data.get("stats", {})
-
-                    checked_in_today = stats.get("checked_in_today", False)
-                    checkin_count = stats.get("checkin_count", 0)
-                    total_quota = stats.get("total_quota", 0)
-
-                    total_quota_display = round(total_quota / 500000, 2) if total_quota else 0
-
-                    print(
-                        f"📊 {account_name}: Check-in status - "
-                        f"Today: {'✅' if checked_in_today else '❌'}, "
-                        f"Count: {checkin_count}, "
-                        f"Total quota: ${total_quota_display}"
-                    )
-
-                    return checked_in_today
-                else:
-                    error_msg = json_data.get("message", "Unknown error")
-                    print(f"❌ {account_name}: Failed to get check-in status: {error_msg}")
-                    return False
+        session = http_sessions.get(provider_config.origin, http_proxy, impersonate)
+        session.cookies.update(cookies)
+        response = await session.get(
+            check_in_status_url,
+            headers=headers,
+            timeout=30,
+        )
+
+        if response.status_code == 200:
+            json_data = response_resolve(response, "get_check_in_status", account_name)
+            if json_data is None:
+                print(f"❌ {account_name}: Invalid response format for check-in status")
+                return False
+
+            if json_data.get("success"):
+                status_data = json_data.get("data", {})
+                stats = status_data.get("stats", {})
+
+                checked_in_today = stats.get("checked_in_today", False)
+                checkin_count = stats.get("checkin_count", 0)
+                total_quota = stats.get("total_quota", 0)
+
+                total_quota_display = round(total_quota / 500000, 2) if total_quota else 0
+
+                print(
+                    f"📊 {account_name}: Check-in status - "
+                    f"Today: {'✅' if checked_in_today else '❌'}, "
+                    f"Count: {checkin_count}, "
+                    f"Total quota: ${total_quota_display}"
+                )
+
+                return checked_in_today
             else:
-                print(f"❌ {account_name}: Failed to get check-in status: HTTP {response.status_code}")
+                error_msg = json_data.get("message", "Unknown error")
+                print(f"❌ {account_name}: Failed to get check-in status: {error_msg}")
                 return False
-        finally:
-            session.close()
+        else:
+            print(f"❌ {account_name}: Failed to get check-in status: HTTP {response.status_code}")
+            return False
     except Exception as e:
         print(f"❌ {account_name}: Error getting check-in status: {e}")
         return False
@@ -112,16 +108,16 @@ def create_newapi_check_in_status(
         impersonate: curl_cffi 浏览器指纹模拟，默认为 "firefox135"
 
     Returns:
-        Callable: 签到状态查询函数，签名为 (provider_config, account_config, cookies, headers) -> bool
+        Callable: 签到状态查询函数，签名为 async (provider_config, account_config, cookies, headers) -> bool
     """
 
-    def _check_status(
+    async def _check_status(
         provider_config: "ProviderConfig",
         account_config: "AccountConfig",
         cookies: dict,
         headers: dict,
     ) -> bool:
-        return get_newapi_check_in_status(
+        return await get_newapi_check_in_status(
             provider_config=provider_config,
             account_config=account_config,
             cookies=cookies,
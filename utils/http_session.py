@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+HTTP 会话管理模块
+
+按 (origin, 代理, impersonate) 共享 curl 连接池（DNS、TLS 握手和 HTTP/2 连接复用），
+cookies 按作用域隔离：同一作用域内复用同一个 AsyncSession，不同作用域（账号、认证方式）互不共享 cookies；
+所有请求经过 utils.rate_limit 的按 host 限速、utils.retry 的重试策略和按 origin 的熔断器
+"""
+
+import itertools
+from contextvars import ContextVar, Token
+from urllib.parse import urlparse
+
+from curl_cffi import AsyncCurl
+from curl_cffi import requests as curl_requests
+
+from utils.rate_limit import rate_limiter
+from utils.retry import request_with_retry
+from utils.trace import tracer
+
+SHARED_SCOPE = "shared"
+
+_current_scope: ContextVar[str | None] = ContextVar("http_session_scope", default=None)
+
+
+class _PooledAsyncSession(curl_requests.AsyncSession):
+    """共享 AsyncCurl 的 AsyncSession
+
+    AsyncCurl 由 HttpSessionManager 创建后传入，会话关闭时只释放自身的 curl 句柄，连接池由 HttpSessionManager 统一关闭
+    """
+
+    async def request(self, method: str, url: str, **kwargs):
+        """发送请求（按 host 限速，按重试策略重试临时性错误，origin 熔断时直接失败），并记录每次请求的耗时"""
+        parsed = urlparse(url)
+
+        async def send():
+            await rate_limiter.acquire(url)
+            with tracer.span(f"{method} {parsed.path or '/'}", "http", host=parsed.netloc) as span_args:
+                response = await super(_PooledAsyncSession, self).request(method=method, url=url, **kwargs)
+                span_args["status"] = response.status_code
+                return response
+
+        return await request_with_retry(method, url, send)
+
+
+class HttpSessionManager:
+    """HTTP 会话管理器
+
+    - 连接池 key: (origin, 代理 URL, impersonate)，同 key 的所有会话共享一个 AsyncCurl
+    - 会话 key: (作用域, 连接池 key)，作用域通过 open_scope / close_scope 管理
+    - 没有打开作用域时使用共享作用域，由 close() 统一关闭
+    """
+
+    def __init__(self):
+        self._multis: dict[str, AsyncCurl] = {}
+        self._sessions: dict[tuple[str, str], _PooledAsyncSession] = {}
+        self._scope_ids = itertools.count(1)
+
+    @staticmethod
+    def make_key(url: str, proxy: str | None = None, impersonate: str | None = None) -> str:
+        """生成连接池 key
+
+        Args:
+            url: 请求 URL（只取 scheme + host）
+            proxy: 代理 URL
+            impersonate: curl_cffi 浏览器指纹模拟
+        """
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}|{proxy or 'direct'}|{impersonate or 'default'}"
+
+    def open_scope(self) -> Token:
+        """打开新的 cookies 作用域，返回用于 close_scope 的 token"""
+        return _current_scope.set(f"scope-{next(self._scope_ids)}")
+
+    async def close_scope(self, token: Token) -> None:
+        """关闭作用域内的所有会话，并恢复到上一层作用域"""
+        scope = _current_scope.get()
+        _current_scope.reset(token)
+        for session_key in [key for key in self._sessions if key[0] == scope]:
+            await self._sessions.pop(session_key).close()
+
+    def get(
+        self,
+        url: str,
+        proxy: str | None = None,
+        impersonate: str | None = None,
+        timeout: int = 30,
+    ) -> curl_requests.AsyncSession:
+        """获取当前作用域内的会话，不存在时创建
+
+        调用方不需要关闭返回的会话，由 close_scope / close 统一关闭
+
+        Args:
+            url: 请求 URL（只取 scheme + host）
+            proxy: 代理 URL
+            impersonate: curl_cffi 浏览器指纹模拟
+            timeout: 默认超时时间（秒）
+        """
+        key = self.make_key(url, proxy, impersonate)
+        scope = _current_scope.get() or SHARED_SCOPE
+        session = self._sessions.get((scope, key))
+        if session is not None:
+            return session
+
+        # 由管理器创建 AsyncCurl 并传入，会话不持有连接池，关闭会话时不会关闭其他会话共享的连接池
+        acurl = self._multis.get(key)
+        if acurl is None:
+            acurl = self._multis[key] = AsyncCurl()
+        session = _PooledAsyncSession(
+            async_curl=acurl,
+            impersonate=impersonate,
+            proxy=proxy,
+            timeout=timeout,
+        )
+        self._sessions[(scope, key)] = session
+        return session
+
+    async def close(self) -> None:
+        """关闭所有会话和连接池"""
+        sessions = list(self._sessions.values())
+        multis = list(self._multis.values())
+        self._sessions = {}
+        self._multis = {}
+        for session in sessions:
+            await session.close()
+        for acurl in multis:
+            try:
+                await acurl.close()
+            except Exception as e:
+                print(f"⚠️ Failed to close HTTP connection pool: {e}")
+
+
+http_sessions = HttpSessionManager()
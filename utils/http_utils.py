@@ -42,6 +42,40 @@ def proxy_resolve(proxy_config: dict | None = None) -> str | None:
     return proxy_url
 
 
+# WAF / Cloudflare 验证页面特征
+CHALLENGE_MARKERS = (
+    "Just a moment",
+    "challenge-platform",
+    "cf_chl_opt",
+    "acw_sc__v2",
+    "var arg1=",
+    "AliyunCaptcha",
+)
+
+
+def is_challenge_response(response: curl_requests.Response) -> bool:
+    """判断响应是否为 WAF / Cloudflare 验证页面（bypass cookies 已失效）
+
+    Args:
+        response: curl_cffi Response 对象
+
+    Returns:
+        是否为验证页面
+    """
+    try:
+        if response.headers.get("cf-mitigated", "").lower() == "challenge":
+            return True
+
+        content_type = response.headers.get("content-type", "").lower()
+        if "json" in content_type:
+            return False
+
+        text = response.text[:20000]
+        return any(marker in text for marker in CHALLENGE_MARKERS)
+    except Exception:
+        return False
+
+
 def response_resolve(
     response: curl_requests.Response,
     context: str,
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+OAuth 身份会话管理模块
+
+同一个 Linux.do / GitHub 账号在一次运行中只登录一次：每个 OAuth 身份持有一个浏览器 context，
+使用该身份的所有 provider 在这个 context 中各自打开标签页执行 authorize 步骤，
+首次登录完成前串行执行，登录成功后各标签页可以并发授权
+"""
+
+import asyncio
+import hashlib
+import os
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from playwright.async_api import BrowserContext
+
+from utils.browser_pool import browser_pool
+
+
+def _existing_storage_state(cache_file_path: str) -> str | None:
+    """登录状态缓存文件存在时返回其路径，用于恢复浏览器 context"""
+    return cache_file_path if cache_file_path and os.path.exists(cache_file_path) else None
+
+
+@dataclass
+class IdentitySession:
+    """单个 OAuth 身份的浏览器会话
+
+    logged_in 由登录流程在确认已登录（授权成功）后设置，之后的 provider 直接进入授权步骤
+    """
+
+    context: BrowserContext
+    logged_in: bool = False
+    shared: bool = True
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    stack: AsyncExitStack | None = None
+
+
+class IdentitySessionManager:
+    """OAuth 身份会话管理器
+
+    - OAUTH_IDENTITY_SHARING: 设置为 false 时禁用共享，每个 provider 单独创建浏览器 context
+    """
+
+    def __init__(self):
+        self._sessions: dict[str, IdentitySession] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return os.getenv("OAUTH_IDENTITY_SHARING", "true").lower() in ("true", "1", "yes")
+
+    @staticmethod
+    def make_key(auth_type: str, username: str) -> str:
+        """生成身份 key，用户名只保存哈希值"""
+        username_hash = hashlib.sha256(username.encode("utf-8")).hexdigest()[:8]
+        return f"{auth_type}|{username_hash}"
+
+    def _get_lock(self, key: str) -> asyncio.Lock:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    @staticmethod
+    def _is_alive(session: IdentitySession) -> bool:
+        browser = session.context.browser
+        return browser is None or browser.is_connected()
+
+    async def _open(
+        self,
+        account_name: str,
+        cache_file_path: str,
+        config: dict | None,
+    ) -> IdentitySession:
+        """创建在整个运行期间保持打开的浏览器 context"""
+        storage_state = _existing_storage_state(cache_file_path)
+        stack = AsyncExitStack()
+        context = await stack.enter_async_context(
+            browser_pool.context(f"{account_name} (shared identity)", config=config, storage_state=storage_state)
+        )
+        return IdentitySession(context=context, stack=stack)
+
+    async def _close_session(self, session: IdentitySession) -> None:
+        if session.stack is None:
+            return
+        try:
+            await session.stack.aclose()
+        except Exception as e:
+            print(f"⚠️ Failed to close identity browser context: {e}")
+
+    @asynccontextmanager
+    async def session(
+        self,
+        auth_type: str,
+        username: str,
+        account_name: str,
+        cache_file_path: str = "",
+        config: dict | None = None,
+    ) -> AsyncIterator[IdentitySession]:
+        """获取 OAuth 身份的浏览器会话
+
+        首次登录完成前同一身份的调用串行执行，避免多个标签页同时提交登录表单
+
+        Args:
+            auth_type: 认证方式（github / linuxdo）
+            username: OAuth 账号用户名
+            account_name: 账号名称（用于日志输出）
+            cache_file_path: 登录状态缓存文件路径，创建 context 时恢复
+            config: Camoufox config 参数
+
+        Yields:
+            IdentitySession，调用方在新标签页中执行授权，用完关闭标签页
+        """
+        if not self.enabled:
+            storage_state = _existing_storage_state(cache_file_path)
+            async with browser_pool.context(account_name, config=config, storage_state=storage_state) as context:
+                yield IdentitySession(context=context, shared=False)
+            return
+
+        key = self.make_key(auth_type, username)
+        async with self._get_lock(key):
+            session = self._sessions.get(key)
+            if session and not self._is_alive(session):
+                print(f"⚠️ {account_name}: Shared {auth_type} browser context disconnected, reopening")
+                self._sessions.pop(key, None)
+                await self._close_session(session)
+                session = None
+            if session is None:
+                session = await self._open(account_name, cache_file_path, config)
+                self._sessions[key] = session
+            elif session.logged_in:
+                print(f"ℹ️ {account_name}: Reusing {auth_type} session logged in earlier in this run")
+
+        locked = False
+        if not session.logged_in:
+            await session.lock.acquire()
+            locked = True
+            if session.logged_in:
+                session.lock.release()
+                locked = False
+        try:
+            yield session
+        finally:
+            if locked:
+                session.lock.release()
+
+    async def close(self) -> None:
+        """关闭所有身份会话的浏览器 context"""
+        sessions = list(self._sessions.values())
+        self._sessions = {}
+        self._locks = {}
+        for session in sessions:
+            await self._close_session(session)
+        if sessions:
+            print(f"ℹ️ Identity sessions closed ({len(sessions)} identity(ies))")
+
+
+identity_sessions = IdentitySessionManager()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+签到台账模块
+
+按 (账号, 认证方式, 签到日期) 记录签到结果和余额，同一天再次运行时跳过已完成的认证方式，只重试失败的认证方式
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_LEDGER_FILE = "storage-states/check_in_ledger.json"
+DEFAULT_TIMEZONE = "Asia/Shanghai"
+
+# 台账只保留最近几天的记录
+KEEP_DAYS = 7
+
+
+def check_in_day(timezone_name: str | None = None) -> str:
+    """获取签到日期（YYYY-MM-DD）
+
+    Args:
+        timezone_name: provider 签到日切换所在的时区，None 表示使用 CHECK_IN_TIMEZONE 环境变量（默认 Asia/Shanghai）
+    """
+    timezone_name = timezone_name or os.getenv("CHECK_IN_TIMEZONE", DEFAULT_TIMEZONE)
+    try:
+        return datetime.now(ZoneInfo(timezone_name)).strftime("%Y-%m-%d")
+    except (ZoneInfoNotFoundError, ValueError):
+        print(f"⚠️ Unknown timezone '{timezone_name}', using local date for check-in ledger")
+        return datetime.now().strftime("%Y-%m-%d")
+
+
+class CheckInLedger:
+    """签到台账
+
+    - CHECK_IN_LEDGER: 设置为 false 时禁用台账
+    - CHECK_IN_LEDGER_FILE: 台账文件路径，默认 storage-states/check_in_ledger.json
+    """
+
+    def __init__(self):
+        self._entries: dict[str, dict] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return os.getenv("CHECK_IN_LEDGER", "true").lower() in ("true", "1", "yes")
+
+    @property
+    def ledger_file(self) -> str:
+        return os.getenv("CHECK_IN_LEDGER_FILE", DEFAULT_LEDGER_FILE)
+
+    @staticmethod
+    def make_key(provider: str, account_name: str) -> str:
+        """生成账号 key，账号名称只保存哈希值"""
+        name_hash = hashlib.sha256(account_name.encode("utf-8")).hexdigest()[:8]
+        return f"{provider}|{name_hash}"
+
+    def _load(self) -> dict[str, dict]:
+        """加载台账（只加载一次）"""
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        try:
+            if os.path.exists(self.ledger_file):
+                with open(self.ledger_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._entries = data
+        except Exception as e:
+            print(f"⚠️ Failed to load check-in ledger: {e}")
+        return self._entries
+
+    def _save(self) -> None:
+        try:
+            ledger_dir = os.path.dirname(self.ledger_file)
+            if ledger_dir:
+                os.makedirs(ledger_dir, exist_ok=True)
+            with open(self.ledger_file, "w", encoding="utf-8") as f:
+                json.dump(self._load(), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"⚠️ Failed to save check-in ledger: {e}")
+
+    def completed(self, key: str, day: str) -> dict[str, dict]:
+        """获取账号在指定签到日已成功的认证方式
+
+        Returns:
+            {认证方式: 用户信息（包含余额）}，台账禁用时返回空字典
+        """
+        if not self.enabled:
+            return {}
+        methods = self._load().get(key, {}).get(day, {})
+        return {
+            auth_method: record["user_info"]
+            for auth_method, record in methods.items()
+            if record.get("success") and record.get("user_info")
+        }
+
+    def record(self, key: str, day: str, results: list[tuple[str, bool, dict | None]]) -> None:
+        """记录签到结果
+
+        Args:
+            key: 账号 key
+            day: 签到日期
+            results: CheckIn.execute() 返回的 (认证方式, 是否成功, 用户信息) 列表
+        """
+        if not self.enabled or not results:
+            return
+
+        days = self._load().setdefault(key, {})
+        methods = days.setdefault(day, {})
+        for auth_method, success, user_info in results:
+            success = bool(success and user_info and user_info.get("success"))
+            methods[auth_method] = {
+                "success": success,
+                "user_info": user_info if success else None,
+                "error": None if success else (user_info or {}).get("error", "Unknown error"),
+                "updated_at": time.time(),
+            }
+
+        # 清理过期记录
+        for old_day in sorted(days)[:-KEEP_DAYS]:
+            days.pop(old_day)
+        self._save()
+
+
+check_in_ledger = CheckInLedger()
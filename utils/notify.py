@@ -1,10 +1,25 @@
 import os
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
-from typing import Literal
+from typing import Callable, Literal
 
 from curl_cffi import requests as curl_requests
 
+DEFAULT_NOTIFY_TIMEOUT = 60.0
+
+
+def _check_response(response, field: str, ok_value) -> None:
+	"""检查推送接口的 HTTP 状态码和返回的错误字段，发送失败时抛出异常"""
+	response.raise_for_status()
+	try:
+		data = response.json()
+	except ValueError:
+		raise ValueError(f'Unexpected response: {response.text[:100]}')
+	if not isinstance(data, dict) or data.get(field) != ok_value:
+		raise ValueError(f'Push rejected: {str(data)[:200]}')
+
 
 class NotificationKit:
 	@property
@@ -63,7 +78,7 @@ class NotificationKit:
 		msg['Subject'] = title
 
 		smtp_server = self.smtp_server if self.smtp_server else f'smtp.{self.email_user.split("@")[1]}'
-		with smtplib.SMTP_SSL(smtp_server, 465) as server:
+		with smtplib.SMTP_SSL(smtp_server, 465, timeout=30) as server:
 			server.login(self.email_user, self.email_pass)
 			server.send_message(msg)
 
@@ -72,21 +87,24 @@ class NotificationKit:
 			raise ValueError('PushPlus Token not configured')
 
 		data = {'token': self.pushplus_token, 'title': title, 'content': content, 'template': 'html'}
-		curl_requests.post('http://www.pushplus.plus/send', json=data, timeout=30)
+		response = curl_requests.post('http://www.pushplus.plus/send', json=data, timeout=30)
+		_check_response(response, 'code', 200)
 
 	def send_serverPush(self, title: str, content: str):
 		if not self.server_push_key:
 			raise ValueError('Server Push key not configured')
 
 		data = {'title': title, 'desp': content}
-		curl_requests.post(f'https://sctapi.ftqq.com/{self.server_push_key}.send', json=data, timeout=30)
+		response = curl_requests.post(f'https://sctapi.ftqq.com/{self.server_push_key}.send', json=data, timeout=30)
+		_check_response(response, 'code', 0)
 
 	def send_dingtalk(self, title: str, content: str):
 		if not self.dingding_webhook:
 			raise ValueError('DingTalk Webhook not configured')
 
 		data = {'msgtype': 'text', 'text': {'content': f'{title}\n{content}'}}
-		curl_requests.post(self.dingding_webhook, json=data, timeout=30)
+		response = curl_requests.post(self.dingding_webhook, json=data, timeout=30)
+		_check_response(response, 'errcode', 0)
 
 	def send_feishu(self, title: str, content: str):
 		if not self.feishu_webhook:
@@ -99,14 +117,16 @@ class NotificationKit:
 				'header': {'template': 'blue', 'title': {'content': title, 'tag': 'plain_text'}},
 			},
 		}
-		curl_requests.post(self.feishu_webhook, json=data, timeout=30)
+		response = curl_requests.post(self.feishu_webhook, json=data, timeout=30)
+		_check_response(response, 'code', 0)
 
 	def send_wecom(self, title: str, content: str):
 		if not self.weixin_webhook:
 			raise ValueError('WeChat Work Webhook not configured')
 
 		data = {'msgtype': 'text', 'text': {'content': f'{title}\n{content}'}}
-		curl_requests.post(self.weixin_webhook, json=data, timeout=30)
+		response = curl_requests.post(self.weixin_webhook, json=data, timeout=30)
+		_check_response(response, 'errcode', 0)
 
 	def send_telegram(self, title: str, content: str):
 		if not self.telegram_bot_token or not self.telegram_chat_id:
@@ -114,25 +134,89 @@ class NotificationKit:
 
 		text = f'*{title}*\n{content}'
 		data = {'chat_id': self.telegram_chat_id, 'text': text, 'parse_mode': 'Markdown'}
-		curl_requests.post(f'https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage', json=data, timeout=30)
-
-	def push_message(self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text'):
-		notifications = [
-			('Email', lambda: self.send_email(title, content, msg_type)),
-			('PushPlus', lambda: self.send_pushplus(title, content)),
-			('Server Push', lambda: self.send_serverPush(title, content)),
-			('DingTalk', lambda: self.send_dingtalk(title, content)),
-			('Feishu', lambda: self.send_feishu(title, content)),
-			('WeChat Work', lambda: self.send_wecom(title, content)),
-			('Telegram', lambda: self.send_telegram(title, content)),
+		response = curl_requests.post(
+			f'https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage', json=data, timeout=30
+		)
+		_check_response(response, 'ok', True)
+
+	def get_channels(self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text') -> list[tuple[str, Callable[[], None]]]:
+		"""获取已配置的通知渠道，未配置的渠道不会被调用"""
+		channels = [
+			('Email', bool(self.email_user and self.email_pass and self.email_to), lambda: self.send_email(title, content, msg_type)),
+			('PushPlus', bool(self.pushplus_token), lambda: self.send_pushplus(title, content)),
+			('Server Push', bool(self.server_push_key), lambda: self.send_serverPush(title, content)),
+			('DingTalk', bool(self.dingding_webhook), lambda: self.send_dingtalk(title, content)),
+			('Feishu', bool(self.feishu_webhook), lambda: self.send_feishu(title, content)),
+			('WeChat Work', bool(self.weixin_webhook), lambda: self.send_wecom(title, content)),
+			('Telegram', bool(self.telegram_bot_token and self.telegram_chat_id), lambda: self.send_telegram(title, content)),
+		]
+		return [(name, func) for name, configured, func in channels if configured]
+
+	@property
+	def timeout(self) -> float:
+		"""NOTIFY_TIMEOUT: 所有渠道共用的发送截止时间（秒），默认 60"""
+		try:
+			return max(1.0, float(os.getenv('NOTIFY_TIMEOUT', str(DEFAULT_NOTIFY_TIMEOUT))))
+		except ValueError:
+			return DEFAULT_NOTIFY_TIMEOUT
+
+	def push_message(
+		self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text', channels: list[str] | None = None
+	) -> dict[str, dict]:
+		"""并发推送到所有已配置的渠道
+
+		每个渠道在独立的守护线程中发送，所有渠道共用一个截止时间，超时的渠道不再等待，也不会阻止进程退出；
+		超时的渠道在返回后仍可能送达，结果中标记为 timed_out
+
+		Args:
+			channels: 只发送到这些渠道（渠道名称），None 表示所有已配置的渠道
+
+		Returns:
+			{渠道名称: {'success': 是否成功, 'error': 错误信息, 'elapsed': 耗时（秒）, 'timed_out': 是否超时}}
+		"""
+		channels = [
+			(name, func) for name, func in self.get_channels(title, content, msg_type) if channels is None or name in channels
 		]
+		if not channels:
+			print('ℹ️ No notification channels configured, message push skipped')
+			return {}
 
-		for name, func in notifications:
+		results: dict[str, dict] = {}
+
+		def send(name: str, func: Callable[[], None]):
+			started = time.monotonic()
 			try:
 				func()
-				print(f'🔹 [{name}]: Message push successful!')
+				results[name] = {'success': True, 'error': '', 'elapsed': time.monotonic() - started, 'timed_out': False}
 			except Exception as e:
-				print(f'🔸 [{name}]: Message push failed! Reason: {str(e)}')
+				results[name] = {'success': False, 'error': str(e), 'elapsed': time.monotonic() - started, 'timed_out': False}
 
+		threads = [
+			threading.Thread(target=send, args=(name, func), name=f'notify-{name}', daemon=True) for name, func in channels
+		]
+		for thread in threads:
+			thread.start()
+
+		deadline = time.monotonic() + self.timeout
+		for thread in threads:
+			thread.join(max(0.0, deadline - time.monotonic()))
+
+		report = {}
+		for name, _ in channels:
+			result = results.get(name) or {
+				'success': False,
+				'error': f'Timed out after {self.timeout:.0f}s',
+				'elapsed': self.timeout,
+				'timed_out': True,
+			}
+			report[name] = result
+			if result['success']:
+				print(f'🔹 [{name}]: Message push successful! ({result["elapsed"]:.1f}s)')
+			else:
+				print(f'🔸 [{name}]: Message push failed! Reason: {result["error"]}')
+
+		success_count = sum(1 for result in report.values() if result['success'])
+		print(f'📮 Message pushed to {success_count}/{len(report)} channel(s)')
+		return report
 
 notify = NotificationKit()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+通知发件箱模块
+
+通知先写入本地发件箱（storage-states/notify_outbox.json，随缓存保留）再在后台线程中发送，签到流程只等待有限的时间；
+发送失败的渠道在本次运行内退避重试，仍失败时保留到下次运行开始时补发。按事件 id（未指定时为内容）的哈希去重，
+同一条通知不会重复入队，已送达的渠道不会重复发送
+
+投递语义为至少一次（at-least-once）：超过 NOTIFY_TIMEOUT 的渠道在后台仍可能送达，无法确定结果，
+本次运行不再重发也不计入尝试次数，下次运行补发时该渠道可能收到重复的通知
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Literal
+
+from utils.notify import notify
+
+DEFAULT_OUTBOX_FILE = "storage-states/notify_outbox.json"
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_FLUSH_WAIT = 15.0
+
+# 已送达通知的哈希保留时间（秒），用于去重
+DELIVERED_TTL = 7 * 24 * 3600
+# 未送达的通知超过该时间后丢弃（秒）
+PENDING_TTL = 3 * 24 * 3600
+
+
+class NotificationOutbox:
+    """通知发件箱
+
+    - NOTIFY_OUTBOX: 设置为 false 时禁用发件箱，直接发送
+    - NOTIFY_OUTBOX_FILE: 发件箱文件路径，默认 storage-states/notify_outbox.json
+    - NOTIFY_MAX_ATTEMPTS: 每个渠道最多尝试次数（跨运行累计），默认 5
+    - NOTIFY_FLUSH_WAIT: 运行结束前等待后台发送的最长时间（秒），默认 15，超时未送达的通知下次运行补发
+    """
+
+    def __init__(self):
+        self._data: dict | None = None
+        # 只保护内存中的发件箱数据和文件读写，发送通知时不持有锁
+        self._lock = threading.RLock()
+        # 正在发送的通知 id，避免多个 flush 线程重复发送同一条通知
+        self._sending: set[str] = set()
+        # 发送超时、结果未知的渠道 {通知 id: 渠道名称集合}，本次运行内不再重发
+        self._unknown: dict[str, set[str]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return os.getenv("NOTIFY_OUTBOX", "true").lower() in ("true", "1", "yes")
+
+    @property
+    def outbox_file(self) -> str:
+        return os.getenv("NOTIFY_OUTBOX_FILE", DEFAULT_OUTBOX_FILE)
+
+    @property
+    def max_attempts(self) -> int:
+        try:
+            return max(1, int(os.getenv("NOTIFY_MAX_ATTEMPTS", str(DEFAULT_MAX_ATTEMPTS))))
+        except ValueError:
+            return DEFAULT_MAX_ATTEMPTS
+
+    @property
+    def flush_wait(self) -> float:
+        try:
+            return max(0.0, float(os.getenv("NOTIFY_FLUSH_WAIT", str(DEFAULT_FLUSH_WAIT))))
+        except ValueError:
+            return DEFAULT_FLUSH_WAIT
+
+    @staticmethod
+    def make_id(title: str, event_id: str) -> str:
+        return hashlib.sha256(f"{title}\n{event_id}".encode("utf-8")).hexdigest()[:16]
+
+    def _load(self) -> dict:
+        """加载发件箱（只加载一次）"""
+        if self._data is not None:
+            return self._data
+
+        self._data = {"pending": [], "delivered": {}}
+        try:
+            if os.path.exists(self.outbox_file):
+                with open(self.outbox_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._data["pending"] = data.get("pending", [])
+                    self._data["delivered"] = data.get("delivered", {})
+        except Exception as e:
+            print(f"⚠️ Failed to load notification outbox: {e}")
+        return self._data
+
+    def _save(self) -> None:
+        try:
+            outbox_dir = os.path.dirname(self.outbox_file)
+            if outbox_dir:
+                os.makedirs(outbox_dir, exist_ok=True)
+            # 先写临时文件再替换，后台线程在进程退出时被中断也不会留下不完整的文件
+            tmp_file = f"{self.outbox_file}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self._load(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.outbox_file)
+        except Exception as e:
+            print(f"⚠️ Failed to save notification outbox: {e}")
+
+    def pending(self) -> list[dict]:
+        with self._lock:
+            return list(self._load()["pending"])
+
+    def enqueue(
+        self,
+        title: str,
+        content: str,
+        msg_type: Literal["text", "html"] = "text",
+        event_id: str | None = None,
+    ) -> bool:
+        """写入发件箱，由 flush() 发送；发件箱禁用时直接发送
+
+        Args:
+            title: 标题
+            content: 内容
+            msg_type: 消息类型
+            event_id: 用于去重的事件 id，内容中包含执行时间等每次都不同的信息时需要指定，None 表示按内容去重
+
+        Returns:
+            是否入队，相同事件的通知已在发件箱中或已送达时返回 False
+        """
+        if not self.enabled:
+            notify.push_message(title, content, msg_type=msg_type)
+            return False
+
+        message_id = self.make_id(title, content if event_id is None else event_id)
+        with self._lock:
+            data = self._load()
+            if message_id in data["delivered"] or any(item["id"] == message_id for item in data["pending"]):
+                print(f"ℹ️ Notification {message_id} already queued or delivered, skipping duplicate")
+                return False
+            data["pending"].append(
+                {
+                    "id": message_id,
+                    "title": title,
+                    "content": content,
+                    "msg_type": msg_type,
+                    "created_at": time.time(),
+                    # 已送达的渠道，补发时只发送其余渠道
+                    "delivered_channels": [],
+                    "attempts": {},
+                }
+            )
+            self._save()
+            return True
+
+    def _deliver(self, item: dict) -> bool:
+        """发送一条通知到尚未送达的渠道（调用方需已将该通知标记为发送中）
+
+        Returns:
+            是否所有已配置的渠道都已送达（或已达到最多尝试次数）
+        """
+        configured = [name for name, _ in notify.get_channels(item["title"], item["content"], item["msg_type"])]
+        remaining = self._remaining(item, configured)
+        if remaining:
+            # 网络发送不持有锁，发送期间 enqueue 不会被阻塞
+            report = notify.push_message(item["title"], item["content"], msg_type=item["msg_type"], channels=remaining)
+        else:
+            report = {}
+
+        with self._lock:
+            for name, result in report.items():
+                if result.get("timed_out"):
+                    # 发送线程可能仍在运行并最终送达，本次运行不再重发，下次运行补发
+                    self._unknown.setdefault(item["id"], set()).add(name)
+                    continue
+                item["attempts"][name] = item["attempts"].get(name, 0) + 1
+                if result["success"]:
+                    item["delivered_channels"].append(name)
+                elif item["attempts"][name] >= self.max_attempts:
+                    print(f"⚠️ [{name}]: Giving up notification {item['id']} after {item['attempts'][name]} attempt(s)")
+
+            done = all(
+                name in item["delivered_channels"] or item["attempts"].get(name, 0) >= self.max_attempts
+                for name in configured
+            )
+            data = self._load()
+            if done and item in data["pending"]:
+                data["pending"].remove(item)
+                data["delivered"][item["id"]] = time.time()
+            self._save()
+            return done
+
+    def _remaining(self, item: dict, configured: list[str]) -> list[str]:
+        """本次运行内还需要发送的渠道：未送达、未达到最多尝试次数且结果不是未知"""
+        unknown = self._unknown.get(item["id"], set())
+        return [
+            name
+            for name in configured
+            if name not in item["delivered_channels"]
+            and item["attempts"].get(name, 0) < self.max_attempts
+            and name not in unknown
+        ]
+
+    def _retryable(self, item: dict) -> bool:
+        """本次运行内是否还有需要重试的渠道"""
+        configured = [name for name, _ in notify.get_channels(item["title"], item["content"], item["msg_type"])]
+        return bool(self._remaining(item, configured))
+
+    def _checkout(self) -> list[dict]:
+        """清理过期记录，取出未在发送中的通知并标记为发送中"""
+        with self._lock:
+            data = self._load()
+            now = time.time()
+            data["delivered"] = {
+                message_id: delivered_at
+                for message_id, delivered_at in data["delivered"].items()
+                if now - delivered_at < DELIVERED_TTL
+            }
+            expired = [item for item in data["pending"] if now - item.get("created_at", now) > PENDING_TTL]
+            if expired:
+                print(f"⚠️ Dropping {len(expired)} undelivered notification(s) older than {PENDING_TTL // 3600}h")
+                data["pending"] = [item for item in data["pending"] if item not in expired]
+                self._save()
+
+            items = [item for item in data["pending"] if item["id"] not in self._sending]
+            self._sending.update(item["id"] for item in items)
+            return items
+
+    def flush(self, retries: int = 1, retry_delay: float = 3.0) -> int:
+        """发送发件箱中所有未送达的通知（其他线程正在发送的通知除外）
+
+        Args:
+            retries: 本次运行内失败渠道的重试次数
+            retry_delay: 第一次重试前的等待时间（秒），之后每次翻倍
+
+        Returns:
+            仍未送达的通知数
+        """
+        if not self.enabled:
+            return 0
+
+        items = self._checkout()
+        checked_out = {item["id"] for item in items}
+        try:
+            for attempt in range(retries + 1):
+                if not items:
+                    break
+                if attempt > 0:
+                    delay = retry_delay * (2 ** (attempt - 1))
+                    print(f"🔁 Retrying {len(items)} undelivered notification(s) in {delay:.0f}s")
+                    time.sleep(delay)
+                items = [item for item in items if not self._deliver(item) and self._retryable(item)]
+        finally:
+            with self._lock:
+                self._sending.difference_update(checked_out)
+
+        with self._lock:
+            pending = len(self._load()["pending"])
+        if items:
+            print(f"📮 {len(items)} notification(s) kept in outbox, will retry on next run")
+        return pending
+
+    def flush_in_background(self, retries: int = 0) -> threading.Thread | None:
+        """在后台线程中发送未送达的通知，不阻塞签到流程
+
+        Args:
+            retries: 本次运行内失败渠道的重试次数
+
+        Returns:
+            后台线程，没有待发送的通知时返回 None
+        """
+        if not self.enabled:
+            return None
+        pending = self.pending()
+        if not pending:
+            return None
+        print(f"📮 Flushing {len(pending)} undelivered notification(s) in background")
+        thread = threading.Thread(target=self.flush, kwargs={"retries": retries}, name="notify-outbox", daemon=True)
+        thread.start()
+        return thread
+
+    def flush_before_exit(self) -> bool:
+        """在后台发送通知，最多等待 NOTIFY_FLUSH_WAIT 秒，超时后不再等待（通知已保存在发件箱中，下次运行补发）
+
+        Returns:
+            是否在等待时间内发送完成
+        """
+        thread = self.flush_in_background(retries=1)
+        if thread is None:
+            return True
+        thread.join(self.flush_wait)
+        if thread.is_alive():
+            print(f"📮 Notification delivery still in progress after {self.flush_wait:.0f}s, will retry on next run")
+            return False
+        return True
+
+notify_outbox = NotificationOutbox()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+OAuth 授权 HTTP 快速路径
+
+IdP（Linux.do / GitHub）登录状态已缓存在 storage state 文件中时，把缓存的 IdP cookies 加载到 curl_cffi 会话，
+通过 HTTP 跟随 authorize 重定向拿到 code / state，交给 provider 的回调接口完成登录，无需启动浏览器。
+重定向链需要交互（登录页、验证页面、需要提交表单的授权确认页）时返回 None，由调用方回退到浏览器流程
+"""
+
+import html
+import json
+import os
+import re
+import time
+from urllib.parse import parse_qs, urljoin, urlparse
+
+from utils.http_session import http_sessions
+from utils.http_utils import is_challenge_response
+
+MAX_REDIRECTS = 10
+
+AUTHORIZE_URLS = {
+    "linuxdo": "https://connect.linux.do/oauth2/authorize?response_type=code&client_id={client_id}&state={state}",
+    "github": "https://github.com/login/oauth/authorize?response_type=code&client_id={client_id}&state={state}&scope=user:email",
+}
+
+# IdP cookies 所属的域名
+IDP_DOMAINS = {
+    "linuxdo": "linux.do",
+    "github": "github.com",
+}
+
+# Linux.do 授权确认页的 "允许" 按钮是普通链接，可以直接通过 GET 访问
+_LINUXDO_APPROVE_PATTERN = re.compile(r'href="(/oauth2/approve[^"]*)"')
+
+
+def _is_same_origin(url: str, origin: str) -> bool:
+    """URL 的 scheme 和 host（含端口）是否与 origin 完全一致，避免 provider.example.com.evil.tld 之类的前缀匹配"""
+    parsed_url = urlparse(url)
+    parsed_origin = urlparse(origin)
+    return (
+        parsed_url.scheme.lower() == parsed_origin.scheme.lower()
+        and parsed_url.netloc.lower() == parsed_origin.netloc.lower()
+    )
+
+
+def is_enabled() -> bool:
+    """OAUTH_HTTP_FAST_PATH 设置为 false 时禁用 HTTP 快速路径"""
+    return os.getenv("OAUTH_HTTP_FAST_PATH", "true").lower() in ("true", "1", "yes")
+
+
+def load_idp_cookies(cache_file_path: str, domain: str) -> list[dict]:
+    """从 storage state 文件中读取未过期的 IdP cookies
+
+    Args:
+        cache_file_path: storage state 文件路径
+        domain: IdP 域名，包含其子域名
+
+    Returns:
+        Playwright 格式的 cookies 列表，文件不存在或解析失败时返回空列表
+    """
+    if not cache_file_path or not os.path.exists(cache_file_path):
+        return []
+    try:
+        with open(cache_file_path, "r", encoding="utf-8") as f:
+            storage_state = json.load(f)
+    except Exception as e:
+        print(f"⚠️ Failed to load storage state {cache_file_path}: {e}")
+        return []
+
+    now = time.time()
+    cookies = []
+    for cookie in storage_state.get("cookies", []):
+        cookie_domain = cookie.get("domain", "").lstrip(".")
+        if cookie_domain != domain and not cookie_domain.endswith(f".{domain}"):
+            continue
+        expires = cookie.get("expires", -1)
+        if expires and 0 < expires < now:
+            continue
+        cookies.append(cookie)
+    return cookies
+
+
+async def authorize_over_http(
+    auth_type: str,
+    client_id: str,
+    auth_state: str,
+    cache_file_path: str,
+    redirect_origin: str,
+    account_name: str,
+    headers: dict,
+    proxy: str | None = None,
+    impersonate: str | None = None,
+) -> dict | None:
+    """使用缓存的 IdP 会话通过 HTTP 完成 OAuth authorize
+
+    Args:
+        auth_type: 认证方式（github / linuxdo）
+        client_id: OAuth 客户端 ID
+        auth_state: OAuth 认证状态
+        cache_file_path: IdP 登录状态的 storage state 文件路径
+        redirect_origin: provider 的 origin，重定向到该 origin 时视为授权完成
+        account_name: 账号名称（用于日志输出）
+        headers: 请求头（使用其中的 User-Agent 等浏览器头部）
+        proxy: curl_cffi 代理 URL
+        impersonate: curl_cffi 浏览器指纹
+
+    Returns:
+        回调参数字典（与 parse_qs 格式一致，包含 code 和 state），需要浏览器交互时返回 None
+    """
+    if not is_enabled() or auth_type not in AUTHORIZE_URLS:
+        return None
+
+    idp_cookies = load_idp_cookies(cache_file_path, IDP_DOMAINS[auth_type])
+    if not idp_cookies:
+        return None
+
+    url = AUTHORIZE_URLS[auth_type].format(client_id=client_id, state=auth_state)
+    session = http_sessions.get(url, proxy, impersonate)
+    for cookie in idp_cookies:
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+
+    request_headers = {
+        key: value
+        for key, value in headers.items()
+        if key.lower() in ("user-agent", "accept-language") or key.lower().startswith("sec-ch-ua")
+    }
+    print(f"ℹ️ {account_name}: Trying {auth_type} OAuth authorize over HTTP with cached session")
+
+    try:
+        for _ in range(MAX_REDIRECTS):
+            response = await session.get(url, headers=request_headers, timeout=30, allow_redirects=False)
+            if is_challenge_response(response):
+                print(f"ℹ️ {account_name}: {auth_type} authorize hit a challenge page, falling back to browser")
+                return None
+
+            location = response.headers.get("location")
+            if response.status_code in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                if _is_same_origin(url, redirect_origin):
+                    query_params = parse_qs(urlparse(url).query)
+                    if "code" in query_params and "state" in query_params:
+                        print(f"✅ {account_name}: {auth_type} OAuth code received over HTTP")
+                        return query_params
+                    print(f"ℹ️ {account_name}: {auth_type} redirected back without code, falling back to browser")
+                    return None
+                continue
+
+            if response.status_code == 200 and auth_type == "linuxdo":
+                approve = _LINUXDO_APPROVE_PATTERN.search(response.text)
+                if approve:
+                    url = urljoin(url, html.unescape(approve.group(1)))
+                    continue
+
+            print(
+                f"ℹ️ {account_name}: {auth_type} authorize needs interaction "
+                f"(HTTP {response.status_code} at {urlparse(url).path}), falling back to browser"
+            )
+            return None
+    except Exception as e:
+        print(f"⚠️ {account_name}: {auth_type} authorize over HTTP failed, falling back to browser: {e}")
+        return None
+
+    print(f"ℹ️ {account_name}: {auth_type} authorize exceeded {MAX_REDIRECTS} redirects, falling back to browser")
+    return None
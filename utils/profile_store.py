@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+浏览器 profile 存储模块
+
+按 (provider, 代理) 保存 Camoufox 持久化 profile 目录，获取 bypass cookies 等匿名页面时复用
+HTTP 缓存、service worker 等数据，后续启动无需从空 profile 开始；按总大小和数量上限做 LRU 淘汰
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from utils.http_utils import proxy_resolve
+
+DEFAULT_PROFILE_DIR = "browser-profiles"
+DEFAULT_TMPFS_DIR = "/dev/shm/newapi-ai-check-in-profiles"
+DEFAULT_MAX_PROFILES = 8
+DEFAULT_MAX_SIZE_MB = 512
+INDEX_FILE = "index.json"
+
+
+def _dir_size(path: str) -> int:
+    """计算目录大小（字节）"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ProfileStore:
+    """浏览器 profile 存储
+
+    - BROWSER_PROFILE_STORE: 设置为 true 时启用，默认关闭
+    - BROWSER_PROFILE_DIR: profile 根目录，默认 browser-profiles（与 storage-states 分开缓存，避免登录状态缓存随 profile 膨胀）
+    - BROWSER_PROFILE_TMPFS: 设置为 true 时把 profile 放在 /dev/shm，适合一次性 runner，只在本次运行内复用
+    - BROWSER_PROFILE_MAX_COUNT: 最多保留的 profile 数，默认 8
+    - BROWSER_PROFILE_MAX_SIZE_MB: 所有 profile 的总大小上限（MB），默认 512
+    """
+
+    def __init__(self):
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._in_use: set[str] = set()
+        # 索引读写和淘汰在线程中执行，用线程锁保证与 profile 占用状态的更新互斥
+        self._index_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return os.getenv("BROWSER_PROFILE_STORE", "false").lower() in ("true", "1", "yes")
+
+    @property
+    def base_dir(self) -> str:
+        if os.getenv("BROWSER_PROFILE_TMPFS", "false").lower() in ("true", "1", "yes") and os.path.isdir("/dev/shm"):
+            return DEFAULT_TMPFS_DIR
+        return os.getenv("BROWSER_PROFILE_DIR", DEFAULT_PROFILE_DIR)
+
+    @property
+    def max_profiles(self) -> int:
+        try:
+            return max(1, int(os.getenv("BROWSER_PROFILE_MAX_COUNT", str(DEFAULT_MAX_PROFILES))))
+        except ValueError:
+            return DEFAULT_MAX_PROFILES
+
+    @property
+    def max_size(self) -> int:
+        try:
+            return max(1, int(os.getenv("BROWSER_PROFILE_MAX_SIZE_MB", str(DEFAULT_MAX_SIZE_MB)))) * 1024 * 1024
+        except ValueError:
+            return DEFAULT_MAX_SIZE_MB * 1024 * 1024
+
+    @staticmethod
+    def make_key(provider: str, proxy_config: dict | None = None) -> str:
+        """生成 profile key，代理地址只保存哈希值
+
+        Args:
+            provider: provider 名称
+            proxy_config: Camoufox 代理配置
+        """
+        proxy_url = proxy_resolve(proxy_config)
+        proxy_id = hashlib.sha256(proxy_url.encode("utf-8")).hexdigest()[:12] if proxy_url else "direct"
+        return f"{provider}|{proxy_id}"
+
+    def _profile_dir(self, key: str) -> str:
+        return os.path.join(self.base_dir, hashlib.sha256(key.encode("utf-8")).hexdigest()[:16])
+
+    def _index_path(self) -> str:
+        return os.path.join(self.base_dir, INDEX_FILE)
+
+    def _load_index(self) -> dict[str, dict]:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _save_index(self, index: dict[str, dict]) -> None:
+        try:
+            os.makedirs(self.base_dir, exist_ok=True)
+            with open(self._index_path(), "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"⚠️ Failed to save browser profile index: {e}")
+
+    def _get_lock(self, key: str) -> asyncio.Lock:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    def evict(self) -> list[str]:
+        """按最近使用时间淘汰 profile，直到数量和总大小都在上限内（正在使用的 profile 不会被淘汰）
+
+        需要遍历目录树，在异步代码中应通过 asyncio.to_thread 调用
+
+        Returns:
+            被淘汰的 profile key 列表
+        """
+        with self._index_lock:
+            return self._evict()
+
+    def _evict(self) -> list[str]:
+        index = self._load_index()
+        # 清理索引中已不存在的目录
+        for key in [key for key, entry in index.items() if not os.path.isdir(entry.get("path", ""))]:
+            index.pop(key)
+        for key, entry in index.items():
+            entry["size"] = _dir_size(entry["path"])
+
+        evicted = []
+        candidates = sorted(
+            (key for key in index if key not in self._in_use),
+            key=lambda key: index[key].get("last_used", 0),
+        )
+        for key in candidates:
+            total_size = sum(entry["size"] for entry in index.values())
+            if len(index) <= self.max_profiles and total_size <= self.max_size:
+                break
+            shutil.rmtree(index[key]["path"], ignore_errors=True)
+            index.pop(key)
+            evicted.append(key)
+
+        self._save_index(index)
+        if evicted:
+            print(f"ℹ️ Evicted {len(evicted)} browser profile(s) to stay within limits")
+        return evicted
+
+    def _checkout(self, key: str) -> str:
+        """创建 profile 目录并标记为使用中"""
+        with self._index_lock:
+            path = self._profile_dir(key)
+            os.makedirs(path, exist_ok=True)
+            self._in_use.add(key)
+            return path
+
+    def _checkin(self, key: str, path: str) -> None:
+        """释放 profile，更新索引中的使用时间和大小后执行淘汰"""
+        with self._index_lock:
+            self._in_use.discard(key)
+            index = self._load_index()
+            index[key] = {"path": path, "last_used": time.time(), "size": _dir_size(path)}
+            self._save_index(index)
+            self._evict()
+
+    @asynccontextmanager
+    async def acquire(self, key: str) -> AsyncIterator[str]:
+        """独占使用 profile 目录（同一目录同时只能被一个浏览器进程打开）
+
+        Args:
+            key: profile key
+
+        Yields:
+            profile 目录路径
+        """
+        async with self._get_lock(key):
+            # 统计目录大小和淘汰需要遍历目录树，放到线程中执行，避免阻塞事件循环
+            path = await asyncio.to_thread(self._checkout, key)
+            try:
+                yield path
+            finally:
+                await asyncio.to_thread(self._checkin, key, path)
+
+
+profile_store = ProfileStore()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+HTTP 限速模块
+
+按 host 的令牌桶限速器，所有账号共享：并发执行的账号请求同一站点时，总请求速率不超过该站点的上限，
+避免触发 WAF 频率限制；未配置上限的 host 不限速
+"""
+
+import asyncio
+import math
+import os
+import time
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """令牌桶
+
+    每秒补充 rate 个令牌，最多累积 burst 个；每个请求消耗一个令牌，令牌不足时按先来后到等待
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.burst = max(1, burst or math.ceil(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock: asyncio.Lock | None = None
+
+    async def acquire(self) -> float:
+        """获取一个令牌
+
+        Returns:
+            等待时间（秒）
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - started
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def normalize_host(value: str) -> str:
+    """把 URL 或 host 统一为小写 host（包含端口）"""
+    value = value.strip().lower()
+    if "://" in value:
+        return urlparse(value).netloc
+    return value.rstrip("/")
+
+
+class RateLimiter:
+    """按 host 的限速器
+
+    - 各 host 的上限（每秒请求数）来自 PROVIDERS.json 中 provider 的 rate_limit 配置，由 configure() 设置
+    - RATE_LIMIT: 未单独配置的 host 的默认上限，默认 0（不限速）
+    """
+
+    def __init__(self):
+        self._limits: dict[str, float] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+
+    @property
+    def default_rate(self) -> float:
+        try:
+            return max(0.0, float(os.getenv("RATE_LIMIT", "0")))
+        except ValueError:
+            return 0.0
+
+    def configure(self, limits: dict[str, float]) -> None:
+        """设置各 host 的上限
+
+        Args:
+            limits: host 或 URL -> 每秒请求数，小于等于 0 表示不限速
+        """
+        self._limits = {normalize_host(host): float(rate) for host, rate in limits.items()}
+        self._buckets = {}
+
+    def get_rate(self, url: str) -> float:
+        """获取 URL 所属 host 的上限，0 表示不限速"""
+        host = normalize_host(url)
+        return self._limits.get(host, self.default_rate)
+
+    async def acquire(self, url: str) -> None:
+        """请求前获取 host 的令牌，未配置上限时立即返回
+
+        Args:
+            url: 请求 URL
+        """
+        rate = self.get_rate(url)
+        if rate <= 0:
+            return
+        host = normalize_host(url)
+        bucket = self._buckets.get(host)
+        if bucket is None or bucket.rate != rate:
+            bucket = self._buckets[host] = TokenBucket(rate)
+        waited = await bucket.acquire()
+        if waited >= 1:
+            print(f"⏳ {host}: Rate limited, waited {waited:.1f}s")
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+HTTP 重试与熔断模块
+
+- 重试策略按请求类型区分：幂等请求（GET / HEAD / OPTIONS）遇到连接错误或临时性错误状态码时按指数退避 + 随机抖动重试；
+  非幂等请求（POST 等）只在请求发出之前的连接错误（DNS 解析、建立连接、TLS 握手失败）时重试一次，
+  网关错误可能在后端已经处理请求之后才返回，重试会重复签到或兑换，因此不按状态码重试
+- 熔断器按 origin 统计本次运行内的连续失败次数，达到阈值后该 origin 的后续请求直接失败，
+  provider 宕机时剩余账号不再启动浏览器和执行完整的签到流程
+"""
+
+import asyncio
+import os
+import random
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from urllib.parse import urlparse
+
+from curl_cffi.const import CurlECode
+from curl_cffi.requests import RequestsError
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_BREAKER_THRESHOLD = 5
+
+# 计入熔断的服务端错误状态码
+FAILURE_STATUSES = frozenset({500, 502, 503, 504})
+
+# 请求发出之前就失败的连接错误，服务端不可能收到请求
+UNSENT_ERROR_CODES = frozenset(
+    {
+        CurlECode.COULDNT_RESOLVE_PROXY,
+        CurlECode.COULDNT_RESOLVE_HOST,
+        CurlECode.COULDNT_CONNECT,
+        CurlECode.SSL_CONNECT_ERROR,
+    }
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """重试策略
+
+    Attributes:
+        attempts: 最多尝试次数（包含第一次请求）
+        retry_statuses: 需要重试的 HTTP 状态码
+        retry_sent_errors: 是否重试可能发生在请求发出之后的连接错误（超时、连接重置等），非幂等请求为 False
+        base_delay: 第一次重试前的退避时间上限（秒），之后每次翻倍
+        max_delay: 单次退避时间上限（秒）
+    """
+
+    attempts: int
+    retry_statuses: frozenset[int]
+    retry_sent_errors: bool = True
+    base_delay: float = 1.0
+    max_delay: float = 8.0
+
+    def backoff(self, attempt: int) -> float:
+        """计算第 attempt 次重试前的等待时间（full jitter）"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+def get_retry_attempts() -> int:
+    """HTTP_RETRY_ATTEMPTS: 幂等请求最多尝试次数，默认 3，设置为 1 时禁用重试"""
+    try:
+        return max(1, int(os.getenv("HTTP_RETRY_ATTEMPTS", str(DEFAULT_RETRY_ATTEMPTS))))
+    except ValueError:
+        return DEFAULT_RETRY_ATTEMPTS
+
+
+def policy_for(method: str) -> RetryPolicy:
+    """获取请求方法对应的重试策略
+
+    Args:
+        method: HTTP 方法
+    """
+    attempts = get_retry_attempts()
+    if method.upper() in IDEMPOTENT_METHODS:
+        return RetryPolicy(attempts=attempts, retry_statuses=frozenset({429, 500, 502, 503, 504}))
+    # 非幂等请求（签到、充值）只重试一次请求未发出的连接错误，避免重复提交
+    return RetryPolicy(attempts=min(attempts, 2), retry_statuses=frozenset(), retry_sent_errors=False)
+
+
+def is_unsent_error(error: RequestsError) -> bool:
+    """连接错误是否发生在请求发出之前"""
+    return getattr(error, "code", 0) in UNSENT_ERROR_CODES
+
+
+class CircuitOpenError(RequestsError):
+    """熔断器已打开，请求未发送"""
+
+
+class CircuitBreakers:
+    """按 origin 的熔断器
+
+    - CIRCUIT_BREAKER_THRESHOLD: 同一 origin 连续失败（连接错误或 5xx，重试后仍失败）多少次后熔断，默认 5，设置为 0 时禁用
+    - 熔断只在本次运行内有效，成功的请求会清零连续失败次数
+    """
+
+    def __init__(self):
+        self._failures: dict[str, int] = {}
+        self._open: set[str] = set()
+
+    @property
+    def threshold(self) -> int:
+        try:
+            return max(0, int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", str(DEFAULT_BREAKER_THRESHOLD))))
+        except ValueError:
+            return DEFAULT_BREAKER_THRESHOLD
+
+    @staticmethod
+    def origin_of(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def is_open(self, url: str) -> bool:
+        """origin 是否已熔断
+
+        Args:
+            url: 请求 URL 或 origin
+        """
+        return self.threshold > 0 and self.origin_of(url) in self._open
+
+    def record_success(self, url: str) -> None:
+        self._failures.pop(self.origin_of(url), None)
+
+    def record_failure(self, url: str) -> None:
+        origin = self.origin_of(url)
+        self._failures[origin] = self._failures.get(origin, 0) + 1
+        if self.threshold and self._failures[origin] >= self.threshold and origin not in self._open:
+            self._open.add(origin)
+            print(
+                f"⛔ {origin}: {self._failures[origin]} consecutive failures, "
+                "circuit opened, remaining requests will fail fast"
+            )
+
+    def reset(self) -> None:
+        self._failures = {}
+        self._open = set()
+
+
+circuit_breakers = CircuitBreakers()
+
+
+async def request_with_retry(
+    method: str,
+    url: str,
+    send: Callable[[], Awaitable],
+    policy: RetryPolicy | None = None,
+    breakers: CircuitBreakers | None = None,
+):
+    """按重试策略发送请求，并更新熔断器状态
+
+    Args:
+        method: HTTP 方法
+        url: 请求 URL
+        send: 发送一次请求的函数，返回 curl_cffi Response
+        policy: 重试策略，None 表示按请求方法选择
+        breakers: 熔断器，None 表示使用全局熔断器
+
+    Returns:
+        最后一次请求的响应（重试用尽时返回最后一个错误状态码的响应）
+
+    Raises:
+        CircuitOpenError: origin 已熔断
+        RequestsError: 重试用尽后仍然是连接错误
+    """
+    policy = policy or policy_for(method)
+    breakers = breakers or circuit_breakers
+    path = urlparse(url).path or "/"
+
+    for attempt in range(1, policy.attempts + 1):
+        if breakers.is_open(url):
+            raise CircuitOpenError(f"Circuit open for {breakers.origin_of(url)}, request not sent")
+
+        try:
+            response = await send()
+        except CircuitOpenError:
+            raise
+        except RequestsError as e:
+            if attempt >= policy.attempts or not (policy.retry_sent_errors or is_unsent_error(e)):
+                breakers.record_failure(url)
+                raise
+            delay = policy.backoff(attempt)
+            print(f"🔁 {method} {path} failed ({e}), retrying in {delay:.1f}s ({attempt}/{policy.attempts - 1})")
+            await asyncio.sleep(delay)
+            continue
+
+        if response.status_code in policy.retry_statuses and attempt < policy.attempts:
+            delay = policy.backoff(attempt)
+            print(f"🔁 {method} {path} returned HTTP {response.status_code}, retrying in {delay:.1f}s ({attempt}/{policy.attempts - 1})")
+            await asyncio.sleep(delay)
+            continue
+
+        if response.status_code in FAILURE_STATUSES:
+            breakers.record_failure(url)
+        else:
+            breakers.record_success(url)
+        return response
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+账号并发调度模块
+
+在全局并发上限和 provider 并发上限的约束下并发执行账号任务
+"""
+
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class AccountScheduler:
+    """账号并发调度器
+
+    - 全局并发上限：同一时刻最多执行 max_concurrency 个账号
+    - provider 并发上限：同一 provider 同一时刻最多执行 provider_limits[name] 个账号
+    """
+
+    def __init__(self, max_concurrency: int = 1, provider_limits: dict[str, int | None] | None = None):
+        """初始化调度器
+
+        Args:
+            max_concurrency: 全局并发上限，小于 1 时按 1 处理
+            provider_limits: provider 名称 -> 并发上限，未配置或为 None 时仅受全局上限约束
+        """
+        self.max_concurrency = max(1, int(max_concurrency or 1))
+        self.provider_limits = provider_limits or {}
+        self._global_semaphore: asyncio.Semaphore | None = None
+        self._provider_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _get_provider_semaphore(self, provider: str) -> asyncio.Semaphore | None:
+        """获取 provider 对应的信号量，未配置上限时返回 None"""
+        limit = self.provider_limits.get(provider)
+        if not limit or limit < 1:
+            return None
+        if provider not in self._provider_semaphores:
+            self._provider_semaphores[provider] = asyncio.Semaphore(limit)
+        return self._provider_semaphores[provider]
+
+    async def _run_job(self, provider: str, job: Callable[[], Awaitable[T]]) -> T:
+        """在并发约束下执行单个任务
+
+        先获取 provider 信号量再获取全局信号量，避免等待 provider 名额时占用全局名额
+        """
+        provider_semaphore = self._get_provider_semaphore(provider)
+        if provider_semaphore is None:
+            async with self._global_semaphore:
+                return await job()
+
+        async with provider_semaphore:
+            async with self._global_semaphore:
+                return await job()
+
+    async def run(self, jobs: list[tuple[str, Callable[[], Awaitable[T]]]]) -> list[T]:
+        """并发执行所有任务
+
+        Args:
+            jobs: (provider 名称, 无参协程工厂) 列表
+
+        Returns:
+            与 jobs 顺序一致的结果列表
+        """
+        # 信号量需要在运行中的事件循环内创建
+        self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._provider_semaphores = {}
+
+        return await asyncio.gather(*(self._run_job(provider, job) for provider, job in jobs))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Provider 会话缓存模块
+
+按 (provider, 认证方式, OAuth 账号) 持久化 OAuth 登录后得到的 provider 会话 cookies 和 api_user，
+下次运行时先校验缓存会话，有效则直接签到，跳过浏览器 OAuth 流程
+"""
+
+import hashlib
+import json
+import os
+import time
+
+DEFAULT_CACHE_FILE = "storage-states/provider_sessions.json"
+
+# bypass cookies 由 bypass_broker 单独管理，不写入会话缓存
+_BYPASS_COOKIE_NAMES = {"acw_tc", "cdn_sec_tc", "acw_sc__v2", "cf_clearance", "__cf_bm", "cf_chl_2", "cf_chl_prog"}
+
+
+class ProviderSessionCache:
+    """Provider 会话缓存
+
+    - PROVIDER_SESSION_CACHE: 设置为 false 时禁用缓存
+    - PROVIDER_SESSION_CACHE_FILE: 缓存文件路径，默认 storage-states/provider_sessions.json
+    """
+
+    def __init__(self):
+        self._entries: dict[str, dict] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return os.getenv("PROVIDER_SESSION_CACHE", "true").lower() in ("true", "1", "yes")
+
+    @property
+    def cache_file(self) -> str:
+        return os.getenv("PROVIDER_SESSION_CACHE_FILE", DEFAULT_CACHE_FILE)
+
+    @staticmethod
+    def make_key(provider: str, auth_type: str, username: str) -> str:
+        """生成缓存 key，用户名只保存哈希值
+
+        Args:
+            provider: provider 名称
+            auth_type: 认证方式（github / linuxdo）
+            username: OAuth 账号用户名
+        """
+        username_hash = hashlib.sha256(username.encode("utf-8")).hexdigest()[:8]
+        return f"{provider}|{auth_type}|{username_hash}"
+
+    def _load(self) -> dict[str, dict]:
+        """加载持久化缓存（只加载一次）"""
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._entries = data
+        except Exception as e:
+            print(f"⚠️ Failed to load provider session cache: {e}")
+        return self._entries
+
+    def _save(self) -> None:
+        try:
+            cache_dir = os.path.dirname(self.cache_file)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(self._load(), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"⚠️ Failed to save provider session cache: {e}")
+
+    def get(self, key: str) -> dict | None:
+        """获取缓存会话
+
+        Returns:
+            {"cookies": dict, "api_user": str | int, "updated_at": float}，不存在或已禁用时返回 None
+        """
+        if not self.enabled:
+            return None
+        entry = self._load().get(key)
+        if entry and entry.get("cookies") and entry.get("api_user"):
+            return entry
+        return None
+
+    def save(self, key: str, cookies: dict, api_user: str | int) -> None:
+        """保存会话，自动剔除 bypass cookies"""
+        if not self.enabled:
+            return
+        session_cookies = {name: value for name, value in cookies.items() if name not in _BYPASS_COOKIE_NAMES}
+        if not session_cookies or not api_user:
+            return
+        self._load()[key] = {
+            "cookies": session_cookies,
+            "api_user": api_user,
+            "updated_at": time.time(),
+        }
+        self._save()
+
+    def invalidate(self, key: str) -> None:
+        """删除失效的会话"""
+        entries = self._load()
+        if entries.pop(key, None) is not None:
+            self._save()
+
+
+provider_sessions = ProviderSessionCache()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+账号分片模块
+
+把账号稳定地分配到 N 个分片，由多个进程或 runner 分别执行；每个分片写出部分结果文件，
+合并步骤读取所有分片结果，统一计算余额变化并发送一次通知
+"""
+
+import glob
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utils.config import AccountConfig
+
+DEFAULT_SHARD_RESULTS_DIR = "shard-results"
+
+
+def parse_shard(value: str | None) -> tuple[int, int] | None:
+    """解析分片参数
+
+    Args:
+        value: 格式为 "i/N"，i 从 1 开始，例如 "2/3" 表示 3 个分片中的第 2 个
+
+    Returns:
+        (i, N)，未设置时返回 None
+
+    Raises:
+        ValueError: 格式错误或 i 不在 1..N 范围内
+    """
+    if not value:
+        return None
+    try:
+        index_str, total_str = value.strip().split("/", 1)
+        index, total = int(index_str), int(total_str)
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected format i/N (e.g. 1/3)")
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(f"Invalid shard '{value}', index must be between 1 and {max(total, 1)}")
+    return index, total
+
+
+def account_shard(account_config: "AccountConfig", index: int, total: int) -> int:
+    """计算账号所属的分片（1..total），只与 provider 和账号显示名称有关，设置了 name 的账号不受账号顺序变化影响
+
+    Args:
+        account_config: 账号配置
+        index: 账号在配置中的索引（未设置 name 时用于生成显示名称）
+        total: 分片总数
+    """
+    account_id = f"{account_config.provider}|{account_config.get_display_name(index)}"
+    digest = hashlib.sha256(account_id.encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) % total + 1
+
+
+def shard_results_dir() -> str:
+    return os.getenv("SHARD_RESULTS_DIR", DEFAULT_SHARD_RESULTS_DIR)
+
+
+def save_shard_result(shard: tuple[int, int], reports: list[dict]) -> str:
+    """保存分片结果
+
+    Args:
+        shard: (i, N)
+        reports: 账号结果报告列表（process_account 的返回值，包含 index）
+
+    Returns:
+        结果文件路径
+    """
+    index, total = shard
+    results_dir = shard_results_dir()
+    os.makedirs(results_dir, exist_ok=True)
+    file_path = os.path.join(results_dir, f"shard_{index}_of_{total}.json")
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump({"shard": index, "total": total, "reports": reports}, f, ensure_ascii=False, indent=2)
+    print(f"💾 Shard {index}/{total} results saved to {file_path}")
+    return file_path
+
+
+def load_shard_results(paths: list[str] | None = None) -> tuple[list[dict], list[int]]:
+    """加载并合并所有分片结果，按账号原始顺序排序
+
+    Args:
+        paths: 分片结果文件路径列表，为空时读取 SHARD_RESULTS_DIR 下的所有结果文件
+
+    Returns:
+        (合并后的账号结果报告列表, 缺失的分片编号列表)
+    """
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(shard_results_dir(), "**", "shard_*_of_*.json"), recursive=True))
+
+    reports = []
+    seen_shards = set()
+    expected_total = None
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Failed to load shard result {path}: {e}")
+            continue
+        shard_id = (data.get("shard"), data.get("total"))
+        if shard_id in seen_shards:
+            print(f"⚠️ Duplicate result for shard {shard_id[0]}/{shard_id[1]} in {path}, skipping")
+            continue
+        seen_shards.add(shard_id)
+        expected_total = expected_total or data.get("total")
+        reports.extend(data.get("reports", []))
+
+    missing = []
+    if expected_total:
+        missing = sorted(set(range(1, expected_total + 1)) - {shard for shard, _ in seen_shards})
+        if missing:
+            print(f"⚠️ Missing results for shard(s) {missing} of {expected_total}")
+
+    return sorted(reports, key=lambda report: report.get("index", 0)), missing
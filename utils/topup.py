@@ -7,15 +7,14 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from curl_cffi import requests as curl_requests
-
+from utils.http_session import http_sessions
 from utils.http_utils import proxy_resolve, response_resolve
 
 if TYPE_CHECKING:
     from utils.config import AccountConfig, ProviderConfig
 
 
-def topup(
+async def topup(
     provider_config: "ProviderConfig",
     account_config: "AccountConfig",
     headers: dict,
@@ -50,7 +49,7 @@ def topup(
             "error": "No topup URL configured",
         }
     
-    session = curl_requests.Session(impersonate=impersonate, proxy=http_proxy, timeout=30)
+    session = http_sessions.get(provider_config.origin, http_proxy, impersonate)
     try:
         # 设置 cookies
         session.cookies.update(cookies)
@@ -63,7 +62,7 @@ def topup(
             "Pragma": "no-cache",
         })
 
-        response = session.post(
+        response = await session.post(
             topup_url,
             headers=topup_headers,
             json={"key": key},
@@ -113,6 +112,4 @@ def topup(
         return {
             "success": False,
             "error": f"Topup failed: {e}(key: {key})",
-        }
-    finally:
-        session.close()
\ No newline at end of file
+        }
\ No newline at end of file
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+耗时追踪模块
+
+记录各阶段、浏览器启动和 HTTP 请求的耗时，导出为 Chrome / Perfetto 可加载的 trace 文件，
+并在运行结束时输出按 provider 和阶段汇总的耗时表
+"""
+
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+DEFAULT_TRACE_FILE = "logs/trace.json"
+
+T = TypeVar("T")
+
+_current_labels: ContextVar[dict[str, Any]] = ContextVar("trace_labels", default={})
+
+
+class Tracer:
+    """耗时追踪器
+
+    - TRACE: 设置为 false 时禁用追踪
+    - TRACE_FILE: trace 文件路径，默认 logs/trace.json
+    """
+
+    def __init__(self):
+        self._events: list[dict] = []
+        self._lanes: dict[str, int] = {}
+        self._origin = time.perf_counter()
+
+    @property
+    def enabled(self) -> bool:
+        return os.getenv("TRACE", "true").lower() in ("true", "1", "yes")
+
+    @property
+    def trace_file(self) -> str:
+        return os.getenv("TRACE_FILE", DEFAULT_TRACE_FILE)
+
+    def _lane(self, labels: dict[str, Any]) -> int:
+        """按账号分配 trace 中的泳道（tid）"""
+        lane_name = str(labels.get("account", "main"))
+        if lane_name not in self._lanes:
+            self._lanes[lane_name] = len(self._lanes) + 1
+        return self._lanes[lane_name]
+
+    @contextmanager
+    def labels(self, **labels: Any) -> Iterator[None]:
+        """为当前上下文内的所有 span 添加标签（account、provider、auth_method 等）"""
+        token = _current_labels.set({**_current_labels.get(), **labels})
+        try:
+            yield
+        finally:
+            _current_labels.reset(token)
+
+    @contextmanager
+    def span(self, name: str, category: str = "phase", **args: Any) -> Iterator[dict[str, Any]]:
+        """记录一个耗时区间
+
+        Args:
+            name: span 名称
+            category: 分类（phase / browser / http）
+            args: 附加信息，可在 with 块内通过返回的字典补充
+
+        Yields:
+            附加信息字典
+        """
+        if not self.enabled:
+            yield args
+            return
+
+        labels = _current_labels.get()
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            self._events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": round((start - self._origin) * 1_000_000),
+                    "dur": round((end - start) * 1_000_000),
+                    "pid": 1,
+                    "tid": self._lane(labels),
+                    "args": {**labels, **args},
+                }
+            )
+
+    def phase(self, name: str, category: str = "phase") -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+        """异步函数装饰器，为整个函数调用记录 span"""
+
+        def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> T:
+                with self.span(name, category):
+                    return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def summary(self) -> list[dict[str, Any]]:
+        """按 (provider, 分类, span 名称) 汇总耗时，按总耗时降序排列"""
+        groups: dict[tuple[str, str, str], dict[str, Any]] = {}
+        for event in self._events:
+            provider = str(event["args"].get("provider", "-"))
+            key = (provider, event["cat"], event["name"])
+            group = groups.setdefault(
+                key,
+                {"provider": provider, "category": event["cat"], "name": event["name"], "count": 0, "total": 0.0, "max": 0.0},
+            )
+            seconds = event["dur"] / 1_000_000
+            group["count"] += 1
+            group["total"] += seconds
+            group["max"] = max(group["max"], seconds)
+        return sorted(groups.values(), key=lambda group: group["total"], reverse=True)
+
+    def print_summary(self, limit: int = 30) -> None:
+        """输出耗时汇总表"""
+        rows = self.summary()
+        if not rows:
+            return
+
+        print("\n⏱️ Timing summary (top by total time):")
+        print(f"  {'provider':<16} {'category':<8} {'name':<32} {'count':>5} {'total(s)':>9} {'avg(s)':>8} {'max(s)':>8}")
+        for row in rows[:limit]:
+            print(
+                f"  {row['provider'][:16]:<16} {row['category']:<8} {row['name'][:32]:<32} {row['count']:>5} "
+                f"{row['total']:>9.2f} {row['total'] / row['count']:>8.2f} {row['max']:>8.2f}"
+            )
+
+    def export(self) -> str | None:
+        """导出 Chrome / Perfetto trace 文件
+
+        Returns:
+            文件路径，没有记录或禁用时返回 None
+        """
+        if not self.enabled or not self._events:
+            return None
+
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": lane_name}}
+            for lane_name, tid in self._lanes.items()
+        ]
+        trace_file = self.trace_file
+        try:
+            trace_dir = os.path.dirname(trace_file)
+            if trace_dir:
+                os.makedirs(trace_dir, exist_ok=True)
+            with open(trace_file, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": metadata + self._events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+            print(f"ℹ️ Trace saved to {trace_file} (open with chrome://tracing or ui.perfetto.dev)")
+            return trace_file
+        except Exception as e:
+            print(f"⚠️ Failed to save trace file: {e}")
+            return None
+
+
+tracer = Tracer()